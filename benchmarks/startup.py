@@ -0,0 +1,67 @@
+"""Measure the startup cost of pysoot in fresh processes.
+
+Compares Java home discovery with and without the cache, and JVM startup
+(up to Soot's Scene being usable) with and without an AppCDS archive (see
+pysoot.java_env). Every measurement runs in a new interpreter, with its own
+empty cache directory.
+
+    python benchmarks/startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+JAVA_HOME = "from pysoot.lifter import _find_jrt_jar; _find_jrt_jar()"
+JVM = (
+    "from pysoot.soot_manager import _start_jvm; _start_jvm(); "
+    "from jpype.types import JClass; JClass('soot.Scene').v()"
+)
+
+
+def run(code, env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def measure(label, code, env, runs, warmup=0):
+    for _ in range(warmup):
+        run(code, env)
+    times = [run(code, env) for _ in range(runs)]
+    print(f"{label:<36} {statistics.median(times):7.3f}s (median of {runs})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache, tempfile.TemporaryDirectory() as cold:
+        base = dict(os.environ, PYSOOT_APPCDS="0")
+        base.pop("JAVA_HOME", None)
+
+        env = dict(base, PYSOOT_CACHE_DIR=cold)
+        # clearing the cache before every run measures discovery alone
+        uncached = (
+            "import pysoot.java_env as j, shutil; "
+            "shutil.rmtree(j.cache_dir(), ignore_errors=True); " + JAVA_HOME
+        )
+        measure("java home, discovered", uncached, env, args.runs)
+        env = dict(base, PYSOOT_CACHE_DIR=cache)
+        measure("java home, cached", JAVA_HOME, env, args.runs, warmup=1)
+
+        measure(
+            "JVM + Soot, no AppCDS", JVM, dict(base, PYSOOT_CACHE_DIR=cache), args.runs
+        )
+        env = dict(base, PYSOOT_CACHE_DIR=cache, PYSOOT_APPCDS="1")
+        # the first run writes the archive
+        measure("JVM + Soot, AppCDS", JVM, env, args.runs, warmup=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
+from .aio import lift_async
+from .diff import diff_programs
 from .lifter import Lifter
+from .library_model import LibraryModel, build_library_model
+from .statement_table import write_statement_table
+from .sootir.soot_class import write_ir
 
-__all__ = ["Lifter"]
+__all__ = [
+    "Lifter",
+    "LibraryModel",
+    "build_library_model",
+    "diff_programs",
+    "lift_async",
+    "write_ir",
+    "write_statement_table",
+]
@@ -0,0 +1,144 @@
+"""Lifting from asyncio code without blocking the event loop.
+
+A lift runs Soot synchronously for seconds to minutes, and JPype cannot
+restart a JVM within a process, so lift_async runs every lift in its own
+spawned worker process and hands the resulting Lifter back. Cancelling the
+awaiting task kills the worker.
+
+Waiting for a worker takes a thread of its own rather than one of the event
+loop's default executor, so that many concurrent lifts do not starve other
+run_in_executor users.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import weakref
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from .errors import ParameterError, WorkerError
+
+if TYPE_CHECKING:
+    from .lifter import Lifter
+
+
+# default limit of each event loop, created on first use
+_limits: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def lift_async(
+    input_file: str, *, limit: asyncio.Semaphore | None = None, **lifter_kwargs
+) -> Lifter:
+    """Lift input_file like Lifter(input_file, **lifter_kwargs), in a worker
+    process, and return the Lifter.
+
+    At most as many workers as limit allows run at once; lifts beyond it wait
+    for a free slot. Without a limit, lifts share a per-event-loop one of
+    os.cpu_count() slots. Errors raised by the lift are raised here.
+
+    What only makes sense in the worker's process cannot be used: the
+    returned Lifter has no Soot Scene, so lazy_bodies is rejected and, with
+    entry_points, reach() is not available; progress is rejected, as the
+    callback would run in the worker.
+    """
+    if lifter_kwargs.get("lazy_bodies"):
+        raise ParameterError("lazy_bodies needs the Soot Scene of the worker")
+    if lifter_kwargs.get("progress") is not None:
+        raise ParameterError("progress callbacks cannot run in the worker")
+    if limit is None:
+        loop = asyncio.get_running_loop()
+        limit = _limits.get(loop)
+        if limit is None:
+            limit = _limits[loop] = asyncio.Semaphore(os.cpu_count() or 1)
+
+    async with limit:
+        return await _run_worker(input_file, lifter_kwargs)
+
+
+async def _run_worker(input_file: str, lifter_kwargs: dict) -> Lifter:
+    mp_context = multiprocessing.get_context("spawn")
+    conn, child_conn = mp_context.Pipe(duplex=False)
+    process = mp_context.Process(
+        target=_lift_worker,
+        args=(child_conn, input_file, lifter_kwargs),
+        name="pysoot-lift",
+    )
+    process.start()
+    # keep only the worker's copy, so that recv() fails once the worker exits
+    child_conn.close()
+
+    try:
+        ok, result = await _in_thread(_receive, conn)
+    except EOFError:
+        await _in_thread(process.join)
+        raise WorkerError(f"lift worker exited with code {process.exitcode}") from None
+    except asyncio.CancelledError:
+        # the receiving thread sees EOF once the worker is gone; a killed
+        # process is reaped at once
+        process.kill()
+        process.join()
+        raise
+
+    await _in_thread(process.join)
+    if not ok:
+        raise result
+    return result
+
+
+def _in_thread(fn: Callable, *args) -> asyncio.Future:
+    """Run fn(*args) in a new daemon thread, as a future of the running
+    loop."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(method: str, value):
+        if not future.done():
+            getattr(future, method)(value)
+
+    def run():
+        try:
+            result = fn(*args)
+        except BaseException as e:  # pylint: disable=broad-except
+            method, value = "set_exception", e
+        else:
+            method, value = "set_result", result
+        try:
+            loop.call_soon_threadsafe(settle, method, value)
+        except RuntimeError:
+            # the loop was closed meanwhile
+            pass
+
+    threading.Thread(target=run, name="pysoot-lift-wait", daemon=True).start()
+    return future
+
+
+def _receive(conn):
+    with conn:
+        return conn.recv()
+
+
+def _lift_worker(conn, input_file: str, lifter_kwargs: dict):
+    from .lifter import Lifter  # pylint: disable=import-outside-toplevel
+
+    try:
+        lifter = Lifter(input_file, **lifter_kwargs)
+        # bound to this process's Scene: the reachability is not picklable,
+        # and the generation would name an unrelated Scene of the parent
+        lifter.reachability = None
+        lifter._scene = None  # pylint: disable=protected-access
+        message = (True, lifter)
+    except Exception as e:  # pylint: disable=broad-except
+        message = (False, e)
+    try:
+        conn.send(message)
+    except Exception as e:  # pylint: disable=broad-except
+        # e.g. an exception that cannot be pickled
+        conn.send((False, WorkerError(f"{type(e).__name__}: {e}")))
+    finally:
+        conn.close()
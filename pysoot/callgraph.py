@@ -0,0 +1,484 @@
+"""Call graph of the lifted IR, by class hierarchy analysis (CHA) or rapid
+type analysis (RTA).
+
+Virtual and interface calls go to every override that a subtype of the
+declared class can dispatch to. With RTA only the subtypes the program
+allocates (with a SootNewExpr) are considered. Allocations are collected
+over all the methods of the graph rather than over reachable ones only.
+Static and special calls resolve to one method. Dynamic invokes are not
+resolved.
+
+Subtypes are only known among the classes added to the graph. Method lookups
+that leave those classes (e.g. java.lang.Object.toString) go through the
+get_class callable, such as Lifter.get_class.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
+
+from .errors import ParameterError
+from .sootir.soot_expr import (
+    SootInterfaceInvokeExpr,
+    SootInvokeExpr,
+    SootNewExpr,
+    SootSpecialInvokeExpr,
+    SootStaticInvokeExpr,
+    SootVirtualInvokeExpr,
+)
+from .sootir.soot_statement import AssignStmt, InvokeStmt
+
+if TYPE_CHECKING:
+    from .sootir.soot_class import SootClass
+
+# (class name, method name, parameter types)
+MethodSig = tuple[str, str, tuple[str, ...]]
+
+_STATIC, _SPECIAL, _VIRTUAL, _INTERFACE = range(4)
+_KINDS = {
+    SootStaticInvokeExpr: _STATIC,
+    SootSpecialInvokeExpr: _SPECIAL,
+    SootVirtualInvokeExpr: _VIRTUAL,
+    SootInterfaceInvokeExpr: _INTERFACE,
+}
+
+
+class CallGraph:
+    """Call edges between methods, from call sites (caller, statement label)
+    to the methods they may invoke.
+
+    Methods are interned to integer ids and call sites and edges are kept in
+    arrays, so a graph of millions of edges stays small. More classes can be
+    added later with add_classes(); the edges of existing call sites gain
+    the targets the new classes provide.
+    """
+
+    def __init__(
+        self,
+        classes: Iterable[SootClass] = (),
+        algorithm: str = "cha",
+        get_class: Callable[[str], SootClass | None] | None = None,
+    ):
+        if algorithm not in ("cha", "rta"):
+            raise ParameterError("algorithm needs to be 'cha' or 'rta'")
+        self.algorithm = algorithm
+        self._get_class = get_class
+
+        self._classes: dict[str, SootClass] = {}
+        # class name -> names of the classes directly extending/implementing it
+        self._direct_subtypes: dict[str, list[str]] = {}
+        self._allocated: set[str] = set()
+
+        self.methods: list[MethodSig] = []
+        self._method_ids: dict[MethodSig, int] = {}
+
+        # call sites, by index: caller id, statement label, kind, callee as
+        # written (id of the declared method)
+        self._site_caller = array("I")
+        self._site_label = array("I")
+        self._site_kind = array("B")
+        self._site_ref = array("I")
+        # edges, by index: call site, callee id
+        self._edge_site = array("I")
+        self._edge_callee = array("I")
+        # class of the callee as written -> its call sites
+        self._sites_by_class: dict[str, list[int]] = {}
+
+        self._memo: dict[tuple, MethodSig | None] = {}
+        self._concrete_memo: dict[str, frozenset[tuple]] = {}
+        self._targets_memo: dict[tuple[int, int], frozenset[int]] = {}
+        self._subtypes_memo: dict[str, frozenset[str]] = {}
+        self._by_caller: dict[int, list[int]] | None = None
+        self._by_callee: dict[int, list[int]] | None = None
+
+        self.add_classes(classes)
+
+    def __len__(self) -> int:
+        return len(self._edge_site)
+
+    # ---------- building ----------
+
+    def add_classes(self, classes: Iterable[SootClass]):
+        """Add classes to the graph, with the edges of their call sites.
+
+        Existing call sites are resolved again when the new classes (or the
+        types they allocate) are subtypes of the class they call, and gain
+        the new targets.
+        """
+        classes = [c for c in classes if c.name not in self._classes]
+        if not classes:
+            return
+
+        new_allocations = set()
+        if self.algorithm == "rta":
+            for soot_class in classes:
+                new_allocations.update(_allocations(soot_class))
+            new_allocations -= self._allocated
+
+        # the call sites whose targets may change, with their current ones
+        roots = [c.name for c in classes] + sorted(new_allocations)
+        affected = self._supertypes(roots, classes)
+        old_targets = {
+            site: self._site_targets(site)
+            for site in sorted(
+                site
+                for class_name in affected
+                for site in self._sites_by_class.get(class_name, ())
+            )
+        }
+
+        for soot_class in classes:
+            self._classes[soot_class.name] = soot_class
+            parents = (soot_class.super_class, *soot_class.interfaces)
+            for parent in parents:
+                if parent:
+                    self._direct_subtypes.setdefault(parent, []).append(soot_class.name)
+        self._allocated |= new_allocations
+        self._memo.clear()
+        self._targets_memo.clear()
+        self._subtypes_memo.clear()
+        # the class may have been looked up through get_class before
+        for soot_class in classes:
+            self._concrete_memo.pop(soot_class.name, None)
+
+        for site, targets in old_targets.items():
+            for callee in sorted(self._site_targets(site) - targets):
+                self._add_edge(site, callee)
+
+        for soot_class in classes:
+            for method in soot_class.methods:
+                caller = self._method_id((soot_class.name, method.name, method.params))
+                for block in method.blocks:
+                    for stmt in block.statements:
+                        expr = _invoke_expr(stmt)
+                        if expr is None:
+                            continue
+                        kind = _KINDS.get(type(expr))
+                        if kind is None:
+                            continue
+                        site = self._add_site(caller, stmt.label, kind, expr)
+                        for callee in sorted(self._site_targets(site)):
+                            self._add_edge(site, callee)
+
+    def _method_id(self, sig: MethodSig) -> int:
+        method_id = self._method_ids.get(sig)
+        if method_id is None:
+            method_id = self._method_ids[sig] = len(self.methods)
+            self.methods.append(sig)
+        return method_id
+
+    def _add_site(self, caller: int, label: int, kind: int, expr: SootInvokeExpr):
+        ref = self._method_id((expr.class_name, expr.method_name, expr.method_params))
+        self._site_caller.append(caller)
+        self._site_label.append(label)
+        self._site_kind.append(kind)
+        self._site_ref.append(ref)
+        site = len(self._site_caller) - 1
+        self._sites_by_class.setdefault(expr.class_name, []).append(site)
+        return site
+
+    def _add_edge(self, site: int, callee: int):
+        self._edge_site.append(site)
+        self._edge_callee.append(callee)
+        self._by_caller = self._by_callee = None
+
+    # ---------- resolution ----------
+
+    def invoke_targets(self, expr: SootInvokeExpr) -> list[MethodSig]:
+        """The methods expr may invoke, given the classes added so far,
+        whether or not it is a call site of the graph."""
+        kind = _KINDS.get(type(expr))
+        if kind is None:
+            return []
+        ref = self._method_id((expr.class_name, expr.method_name, expr.method_params))
+        return [self.methods[callee] for callee in sorted(self._ref_targets(kind, ref))]
+
+    def _site_targets(self, site: int) -> frozenset[int]:
+        return self._ref_targets(self._site_kind[site], self._site_ref[site])
+
+    def _ref_targets(self, kind: int, ref: int) -> frozenset[int]:
+        key = (kind, ref)
+        targets = self._targets_memo.get(key)
+        if targets is None:
+            targets = self._targets_memo[key] = frozenset(
+                self._method_id(sig) for sig in self._targets(*key)
+            )
+        return targets
+
+    def _targets(self, kind: int, ref: int) -> Iterator[MethodSig]:
+        class_name, name, params = self.methods[ref]
+        if kind in (_STATIC, _SPECIAL):
+            target = self.resolve(class_name, name, params)
+            if target is not None:
+                yield target
+            return
+        for receiver in sorted(self.subtypes(class_name)):
+            if self.algorithm == "rta" and receiver not in self._allocated:
+                continue
+            receiver_class = self._class(receiver)
+            if receiver_class is None or {"ABSTRACT", "INTERFACE"} & set(
+                receiver_class.attrs
+            ):
+                continue
+            target = self.resolve(receiver, name, params)
+            if target is not None:
+                yield target
+
+    def subtypes(self, class_name: str) -> frozenset[str]:
+        """class_name and all the known classes and interfaces extending or
+        implementing it, directly or not."""
+        result = self._subtypes_memo.get(class_name)
+        if result is None:
+            found = {class_name}
+            stack = [class_name]
+            while stack:
+                for sub in self._direct_subtypes.get(stack.pop(), ()):
+                    if sub not in found:
+                        found.add(sub)
+                        stack.append(sub)
+            result = self._subtypes_memo[class_name] = frozenset(found)
+        return result
+
+    def resolve(
+        self, receiver_type: str, name: str, params: tuple[str, ...]
+    ) -> MethodSig | None:
+        """The method a call to name(params) dispatches to on an object of
+        receiver_type: the first concrete declaration up its superclass
+        chain, else a default method of its interfaces. Memoized."""
+        key = (receiver_type, name, params)
+        if key in self._memo:
+            return self._memo[key]
+
+        target = None
+        interfaces = []
+        class_name = receiver_type
+        seen = set()
+        while class_name and class_name not in seen:
+            seen.add(class_name)
+            soot_class = self._class(class_name)
+            if soot_class is None:
+                break
+            if (name, params) in self._concrete(soot_class):
+                target = (class_name, name, params)
+                break
+            interfaces.extend(soot_class.interfaces)
+            class_name = soot_class.super_class
+
+        while target is None and interfaces:
+            interface = interfaces.pop(0)
+            if interface in seen:
+                continue
+            seen.add(interface)
+            soot_class = self._class(interface)
+            if soot_class is None:
+                continue
+            if (name, params) in self._concrete(soot_class):
+                target = (interface, name, params)
+            interfaces.extend(soot_class.interfaces)
+
+        self._memo[key] = target
+        return target
+
+    def _class(self, class_name: str) -> SootClass | None:
+        soot_class = self._classes.get(class_name)
+        if soot_class is None and self._get_class is not None:
+            soot_class = self._get_class(class_name)
+        return soot_class
+
+    def _concrete(self, soot_class: SootClass) -> frozenset[tuple]:
+        """(name, params) of the non-abstract methods soot_class declares."""
+        result = self._concrete_memo.get(soot_class.name)
+        if result is None:
+            result = self._concrete_memo[soot_class.name] = frozenset(
+                (m.name, m.params)
+                for m in soot_class.methods
+                if "ABSTRACT" not in m.attrs
+            )
+        return result
+
+    def _supertypes(self, roots: list[str], new_classes: list[SootClass]) -> set[str]:
+        """roots and all their known supertypes, new classes included."""
+        new = {c.name: c for c in new_classes}
+        found = set()
+        stack = list(roots)
+        while stack:
+            class_name = stack.pop()
+            if not class_name or class_name in found:
+                continue
+            found.add(class_name)
+            soot_class = new.get(class_name) or self._class(class_name)
+            if soot_class is not None:
+                stack.append(soot_class.super_class)
+                stack.extend(soot_class.interfaces)
+        return found
+
+    # ---------- queries ----------
+
+    def edges(self) -> Iterator[tuple[MethodSig, int, MethodSig]]:
+        """All edges, as (caller, statement label, callee)."""
+        for site, callee in zip(self._edge_site, self._edge_callee):
+            yield (
+                self.methods[self._site_caller[site]],
+                self._site_label[site],
+                self.methods[callee],
+            )
+
+    def callees(self, method: MethodSig) -> list[tuple[int, MethodSig]]:
+        """(statement label, callee) of every edge leaving method."""
+        if self._by_caller is None:
+            self._index()
+        method_id = self._method_ids.get(method)
+        return [
+            (
+                self._site_label[self._edge_site[e]],
+                self.methods[self._edge_callee[e]],
+            )
+            for e in self._by_caller.get(method_id, ())
+        ]
+
+    def callers(self, method: MethodSig) -> list[tuple[MethodSig, int]]:
+        """(caller, statement label) of every edge reaching method."""
+        if self._by_callee is None:
+            self._index()
+        method_id = self._method_ids.get(method)
+        return [
+            (
+                self.methods[self._site_caller[self._edge_site[e]]],
+                self._site_label[self._edge_site[e]],
+            )
+            for e in self._by_callee.get(method_id, ())
+        ]
+
+    def _index(self):
+        by_caller: dict[int, list[int]] = {}
+        by_callee: dict[int, list[int]] = {}
+        for e, (site, callee) in enumerate(zip(self._edge_site, self._edge_callee)):
+            by_caller.setdefault(self._site_caller[site], []).append(e)
+            by_callee.setdefault(callee, []).append(e)
+        self._by_caller, self._by_callee = by_caller, by_callee
+
+
+def _invoke_expr(stmt) -> SootInvokeExpr | None:
+    if isinstance(stmt, InvokeStmt):
+        return stmt.invoke_expr
+    if isinstance(stmt, AssignStmt) and isinstance(stmt.right_op, SootInvokeExpr):
+        return stmt.right_op
+    return None
+
+
+def _allocations(soot_class: SootClass) -> Iterator[str]:
+    for method in soot_class.methods:
+        for block in method.blocks:
+            for stmt in block.statements:
+                if isinstance(stmt, AssignStmt) and isinstance(
+                    stmt.right_op, SootNewExpr
+                ):
+                    yield stmt.right_op.base_type
+
+
+class SootCallGraph:
+    """A call graph computed by Soot itself ("cha" or "spark"), imported
+    with Lifter(soot_call_graph=...).
+
+    Edge i goes from methods[callers[i]], at statement label labels[i] (-1
+    for edges without a call site, e.g. implicit ones), to
+    methods[callees[i]]; its kind (Soot's Kind, e.g. "VIRTUAL", "CLINIT")
+    is kind_names[kinds[i]].
+    """
+
+    def __init__(self, algorithm: str = "cha"):
+        if algorithm not in ("cha", "spark"):
+            raise ParameterError("algorithm needs to be 'cha' or 'spark'")
+        self.algorithm = algorithm
+        self.methods: list[MethodSig] = []
+        self.kind_names: list[str] = []
+        self.callers = array("I")
+        self.labels = array("i")
+        self.callees = array("I")
+        self.kinds = array("B")
+
+    def __len__(self) -> int:
+        return len(self.callers)
+
+    def edges(self) -> Iterator[tuple[MethodSig, int, MethodSig, str]]:
+        """All edges, as (caller, statement label, callee, kind)."""
+        methods, kind_names = self.methods, self.kind_names
+        for caller, label, callee, kind in zip(
+            self.callers, self.labels, self.callees, self.kinds
+        ):
+            yield methods[caller], label, methods[callee], kind_names[kind]
+
+    def load(
+        self,
+        edges_text: str,
+        unit_labels: Callable[[str], dict[str, list[int]] | None],
+    ):
+        """Fill the graph from the text of a soot CallGraph (its toString(),
+        one "KIND edge: UNIT in <SRC> ==> <TGT>" line per edge).
+
+        unit_labels maps a source method signature to the labels of its
+        statements, by statement text, or None if it has no body. Soot gives
+        edges separately for statements with the same text, but as they use
+        the same locals their targets are the same, so every such statement
+        gets the edges of all of them.
+
+        Soot computes the graph on Jimple bodies, so the texts unit_labels
+        gives for Shimple bodies must use the Jimple names of the locals
+        (see soot_manager._unit_labels_by_text).
+        """
+        method_ids: dict[str, int] = {}
+        kind_ids: dict[str, int] = {}
+        # (source, unit text) -> {(kind, target)}, in Soot's order
+        sites: dict[tuple[str, str], dict[tuple[str, str], None]] = {}
+        for line in edges_text.splitlines():
+            head, sep, target = line.rpartition(" ==> ")
+            if not sep:
+                continue
+            head, _, source = head.rpartition(" in <")
+            kind, _, unit = head.partition(" edge: ")
+            sites.setdefault(("<" + source, unit), {})[(kind, target)] = None
+
+        def method_id(signature: str) -> int:
+            i = method_ids.get(signature)
+            if i is None:
+                i = method_ids[signature] = len(self.methods)
+                self.methods.append(parse_method_signature(signature))
+            return i
+
+        labels_of: dict[str, dict[str, list[int]] | None] = {}
+        for (source, unit), targets in sites.items():
+            if source not in labels_of:
+                labels_of[source] = unit_labels(source)
+            by_text = labels_of[source] or {}
+            caller = method_id(source)
+            for label in by_text.get(unit, (-1,)):
+                for kind, target in targets:
+                    kind_id = kind_ids.get(kind)
+                    if kind_id is None:
+                        kind_id = kind_ids[kind] = len(self.kind_names)
+                        self.kind_names.append(kind)
+                    self.callers.append(caller)
+                    self.labels.append(label)
+                    self.callees.append(method_id(target))
+                    self.kinds.append(kind_id)
+
+
+def parse_method_signature(signature: str) -> MethodSig:
+    """Split a Soot method signature, e.g. "<a.B: void m(int,java.lang.String)>",
+    into (class name, method name, parameter types)."""
+    class_name, _, sub_signature = signature[1:-1].partition(": ")
+    _, _, name_params = sub_signature.partition(" ")
+    name, _, params = name_params.partition("(")
+    params = params[:-1]
+    return (
+        _unquote(class_name),
+        _unquote(name),
+        tuple(_unquote(p) for p in params.split(",")) if params else (),
+    )
+
+
+def _unquote(name: str) -> str:
+    # Soot quotes names that are Jimple keywords, e.g. 'annotation'
+    return name.replace("'", "")
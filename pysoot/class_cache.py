@@ -0,0 +1,162 @@
+"""Content-addressed cache of converted classes, shared across inputs.
+
+Library code (okhttp, gson, androidx...) is embedded byte-identical in many
+inputs. A class is keyed by the hash of its content plus the lifter
+configuration, so once converted it can be reused by any later lift, which
+then neither builds its bodies in Soot nor converts them.
+
+JAR classes are keyed by their .class bytes. Dex classes are keyed by their
+content with all indices into the dex tables resolved (see
+pysoot.dex.DexFile.class_digest), since the same class gets different
+indices in every dex file it is compiled into.
+
+Keys do not cover the classes a class refers to. References that Soot
+resolves through other classes (e.g. the declaring class of an inherited
+method) are assumed to resolve the same way wherever the class appears, which
+holds for self-contained libraries on the same platform.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import tempfile
+import zipfile
+import zlib
+from collections import OrderedDict
+
+from .dex import DexFile, apk_dex_entries
+from .sootir.soot_class import SootClass
+
+
+# Bump whenever the conversion output changes, to invalidate existing caches.
+_FORMAT = 1
+
+
+class ClassCache:
+    """Converted classes stored in a directory, one file per key.
+
+    Writes are atomic, so the directory can be shared by concurrent workers.
+    The most recently used memory_entries classes are also kept in memory,
+    which lets lifts in the same process share the SootClass objects.
+    """
+
+    def __init__(self, directory: str, memory_entries: int = 4096):
+        self.directory = os.path.realpath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, SootClass] = OrderedDict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_memory"] = OrderedDict()
+        return state
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, key: str) -> SootClass | None:
+        soot_class = self._memory.get(key)
+        if soot_class is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return soot_class
+        try:
+            with open(self._path(key), "rb") as f:
+                soot_class = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, soot_class)
+        return soot_class
+
+    def put(self, key: str, soot_class: SootClass):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = zlib.compress(pickle.dumps(soot_class, pickle.HIGHEST_PROTOCOL))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(record)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._remember(key, soot_class)
+
+    def _remember(self, key: str, soot_class: SootClass):
+        self._memory[key] = soot_class
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+def class_keys(
+    input_file: str,
+    input_format: str,
+    ir_format: str,
+    soot_classpath: str | None,
+    android_sdk: str | None,
+) -> dict[str, str]:
+    """Cache key of every class of the input, by class name."""
+    config = hashlib.sha256(
+        repr(
+            (
+                _FORMAT,
+                _pysoot_version(),
+                input_format,
+                ir_format,
+                _classpath_identity(soot_classpath),
+                android_sdk,
+            )
+        ).encode()
+    ).digest()
+
+    keys = {}
+    if input_format == "apk":
+        with zipfile.ZipFile(input_file) as apk:
+            for entry in apk_dex_entries(input_file):
+                dex = DexFile(apk.read(entry))
+                for dex_class in dex.classes():
+                    # like Soot, keep the first definition of a class
+                    if dex_class.name not in keys:
+                        digest = dex.class_digest(dex_class)
+                        keys[dex_class.name] = _key(config, digest)
+    else:
+        with zipfile.ZipFile(input_file) as jar:
+            for entry in jar.namelist():
+                if not entry.endswith(".class") or entry.startswith("META-INF/"):
+                    continue
+                name = entry.removesuffix(".class").replace("/", ".")
+                keys[name] = _key(config, hashlib.sha256(jar.read(entry)).digest())
+    return keys
+
+
+def _key(config: bytes, digest: bytes) -> str:
+    return hashlib.sha256(config + digest).hexdigest()
+
+
+def _pysoot_version() -> str:
+    try:
+        return importlib.metadata.version("pysoot")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _classpath_identity(soot_classpath: str | None) -> tuple:
+    """The library jars with their size and modification time."""
+    if not soot_classpath or soot_classpath == "None":
+        return ()
+    identity = []
+    for jar in sorted(soot_classpath.split(os.pathsep)):
+        try:
+            st = os.stat(jar)
+            identity.append((jar, st.st_size, st.st_mtime_ns))
+        except OSError:
+            identity.append((jar, None, None))
+    return tuple(identity)
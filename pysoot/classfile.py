@@ -0,0 +1,185 @@
+"""Minimal reader for Java class files.
+
+Only the declarations (class, fields, methods and their thrown exceptions)
+are decoded; method code is skipped. See
+https://docs.oracle.com/javase/specs/jvms/se21/html/jvms-4.html
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+
+from .descriptors import decode_mutf8, descriptor_to_type, parse_method_descriptor
+from .errors import ClassFormatError, DescriptorFormatError
+
+# constant pool tag -> size of the entry after the tag, for fixed-size ones
+_CONSTANT_SIZES = {
+    3: 4,  # Integer
+    4: 4,  # Float
+    5: 8,  # Long
+    6: 8,  # Double
+    7: 2,  # Class
+    8: 2,  # String
+    9: 4,  # Fieldref
+    10: 4,  # Methodref
+    11: 4,  # InterfaceMethodref
+    12: 4,  # NameAndType
+    15: 3,  # MethodHandle
+    16: 2,  # MethodType
+    17: 4,  # Dynamic
+    18: 4,  # InvokeDynamic
+    19: 2,  # Module
+    20: 2,  # Package
+}
+_UTF8 = 1
+_CLASS = 7
+
+# ACC_SUPER, which Soot drops from class modifiers
+ACC_SUPER = 0x20
+
+
+@dataclass(slots=True, frozen=True)
+class ClassFileField:
+    name: str
+    type: str
+    access_flags: int
+
+
+@dataclass(slots=True, frozen=True)
+class ClassFileMethod:
+    name: str
+    params: tuple[str, ...]
+    ret: str
+    access_flags: int
+    exceptions: tuple[str, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class ClassFile:
+    """The declarations of a class file. Types are in Soot's notation
+    (e.g. "java.lang.String", "int[]")."""
+
+    name: str
+    access_flags: int
+    superclass: str | None
+    interfaces: tuple[str, ...]
+    fields: tuple[ClassFileField, ...]
+    methods: tuple[ClassFileMethod, ...]
+
+
+def parse_class_file(data: bytes) -> ClassFile:
+    try:
+        return _ClassFileParser(data).parse()
+    except (IndexError, KeyError, struct.error, DescriptorFormatError) as e:
+        raise ClassFormatError("truncated or malformed class file") from e
+
+
+class _ClassFileParser:
+    def __init__(self, data: bytes):
+        if data[:4] != b"\xca\xfe\xba\xbe":
+            raise ClassFormatError("not a class file")
+        self.data = data
+        self.offset = 8
+        # index -> (tag, offset of the entry after the tag)
+        self.constants: dict[int, tuple[int, int]] = {}
+        self._utf8: dict[int, str] = {}
+
+    def u2(self) -> int:
+        (value,) = struct.unpack_from(">H", self.data, self.offset)
+        self.offset += 2
+        return value
+
+    def u4(self) -> int:
+        (value,) = struct.unpack_from(">I", self.data, self.offset)
+        self.offset += 4
+        return value
+
+    def utf8(self, idx: int) -> str:
+        string = self._utf8.get(idx)
+        if string is None:
+            tag, offset = self.constants[idx]
+            if tag != _UTF8:
+                raise ClassFormatError(f"constant {idx} is not a string")
+            (length,) = struct.unpack_from(">H", self.data, offset)
+            raw = self.data[offset + 2 : offset + 2 + length]
+            string = self._utf8[idx] = decode_mutf8(raw)
+        return string
+
+    def class_name(self, idx: int) -> str:
+        tag, offset = self.constants[idx]
+        if tag != _CLASS:
+            raise ClassFormatError(f"constant {idx} is not a class")
+        (name_idx,) = struct.unpack_from(">H", self.data, offset)
+        name = self.utf8(name_idx)
+        # array classes are named by their descriptor
+        if name.startswith("["):
+            return descriptor_to_type(name)
+        return name.replace("/", ".")
+
+    def parse(self) -> ClassFile:
+        n_constants = self.u2()
+        i = 1
+        while i < n_constants:
+            tag = self.data[self.offset]
+            self.offset += 1
+            self.constants[i] = (tag, self.offset)
+            if tag == _UTF8:
+                length = self.u2()
+                self.offset += length
+            elif tag in _CONSTANT_SIZES:
+                self.offset += _CONSTANT_SIZES[tag]
+            else:
+                raise ClassFormatError(f"invalid constant pool tag {tag}")
+            # longs and doubles take two slots
+            i += 2 if tag in (5, 6) else 1
+
+        access_flags = self.u2()
+        name = self.class_name(self.u2())
+        super_idx = self.u2()
+        superclass = self.class_name(super_idx) if super_idx else None
+        interfaces = tuple(self.class_name(self.u2()) for _ in range(self.u2()))
+
+        fields = []
+        for _ in range(self.u2()):
+            flags, name_idx, descriptor_idx = self.u2(), self.u2(), self.u2()
+            self.skip_attributes()
+            fields.append(
+                ClassFileField(
+                    self.utf8(name_idx),
+                    descriptor_to_type(self.utf8(descriptor_idx)),
+                    flags,
+                )
+            )
+
+        methods = []
+        for _ in range(self.u2()):
+            flags, name_idx, descriptor_idx = self.u2(), self.u2(), self.u2()
+            exceptions: tuple[str, ...] = ()
+            for _ in range(self.u2()):
+                attribute_name, length = self.utf8(self.u2()), self.u4()
+                end = self.offset + length
+                if attribute_name == "Exceptions":
+                    exceptions = tuple(
+                        self.class_name(self.u2()) for _ in range(self.u2())
+                    )
+                self.offset = end
+            params, ret = parse_method_descriptor(self.utf8(descriptor_idx))
+            methods.append(
+                ClassFileMethod(self.utf8(name_idx), params, ret, flags, exceptions)
+            )
+
+        return ClassFile(
+            name=name,
+            access_flags=access_flags,
+            superclass=superclass,
+            interfaces=interfaces,
+            fields=tuple(fields),
+            methods=tuple(methods),
+        )
+
+    def skip_attributes(self):
+        for _ in range(self.u2()):
+            self.offset += 2
+            length = self.u4()
+            self.offset += length
@@ -0,0 +1,144 @@
+"""Program-wide index of the string and class constants used by each method.
+
+Built during conversion (Lifter(index_constants=True)), so that questions like
+"which methods use this URL" are dictionary lookups instead of walks over the
+whole IR.
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import TYPE_CHECKING
+
+from .descriptors import descriptor_to_type
+from .errors import DescriptorFormatError, ParameterError
+from .sootir.soot_value import SootClassConstant, SootStringConstant
+from .sootir.visitor import StmtLocation, iter_class_statements, iter_values
+
+if TYPE_CHECKING:
+    from .sootir.soot_class import SootClass
+
+
+# a statement using a constant
+ConstantUse = StmtLocation
+
+
+class ConstantIndex:
+    """Maps every string constant, and every class constant (by class name,
+    e.g. "java.lang.String" or "int[]"), to the statements using it.
+
+    A statement using the same constant several times is listed once per use.
+    """
+
+    def __init__(self):
+        self.strings: dict[str, list[ConstantUse]] = {}
+        self.classes: dict[str, list[ConstantUse]] = {}
+        # sorted keys for prefix lookups, by kind; dropped on every change
+        self._sorted: dict[str, list[str]] = {}
+
+    def __getstate__(self):
+        return {"strings": self.strings, "classes": self.classes}
+
+    def __setstate__(self, state):
+        self.strings = state["strings"]
+        self.classes = state["classes"]
+        self._sorted = {}
+
+    def _map(self, kind: str) -> dict[str, list[ConstantUse]]:
+        if kind == "string":
+            return self.strings
+        if kind == "class":
+            return self.classes
+        raise ParameterError("kind needs to be 'string' or 'class'")
+
+    def add(self, kind: str, value: str, use: ConstantUse):
+        if kind == "class":
+            value = _class_name(value)
+        index = self._map(kind)
+        uses = index.get(value)
+        if uses is None:
+            index[value] = [use]
+            self._sorted.pop(kind, None)
+        else:
+            uses.append(use)
+
+    def add_class(self, soot_class: SootClass):
+        """Index the constants of an already converted class."""
+        for method, stmt in iter_class_statements(soot_class):
+            for constant in iter_values(stmt):
+                if isinstance(constant, SootStringConstant):
+                    kind = "string"
+                elif isinstance(constant, SootClassConstant):
+                    kind = "class"
+                else:
+                    continue
+                self.add(kind, constant.value, StmtLocation.of(method, stmt.label))
+
+    def update(self, other: ConstantIndex):
+        """Add the uses recorded by other (e.g. by another shard)."""
+        for kind in ("string", "class"):
+            for value, uses in other._map(kind).items():
+                index = self._map(kind)
+                if value in index:
+                    index[value].extend(uses)
+                else:
+                    index[value] = list(uses)
+                    self._sorted.pop(kind, None)
+
+    def lookup(self, value: str, kind: str = "string") -> list[ConstantUse]:
+        return self._map(kind).get(value, [])
+
+    def prefix_lookup(
+        self, prefix: str, kind: str = "string"
+    ) -> dict[str, list[ConstantUse]]:
+        """The uses of every constant starting with prefix, by constant."""
+        index = self._map(kind)
+        keys = self._sorted.get(kind)
+        if keys is None:
+            keys = self._sorted[kind] = sorted(index)
+        result = {}
+        for key in keys[bisect.bisect_left(keys, prefix) :]:
+            if not key.startswith(prefix):
+                break
+            result[key] = index[key]
+        return result
+
+    def method_recorder(
+        self, class_name: str, method_name: str, method_params: tuple[str, ...]
+    ) -> MethodConstants:
+        return MethodConstants(self, class_name, method_name, method_params)
+
+
+class MethodConstants:
+    """Collects the constants found while converting a statement of one
+    method; flush() files them under the statement's label."""
+
+    __slots__ = ("index", "class_name", "method_name", "method_params", "found")
+
+    def __init__(
+        self,
+        index: ConstantIndex,
+        class_name: str,
+        method_name: str,
+        method_params: tuple[str, ...],
+    ):
+        self.index = index
+        self.class_name = class_name
+        self.method_name = method_name
+        self.method_params = method_params
+        self.found: list[tuple[str, str]] = []
+
+    def flush(self, label: int):
+        use = StmtLocation(self.class_name, self.method_name, self.method_params, label)
+        for kind, value in self.found:
+            self.index.add(kind, value, use)
+        self.found.clear()
+
+
+def _class_name(value: str) -> str:
+    # Soot gives class constants as descriptors ("Ljava/lang/String;") or,
+    # in older versions, as internal names ("java/lang/String")
+    try:
+        return descriptor_to_type(value)
+    except DescriptorFormatError:
+        return value.replace("/", ".")
@@ -0,0 +1,66 @@
+"""Type descriptors and Modified UTF-8, shared by the class file and dex
+readers and by the IR indexes.
+
+Types are converted to Soot's notation, e.g. "java.lang.String" or "int[]".
+"""
+
+from __future__ import annotations
+
+from .errors import DescriptorFormatError
+
+_PRIMITIVE_TYPES = {
+    "V": "void",
+    "Z": "boolean",
+    "B": "byte",
+    "S": "short",
+    "C": "char",
+    "I": "int",
+    "J": "long",
+    "F": "float",
+    "D": "double",
+}
+
+
+def descriptor_to_type(descriptor: str) -> str:
+    """Convert a type descriptor to Soot's type notation.
+
+    e.g. "Ljava/lang/String;" -> "java.lang.String", "[[I" -> "int[][]".
+    """
+    dims = len(descriptor) - len(descriptor.lstrip("["))
+    base = descriptor[dims:]
+    if base.startswith("L") and base.endswith(";"):
+        name = base[1:-1].replace("/", ".")
+    elif base in _PRIMITIVE_TYPES:
+        name = _PRIMITIVE_TYPES[base]
+    else:
+        raise DescriptorFormatError(f"invalid type descriptor {descriptor!r}")
+    return name + "[]" * dims
+
+
+def parse_method_descriptor(descriptor: str) -> tuple[tuple[str, ...], str]:
+    """(parameter types, return type) of a method descriptor, e.g.
+    "(I[Ljava/lang/String;)V" -> (("int", "java.lang.String[]"), "void")."""
+    if not descriptor.startswith("("):
+        raise DescriptorFormatError(f"invalid method descriptor {descriptor!r}")
+    params = []
+    i = 1
+    try:
+        while descriptor[i] != ")":
+            start = i
+            while descriptor[i] == "[":
+                i += 1
+            if descriptor[i] == "L":
+                i = descriptor.index(";", i)
+            i += 1
+            params.append(descriptor_to_type(descriptor[start:i]))
+        return tuple(params), descriptor_to_type(descriptor[i + 1 :])
+    except (IndexError, ValueError, DescriptorFormatError) as e:
+        raise DescriptorFormatError(f"invalid method descriptor {descriptor!r}") from e
+
+
+def decode_mutf8(data: bytes) -> str:
+    """Decode Modified UTF-8 (NUL as C0 80, supplementary chars as surrogates)."""
+    text = data.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+    if any("\ud800" <= c <= "\udfff" for c in text):
+        text = text.encode("utf-16-le", "surrogatepass").decode("utf-16-le")
+    return text
@@ -0,0 +1,686 @@
+"""Minimal reader for Dalvik executable (classes*.dex) files.
+
+Only the parts of the format that pysoot needs without running Soot are
+decoded; see https://source.android.com/docs/core/runtime/dex-format
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import struct
+import zipfile
+from dataclasses import dataclass
+from functools import cached_property
+
+from .descriptors import decode_mutf8, descriptor_to_type
+from .errors import DexFormatError
+
+
+NO_INDEX = 0xFFFFFFFF
+
+_DEX_ENTRY_RE = re.compile(r"^classes(\d*)\.dex$")
+
+
+def read_uleb128(data: bytes, offset: int) -> tuple[int, int]:
+    """Return (value, offset of the next byte)."""
+    result = 0
+    shift = 0
+    while True:
+        b = data[offset]
+        offset += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, offset
+        shift += 7
+
+
+def read_sleb128(data: bytes, offset: int) -> tuple[int, int]:
+    """Return (value, offset of the next byte)."""
+    value, end = read_uleb128(data, offset)
+    bits = 7 * (end - offset)
+    if value & (1 << (bits - 1)):
+        value -= 1 << bits
+    return value, end
+
+
+def apk_dex_entries(apk_path: str) -> list[str]:
+    """Names of the dex entries of an APK.
+
+    Like Soot's multi-dex loading, any entry with a dex header counts. The
+    classes*.dex entries come first, in multidex order (classes.dex,
+    classes2.dex, ..., classes10.dex), followed by the others by name.
+    """
+    with zipfile.ZipFile(apk_path) as apk:
+        names = []
+        for info in apk.infolist():
+            if info.is_dir():
+                continue
+            with apk.open(info) as f:
+                if f.read(4) == b"dex\n":
+                    names.append(info.filename)
+
+    def multidex_key(name: str) -> tuple[int, int, str]:
+        m = _DEX_ENTRY_RE.match(name)
+        if m is None:
+            return (1, 0, name)
+        return (0, int(m.group(1) or 1), name)
+
+    return sorted(names, key=multidex_key)
+
+
+@dataclass(slots=True, frozen=True)
+class DexField:
+    name: str
+    type: str
+    access_flags: int
+
+
+@dataclass(slots=True, frozen=True)
+class DexMethod:
+    method_idx: int
+    name: str
+    params: tuple[str, ...]
+    ret: str
+    access_flags: int
+    code_off: int
+
+
+@dataclass(slots=True, frozen=True)
+class DexClass:
+    """A class_def_item with its class_data_item. Types are descriptors."""
+
+    descriptor: str
+    access_flags: int
+    superclass: str | None
+    interfaces: tuple[str, ...]
+    static_fields: tuple[DexField, ...]
+    instance_fields: tuple[DexField, ...]
+    direct_methods: tuple[DexMethod, ...]
+    virtual_methods: tuple[DexMethod, ...]
+    annotations_off: int
+    static_values_off: int
+
+    @property
+    def name(self) -> str:
+        return descriptor_to_type(self.descriptor)
+
+
+@dataclass(slots=True, frozen=True)
+class DexAnnotation:
+    visibility: int | None
+    type: str
+    elements: tuple[tuple[str, object], ...]
+
+
+# ---------- instruction formats ----------
+# Width (in 16-bit code units) of each instruction format.
+_FORMAT_WIDTHS = {
+    "10x": 1,
+    "12x": 1,
+    "11n": 1,
+    "11x": 1,
+    "10t": 1,
+    "20t": 2,
+    "22x": 2,
+    "21t": 2,
+    "21s": 2,
+    "21h": 2,
+    "21c": 2,
+    "23x": 2,
+    "22b": 2,
+    "22t": 2,
+    "22s": 2,
+    "22c": 2,
+    "30t": 3,
+    "32x": 3,
+    "31i": 3,
+    "31t": 3,
+    "31c": 3,
+    "35c": 3,
+    "3rc": 3,
+    "45cc": 4,
+    "4rcc": 4,
+    "51l": 5,
+}
+# (first opcode, last opcode, format, kind of the index operand)
+_OPCODE_RANGES = (
+    (0x00, 0x00, "10x", None),
+    (0x01, 0x01, "12x", None),
+    (0x02, 0x02, "22x", None),
+    (0x03, 0x03, "32x", None),
+    (0x04, 0x04, "12x", None),
+    (0x05, 0x05, "22x", None),
+    (0x06, 0x06, "32x", None),
+    (0x07, 0x07, "12x", None),
+    (0x08, 0x08, "22x", None),
+    (0x09, 0x09, "32x", None),
+    (0x0A, 0x0D, "11x", None),
+    (0x0E, 0x0E, "10x", None),
+    (0x0F, 0x11, "11x", None),
+    (0x12, 0x12, "11n", None),
+    (0x13, 0x13, "21s", None),
+    (0x14, 0x14, "31i", None),
+    (0x15, 0x15, "21h", None),
+    (0x16, 0x16, "21s", None),
+    (0x17, 0x17, "31i", None),
+    (0x18, 0x18, "51l", None),
+    (0x19, 0x19, "21h", None),
+    (0x1A, 0x1A, "21c", "string"),
+    (0x1B, 0x1B, "31c", "string"),
+    (0x1C, 0x1C, "21c", "type"),
+    (0x1D, 0x1E, "11x", None),
+    (0x1F, 0x1F, "21c", "type"),
+    (0x20, 0x20, "22c", "type"),
+    (0x21, 0x21, "12x", None),
+    (0x22, 0x22, "21c", "type"),
+    (0x23, 0x23, "22c", "type"),
+    (0x24, 0x24, "35c", "type"),
+    (0x25, 0x25, "3rc", "type"),
+    (0x26, 0x26, "31t", None),
+    (0x27, 0x27, "11x", None),
+    (0x28, 0x28, "10t", None),
+    (0x29, 0x29, "20t", None),
+    (0x2A, 0x2A, "30t", None),
+    (0x2B, 0x2C, "31t", None),
+    (0x2D, 0x31, "23x", None),
+    (0x32, 0x37, "22t", None),
+    (0x38, 0x3D, "21t", None),
+    (0x3E, 0x43, "10x", None),
+    (0x44, 0x51, "23x", None),
+    (0x52, 0x5F, "22c", "field"),
+    (0x60, 0x6D, "21c", "field"),
+    (0x6E, 0x72, "35c", "method"),
+    (0x73, 0x73, "10x", None),
+    (0x74, 0x78, "3rc", "method"),
+    (0x79, 0x7A, "10x", None),
+    (0x7B, 0x8F, "12x", None),
+    (0x90, 0xAF, "23x", None),
+    (0xB0, 0xCF, "12x", None),
+    (0xD0, 0xD7, "22s", None),
+    (0xD8, 0xE2, "22b", None),
+    (0xE3, 0xF9, "10x", None),
+    (0xFA, 0xFA, "45cc", "method"),
+    (0xFB, 0xFB, "4rcc", "method"),
+    (0xFC, 0xFC, "35c", "call_site"),
+    (0xFD, 0xFD, "3rc", "call_site"),
+    (0xFE, 0xFE, "21c", "method_handle"),
+    (0xFF, 0xFF, "21c", "proto"),
+)
+# opcode -> (width, index kind, format)
+_OPCODES: list[tuple[int, str | None, str]] = [(1, None, "10x")] * 256
+for _first, _last, _fmt, _kind in _OPCODE_RANGES:
+    for _op in range(_first, _last + 1):
+        _OPCODES[_op] = (_FORMAT_WIDTHS[_fmt], _kind, _fmt)
+del _first, _last, _fmt, _kind, _op
+
+# identifiers of the pseudo-instructions that hold switch and array data
+_PACKED_SWITCH_PAYLOAD = 0x0100
+_SPARSE_SWITCH_PAYLOAD = 0x0200
+_FILL_ARRAY_DATA_PAYLOAD = 0x0300
+
+
+class DexFile:
+    """A parsed dex file. Tables are decoded lazily, on first use."""
+
+    def __init__(self, data: bytes):
+        if data[:4] != b"dex\n" or len(data) < 0x70:
+            raise DexFormatError("not a dex file")
+        if struct.unpack_from("<I", data, 0x28)[0] != 0x12345678:
+            raise DexFormatError("big-endian dex files are not supported")
+        self.data = data
+        (
+            self._string_ids_size,
+            self._string_ids_off,
+            self._type_ids_size,
+            self._type_ids_off,
+            self._proto_ids_size,
+            self._proto_ids_off,
+            self._field_ids_size,
+            self._field_ids_off,
+            self._method_ids_size,
+            self._method_ids_off,
+            self._class_defs_size,
+            self._class_defs_off,
+        ) = struct.unpack_from("<12I", data, 0x38)
+        self._strings: dict[int, str] = {}
+
+    @classmethod
+    def from_apk(cls, apk_path: str, entry: str) -> DexFile:
+        with zipfile.ZipFile(apk_path) as apk:
+            return cls(apk.read(entry))
+
+    # ---------- id tables ----------
+
+    @cached_property
+    def _string_offsets(self) -> tuple[int, ...]:
+        return struct.unpack_from(
+            f"<{self._string_ids_size}I", self.data, self._string_ids_off
+        )
+
+    def string(self, idx: int) -> str:
+        try:
+            return self._strings[idx]
+        except KeyError:
+            pass
+        offset = self._string_offsets[idx]
+        # the ULEB128 prefix is the length in UTF-16 code units, not in bytes
+        _, start = read_uleb128(self.data, offset)
+        end = self.data.index(b"\x00", start)
+        string = self._strings[idx] = decode_mutf8(self.data[start:end])
+        return string
+
+    @cached_property
+    def type_descriptors(self) -> tuple[str, ...]:
+        string_idxs = struct.unpack_from(
+            f"<{self._type_ids_size}I", self.data, self._type_ids_off
+        )
+        return tuple(self.string(i) for i in string_idxs)
+
+    def type_name(self, type_idx: int) -> str:
+        return descriptor_to_type(self.type_descriptors[type_idx])
+
+    def _type_list(self, offset: int) -> tuple[str, ...]:
+        if offset == 0:
+            return ()
+        (size,) = struct.unpack_from("<I", self.data, offset)
+        idxs = struct.unpack_from(f"<{size}H", self.data, offset + 4)
+        return tuple(self.type_descriptors[i] for i in idxs)
+
+    @cached_property
+    def protos(self) -> tuple[tuple[tuple[str, ...], str], ...]:
+        """(parameter descriptors, return descriptor) of every proto_id."""
+        protos = []
+        for i in range(self._proto_ids_size):
+            _, ret_idx, params_off = struct.unpack_from(
+                "<3I", self.data, self._proto_ids_off + 12 * i
+            )
+            protos.append((self._type_list(params_off), self.type_descriptors[ret_idx]))
+        return tuple(protos)
+
+    def field_ref(self, idx: int) -> tuple[str, str, str]:
+        """(class descriptor, name, type descriptor) of a field_id."""
+        class_idx, type_idx, name_idx = struct.unpack_from(
+            "<HHI", self.data, self._field_ids_off + 8 * idx
+        )
+        return (
+            self.type_descriptors[class_idx],
+            self.string(name_idx),
+            self.type_descriptors[type_idx],
+        )
+
+    def method_ref(self, idx: int) -> tuple[str, str, tuple[str, ...], str]:
+        """(class descriptor, name, parameter descriptors, return descriptor)
+        of a method_id."""
+        class_idx, proto_idx, name_idx = struct.unpack_from(
+            "<HHI", self.data, self._method_ids_off + 8 * idx
+        )
+        params, ret = self.protos[proto_idx]
+        return (self.type_descriptors[class_idx], self.string(name_idx), params, ret)
+
+    # ---------- classes ----------
+
+    def class_names(self) -> list[str]:
+        """Names of the classes defined in this file, in class_defs order."""
+        return [
+            self.type_name(
+                struct.unpack_from("<I", self.data, self._class_defs_off + 32 * i)[0]
+            )
+            for i in range(self._class_defs_size)
+        ]
+
+    def classes(self) -> list[DexClass]:
+        """Every class defined in this file, in class_defs order."""
+        return [self._class_def(i) for i in range(self._class_defs_size)]
+
+    def _class_def(self, i: int) -> DexClass:
+        (
+            class_idx,
+            access_flags,
+            superclass_idx,
+            interfaces_off,
+            _,  # source_file_idx
+            annotations_off,
+            class_data_off,
+            static_values_off,
+        ) = struct.unpack_from("<8I", self.data, self._class_defs_off + 32 * i)
+
+        fields: list[tuple[DexField, ...]] = [(), ()]
+        methods: list[tuple[DexMethod, ...]] = [(), ()]
+        if class_data_off:
+            sizes = []
+            offset = class_data_off
+            for _ in range(4):
+                size, offset = read_uleb128(self.data, offset)
+                sizes.append(size)
+            for kind in range(2):
+                fields[kind], offset = self._encoded_fields(offset, sizes[kind])
+            for kind in range(2):
+                methods[kind], offset = self._encoded_methods(offset, sizes[2 + kind])
+
+        return DexClass(
+            descriptor=self.type_descriptors[class_idx],
+            access_flags=access_flags,
+            superclass=(
+                None
+                if superclass_idx == NO_INDEX
+                else self.type_descriptors[superclass_idx]
+            ),
+            interfaces=self._type_list(interfaces_off),
+            static_fields=fields[0],
+            instance_fields=fields[1],
+            direct_methods=methods[0],
+            virtual_methods=methods[1],
+            annotations_off=annotations_off,
+            static_values_off=static_values_off,
+        )
+
+    def _encoded_fields(
+        self, offset: int, count: int
+    ) -> tuple[tuple[DexField, ...], int]:
+        fields = []
+        field_idx = 0
+        for _ in range(count):
+            diff, offset = read_uleb128(self.data, offset)
+            access_flags, offset = read_uleb128(self.data, offset)
+            field_idx += diff
+            _, name, type_ = self.field_ref(field_idx)
+            fields.append(DexField(name, type_, access_flags))
+        return tuple(fields), offset
+
+    def _encoded_methods(
+        self, offset: int, count: int
+    ) -> tuple[tuple[DexMethod, ...], int]:
+        methods = []
+        method_idx = 0
+        for _ in range(count):
+            diff, offset = read_uleb128(self.data, offset)
+            access_flags, offset = read_uleb128(self.data, offset)
+            code_off, offset = read_uleb128(self.data, offset)
+            method_idx += diff
+            _, name, params, ret = self.method_ref(method_idx)
+            methods.append(
+                DexMethod(method_idx, name, params, ret, access_flags, code_off)
+            )
+        return tuple(methods), offset
+
+    # ---------- encoded values and annotations ----------
+
+    def encoded_value(self, offset: int) -> tuple[object, int]:
+        """Decode an encoded_value; references to ids are resolved to tuples
+        such as ("type", descriptor) or ("method", class, name, params, ret).
+        Returns (value, offset of the next byte)."""
+        header = self.data[offset]
+        offset += 1
+        value_type, value_arg = header & 0x1F, header >> 5
+        size = value_arg + 1
+
+        if value_type == 0x1C:
+            return self.encoded_array(offset)
+        if value_type == 0x1D:
+            return self.encoded_annotation(offset, None)
+        if value_type == 0x1E:
+            return None, offset
+        if value_type == 0x1F:
+            return bool(value_arg), offset
+
+        raw = self.data[offset : offset + size]
+        offset += size
+        if value_type in (0x00, 0x02, 0x04, 0x06):  # byte, short, int, long
+            return int.from_bytes(raw, "little", signed=True), offset
+        if value_type == 0x03:  # char
+            return int.from_bytes(raw, "little"), offset
+        if value_type == 0x10:  # float: the bytes are the high-order ones
+            return struct.unpack("<f", raw.rjust(4, b"\x00"))[0], offset
+        if value_type == 0x11:
+            return struct.unpack("<d", raw.rjust(8, b"\x00"))[0], offset
+
+        idx = int.from_bytes(raw, "little")
+        if value_type == 0x15:
+            return ("proto", *self.protos[idx]), offset
+        if value_type == 0x16:
+            return ("method_handle", idx), offset
+        if value_type == 0x17:
+            return self.string(idx), offset
+        if value_type == 0x18:
+            return ("type", self.type_descriptors[idx]), offset
+        if value_type in (0x19, 0x1B):  # field, enum
+            return ("field", *self.field_ref(idx)), offset
+        if value_type == 0x1A:
+            return ("method", *self.method_ref(idx)), offset
+        raise DexFormatError(f"invalid encoded_value type {value_type:#x}")
+
+    def encoded_array(self, offset: int) -> tuple[tuple, int]:
+        size, offset = read_uleb128(self.data, offset)
+        values = []
+        for _ in range(size):
+            value, offset = self.encoded_value(offset)
+            values.append(value)
+        return tuple(values), offset
+
+    def encoded_annotation(
+        self, offset: int, visibility: int | None
+    ) -> tuple[DexAnnotation, int]:
+        type_idx, offset = read_uleb128(self.data, offset)
+        size, offset = read_uleb128(self.data, offset)
+        elements = []
+        for _ in range(size):
+            name_idx, offset = read_uleb128(self.data, offset)
+            value, offset = self.encoded_value(offset)
+            elements.append((self.string(name_idx), value))
+        annotation = DexAnnotation(
+            visibility, self.type_descriptors[type_idx], tuple(elements)
+        )
+        return annotation, offset
+
+    def static_values(self, dex_class: DexClass) -> tuple:
+        """Initial values of the leading static fields of a class."""
+        if not dex_class.static_values_off:
+            return ()
+        return self.encoded_array(dex_class.static_values_off)[0]
+
+    def _annotation_set(self, offset: int) -> tuple[DexAnnotation, ...]:
+        if offset == 0:
+            return ()
+        (size,) = struct.unpack_from("<I", self.data, offset)
+        annotations = []
+        for item_off in struct.unpack_from(f"<{size}I", self.data, offset + 4):
+            visibility = self.data[item_off]
+            annotations.append(self.encoded_annotation(item_off + 1, visibility)[0])
+        return tuple(annotations)
+
+    def annotations(
+        self, dex_class: DexClass
+    ) -> tuple[
+        tuple[DexAnnotation, ...],
+        dict[int, tuple[DexAnnotation, ...]],
+        dict[int, tuple[DexAnnotation, ...]],
+        dict[int, tuple[tuple[DexAnnotation, ...], ...]],
+    ]:
+        """(class annotations, field annotations by field_idx, method
+        annotations by method_idx, parameter annotations by method_idx)."""
+        if not dex_class.annotations_off:
+            return (), {}, {}, {}
+        offset = dex_class.annotations_off
+        class_off, n_fields, n_methods, n_params = struct.unpack_from(
+            "<4I", self.data, offset
+        )
+        offset += 16
+        field_annotations = {}
+        for _ in range(n_fields):
+            idx, set_off = struct.unpack_from("<2I", self.data, offset)
+            field_annotations[idx] = self._annotation_set(set_off)
+            offset += 8
+        method_annotations = {}
+        for _ in range(n_methods):
+            idx, set_off = struct.unpack_from("<2I", self.data, offset)
+            method_annotations[idx] = self._annotation_set(set_off)
+            offset += 8
+        param_annotations = {}
+        for _ in range(n_params):
+            idx, list_off = struct.unpack_from("<2I", self.data, offset)
+            (size,) = struct.unpack_from("<I", self.data, list_off)
+            set_offs = struct.unpack_from(f"<{size}I", self.data, list_off + 4)
+            param_annotations[idx] = tuple(self._annotation_set(o) for o in set_offs)
+            offset += 8
+        return (
+            self._annotation_set(class_off),
+            field_annotations,
+            method_annotations,
+            param_annotations,
+        )
+
+    # ---------- code ----------
+
+    def _resolve_index(self, kind: str, idx: int) -> tuple:
+        if kind == "string":
+            return (kind, self.string(idx))
+        if kind == "type":
+            return (kind, self.type_descriptors[idx])
+        if kind == "field":
+            return (kind, *self.field_ref(idx))
+        if kind == "method":
+            return (kind, *self.method_ref(idx))
+        if kind == "proto":
+            return (kind, *self.protos[idx])
+        # call sites and method handles are kept as raw indices
+        return (kind, idx)
+
+    def canonical_code(self, code_off: int) -> tuple:
+        """A code_item with every index operand replaced by what it refers to,
+        so that identical code compiled into different dex files compares
+        equal. Debug info is left out."""
+        registers, ins, outs, tries_size, _, insns_size = struct.unpack_from(
+            "<4H2I", self.data, code_off
+        )
+        insns_off = code_off + 16
+        insns = bytearray(self.data[insns_off : insns_off + 2 * insns_size])
+        refs = []
+        pc = 0
+        while pc < insns_size:
+            unit = insns[2 * pc] | insns[2 * pc + 1] << 8
+            opcode = unit & 0xFF
+            if opcode == 0 and unit in (
+                _PACKED_SWITCH_PAYLOAD,
+                _SPARSE_SWITCH_PAYLOAD,
+                _FILL_ARRAY_DATA_PAYLOAD,
+            ):
+                pc += self._payload_width(insns, pc, unit)
+                continue
+            width, kind, fmt = _OPCODES[opcode]
+            if kind is not None:
+                at = 2 * pc + 2
+                if fmt == "31c":
+                    refs.append(
+                        self._resolve_index(
+                            kind, int.from_bytes(insns[at : at + 4], "little")
+                        )
+                    )
+                    insns[at : at + 4] = bytes(4)
+                else:
+                    refs.append(
+                        self._resolve_index(
+                            kind, int.from_bytes(insns[at : at + 2], "little")
+                        )
+                    )
+                    insns[at : at + 2] = bytes(2)
+                if fmt in ("45cc", "4rcc"):
+                    at = 2 * pc + 6
+                    refs.append(
+                        self._resolve_index(
+                            "proto", int.from_bytes(insns[at : at + 2], "little")
+                        )
+                    )
+                    insns[at : at + 2] = bytes(2)
+            pc += width
+
+        tries = ()
+        handlers = ()
+        if tries_size:
+            tries_off = insns_off + 2 * insns_size + (2 if insns_size % 2 else 0)
+            tries = tuple(
+                struct.unpack_from("<IHH", self.data, tries_off + 8 * i)
+                for i in range(tries_size)
+            )
+            handlers = self._catch_handlers(tries_off + 8 * tries_size)
+
+        return (registers, ins, outs, bytes(insns), tuple(refs), tries, handlers)
+
+    @staticmethod
+    def _payload_width(insns: bytearray, pc: int, ident: int) -> int:
+        size = insns[2 * pc + 2] | insns[2 * pc + 3] << 8
+        if ident == _PACKED_SWITCH_PAYLOAD:
+            return size * 2 + 4
+        if ident == _SPARSE_SWITCH_PAYLOAD:
+            return size * 4 + 2
+        element_width = size
+        count = int.from_bytes(insns[2 * pc + 4 : 2 * pc + 8], "little")
+        return (count * element_width + 1) // 2 + 4
+
+    def _catch_handlers(self, offset: int) -> tuple:
+        """The encoded_catch_handler_list at offset, with resolved types."""
+        handlers = []
+        size, offset = read_uleb128(self.data, offset)
+        for _ in range(size):
+            count, offset = read_sleb128(self.data, offset)
+            pairs = []
+            for _ in range(abs(count)):
+                type_idx, offset = read_uleb128(self.data, offset)
+                addr, offset = read_uleb128(self.data, offset)
+                pairs.append((self.type_descriptors[type_idx], addr))
+            catch_all = None
+            if count <= 0:
+                catch_all, offset = read_uleb128(self.data, offset)
+            handlers.append((tuple(pairs), catch_all))
+        return tuple(handlers)
+
+    def class_digest(self, dex_class: DexClass) -> bytes:
+        """SHA-256 of a class' content, independent of the rest of the file.
+
+        Indices into the file's tables are resolved to what they refer to, so
+        a class compiled into two different dex files gets the same digest.
+        Source file names and debug info are not included.
+        """
+        digest = hashlib.sha256()
+        class_annotations, field_annotations, method_annotations, params = (
+            self.annotations(dex_class)
+        )
+        digest.update(
+            repr(
+                (
+                    dex_class.descriptor,
+                    dex_class.access_flags,
+                    dex_class.superclass,
+                    dex_class.interfaces,
+                    dex_class.static_fields,
+                    dex_class.instance_fields,
+                    self.static_values(dex_class),
+                    class_annotations,
+                    sorted(
+                        (self.field_ref(i), a) for i, a in field_annotations.items()
+                    ),
+                )
+            ).encode()
+        )
+        for method in dex_class.direct_methods + dex_class.virtual_methods:
+            code = self.canonical_code(method.code_off) if method.code_off else None
+            digest.update(
+                repr(
+                    (
+                        method.name,
+                        method.params,
+                        method.ret,
+                        method.access_flags,
+                        method_annotations.get(method.method_idx, ()),
+                        params.get(method.method_idx, ()),
+                    )
+                ).encode()
+            )
+            if code is not None:
+                registers, ins, outs, insns, refs, tries, handlers = code
+                digest.update(
+                    repr((registers, ins, outs, refs, tries, handlers)).encode()
+                )
+                digest.update(len(insns).to_bytes(4, "little"))
+                digest.update(insns)
+        return digest.digest()
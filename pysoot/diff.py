@@ -0,0 +1,82 @@
+"""Differences between two lifts of a program, e.g. two app versions.
+
+Classes and methods are compared by fingerprint (see
+pysoot.sootir.fingerprint) rather than with ==, so unchanged classes are
+skipped with one comparison each once their fingerprints are known. The
+fingerprints are memoized for the duration of one diff_programs call.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from .sootir.fingerprint import FingerprintMemo, class_fingerprint, method_fingerprint
+from .sootir.soot_class import SootClass
+
+# a method is identified by its name and parameter types
+MethodKey = tuple[str, tuple[str, ...]]
+
+
+@dataclass(slots=True, frozen=True)
+class ClassDiff:
+    added_methods: tuple[MethodKey, ...]
+    removed_methods: tuple[MethodKey, ...]
+    changed_methods: tuple[MethodKey, ...]
+    # declaration (superclass, interfaces, attrs or fields) changed
+    declaration_changed: bool
+
+
+@dataclass(slots=True, frozen=True)
+class ProgramDiff:
+    added_classes: tuple[str, ...]
+    removed_classes: tuple[str, ...]
+    changed_classes: dict[str, ClassDiff]
+
+    def __bool__(self):
+        return bool(self.added_classes or self.removed_classes or self.changed_classes)
+
+
+def diff_programs(
+    a: Mapping[str, SootClass],
+    b: Mapping[str, SootClass],
+    ignore_local_names: bool = False,
+) -> ProgramDiff:
+    """Compare two classes maps (e.g. Lifter.classes) and report what b
+    added, removed and changed with respect to a.
+
+    With ignore_local_names, methods that only differ by a consistent
+    renaming of their locals are not reported as changed.
+    """
+    added = tuple(name for name in b if name not in a)
+    removed = tuple(name for name in a if name not in b)
+    changed = {}
+    memo: FingerprintMemo = {}
+    for name, class_a in a.items():
+        class_b = b.get(name)
+        if class_b is None or class_fingerprint(
+            class_a, ignore_local_names, memo
+        ) == class_fingerprint(class_b, ignore_local_names, memo):
+            continue
+        changed[name] = _diff_class(class_a, class_b, ignore_local_names, memo)
+    return ProgramDiff(added, removed, changed)
+
+
+def _diff_class(
+    a: SootClass, b: SootClass, ignore_local_names: bool, memo: FingerprintMemo
+) -> ClassDiff:
+    methods_a = {(m.name, m.params): m for m in a.methods}
+    methods_b = {(m.name, m.params): m for m in b.methods}
+    return ClassDiff(
+        added_methods=tuple(k for k in methods_b if k not in methods_a),
+        removed_methods=tuple(k for k in methods_a if k not in methods_b),
+        changed_methods=tuple(
+            k
+            for k, m in methods_a.items()
+            if k in methods_b
+            and method_fingerprint(m, ignore_local_names, memo)
+            != method_fingerprint(methods_b[k], ignore_local_names, memo)
+        ),
+        declaration_changed=(a.super_class, a.interfaces, a.attrs, a.fields)
+        != (b.super_class, b.interfaces, b.attrs, b.fields),
+    )
@@ -12,3 +12,23 @@ class JavaNotFoundError(PySootError):
 
 class MissingJavaRuntimeJarsError(PySootError):
     pass
+
+
+class DexFormatError(PySootError):
+    pass
+
+
+class DescriptorFormatError(PySootError):
+    pass
+
+
+class WorkerError(PySootError):
+    pass
+
+
+class ClassFormatError(PySootError):
+    pass
+
+
+class ManifestFormatError(PySootError):
+    pass
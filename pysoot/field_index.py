@@ -0,0 +1,57 @@
+"""Index of the statements reading and writing each field.
+
+Jimple and Shimple are three-address code: a field reference only ever
+appears directly as one side of an AssignStmt, so building the index only
+looks at those.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .sootir.soot_statement import AssignStmt
+from .sootir.soot_value import SootInstanceFieldRef, SootStaticFieldRef
+from .sootir.visitor import StmtLocation, iter_class_statements
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .sootir.soot_class import SootClass
+
+
+# fields are identified like in the IR: (name, declaring class)
+FieldKey = tuple[str, str]
+
+
+# a statement reading or writing a field
+FieldAccess = StmtLocation
+
+
+class FieldIndex:
+    """Maps every field to the statements reading it (reads) and writing it
+    (writes)."""
+
+    def __init__(self, classes: Iterable[SootClass] = ()):
+        self.reads: dict[FieldKey, list[FieldAccess]] = {}
+        self.writes: dict[FieldKey, list[FieldAccess]] = {}
+        for soot_class in classes:
+            self.add_class(soot_class)
+
+    def add_class(self, soot_class: SootClass):
+        field_refs = (SootInstanceFieldRef, SootStaticFieldRef)
+        for method, stmt in iter_class_statements(soot_class):
+            if not isinstance(stmt, AssignStmt):
+                continue
+            if isinstance(stmt.left_op, field_refs):
+                index, ref = self.writes, stmt.left_op
+            elif isinstance(stmt.right_op, field_refs):
+                index, ref = self.reads, stmt.right_op
+            else:
+                continue
+            index.setdefault(ref.field, []).append(StmtLocation.of(method, stmt.label))
+
+    def readers(self, field: FieldKey) -> list[FieldAccess]:
+        return self.reads.get(field, [])
+
+    def writers(self, field: FieldKey) -> list[FieldAccess]:
+        return self.writes.get(field, [])
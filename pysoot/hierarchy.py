@@ -0,0 +1,51 @@
+"""Subclass relations computed in Python from direct superclass links.
+
+The results follow soot.Hierarchy.getSubclassesOf: for every class (not
+interface) the list of its direct and indirect subclasses, itself excluded.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+
+def compute_hierarchy(superclasses: Mapping[str, str]) -> dict[str, list[str]]:
+    """Subclass lists of every class in superclasses.
+
+    superclasses maps each class (interfaces left out) to its direct
+    superclass, or to "" for classes without one.
+    """
+    return extend_hierarchy(superclasses, {}, {})
+
+
+def extend_hierarchy(
+    superclasses: Mapping[str, str],
+    base_superclasses: Mapping[str, str],
+    base_hierarchy: Mapping[str, list[str]],
+) -> dict[str, list[str]]:
+    """Subclass lists of the classes in superclasses, which may extend the
+    classes of an already computed base hierarchy.
+
+    The result has an entry for every class in superclasses and, for the base
+    classes that gained subclasses, a new list extending the base one. Base
+    classes whose subclasses did not change are left out: look them up in
+    base_hierarchy.
+    """
+    hierarchy: dict[str, list[str]] = {name: [] for name in superclasses}
+    for name in superclasses:
+        parent = superclasses[name]
+        seen = {name}
+        while parent and parent not in seen:
+            seen.add(parent)
+            if parent in superclasses:
+                hierarchy[parent].append(name)
+                parent = superclasses[parent]
+            elif parent in base_superclasses:
+                if parent not in hierarchy:
+                    hierarchy[parent] = list(base_hierarchy.get(parent, ()))
+                hierarchy[parent].append(name)
+                parent = base_superclasses[parent]
+            else:
+                # phantom or unknown superclass: the chain ends here
+                break
+    return hierarchy
@@ -0,0 +1,108 @@
+"""Caches that make starting pysoot in a fresh process cheaper.
+
+The Java home found by running `java` (when JAVA_HOME is unset) is kept in a
+file, keyed by the java executable, so it is only discovered once per Java
+installation. The jrt-fs.jar derived from it is only looked up once per
+process: checking it costs a stat, less than reading any cache file.
+
+With PYSOOT_APPCDS=1 in the environment, the JVM is started with an AppCDS
+archive of the classes it loads (Soot's included): the first process with a
+given JVM and soot-trunk.jar writes the archive when it exits, the following
+ones map it instead of loading and verifying those classes again. This needs
+JDK 13 or later.
+
+Files go to $PYSOOT_CACHE_DIR, or to pysoot/ in $XDG_CACHE_HOME (~/.cache).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+
+
+_java_homes: dict[str, str] = {}
+_jrt_jars: dict[str, str] = {}
+
+
+def cache_dir() -> str:
+    path = os.environ.get("PYSOOT_CACHE_DIR")
+    if not path:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        path = os.path.join(xdg, "pysoot")
+    return path
+
+
+def cached_java_home(discover: Callable[[], str]) -> str:
+    """The Java home of the `java` on PATH, from the cache or discover()."""
+    java = shutil.which("java")
+    if java is None:
+        return discover()
+    java = os.path.realpath(java)
+    try:
+        key = f"{java}:{os.stat(java).st_mtime_ns}"
+    except OSError:
+        return discover()
+
+    java_home = _java_homes.get(key)
+    if java_home is not None:
+        return java_home
+
+    path = os.path.join(cache_dir(), "java_homes.json")
+    try:
+        with open(path) as f:
+            known = json.load(f)
+    except (OSError, ValueError):
+        known = {}
+    java_home = known.get(key)
+    if java_home is None or not os.path.isdir(java_home):
+        java_home = known[key] = discover()
+        try:
+            _write_atomic(path, json.dumps(known).encode())
+        except OSError:
+            pass  # the cache is an optimization only
+    _java_homes[key] = java_home
+    return java_home
+
+
+def cached_jrt_jar(java_home: str) -> str | None:
+    """The lib/jrt-fs.jar of java_home, None if it has none."""
+    jrt_fs = _jrt_jars.get(java_home)
+    if jrt_fs is None:
+        jrt_fs = os.path.join(java_home, "lib", "jrt-fs.jar")
+        if not os.path.exists(jrt_fs):
+            return None
+        _jrt_jars[java_home] = jrt_fs
+    return jrt_fs
+
+
+def appcds_options(jvm_path: str, class_path: list[str]) -> list[str]:
+    """JVM options using (or, if missing, creating) the AppCDS archive for
+    this JVM and class path; empty unless PYSOOT_APPCDS is set."""
+    if os.environ.get("PYSOOT_APPCDS", "") in ("", "0"):
+        return []
+    identity = [jvm_path]
+    for entry in class_path:
+        st = os.stat(entry)
+        identity.append(f"{entry}:{st.st_size}:{st.st_mtime_ns}")
+    digest = hashlib.sha256("\n".join(identity).encode()).hexdigest()[:16]
+    archive = os.path.join(cache_dir(), f"appcds-{digest}.jsa")
+    if os.path.exists(archive):
+        return ["-XX:SharedArchiveFile=" + archive, "-Xshare:auto"]
+    os.makedirs(cache_dir(), exist_ok=True)
+    return ["-XX:ArchiveClassesAtExit=" + archive]
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
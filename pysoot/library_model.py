@@ -0,0 +1,179 @@
+"""Precomputed models of the JDK and Android platform libraries.
+
+Every lift resolves the same platform classes and derives their subclass
+relations again. A LibraryModel summarizes a platform once: the signatures of
+its classes (fields, methods without bodies) and its hierarchy. Lifts given a
+model read the hierarchy of the platform classes from it instead of asking
+Soot, and Lifter.get_class() falls back to it for classes that were not
+lifted.
+
+Only that hierarchy pass is saved: Soot still resolves the platform classes
+the input references (Scene.loadNecessaryClasses), as typing the bodies
+needs them. Leaving them phantom would change the lifted IR.
+
+The model must describe the platform the lift resolves against: the running
+JDK for JARs, the android.jar matching the APK's target for APKs.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import zipfile
+import zlib
+from collections.abc import Collection, Iterator, Mapping
+
+from .errors import ParameterError
+from .hierarchy import compute_hierarchy, extend_hierarchy
+from .sootir.soot_class import SootClass
+
+
+_MAGIC = b"PYSOOTLM"
+_VERSION = 1
+# magic, format version, length of the compressed header
+_PREAMBLE = struct.Struct("<8sIQ")
+
+
+class LibraryModel:
+    """Class signatures and hierarchy of a platform library.
+
+    superclasses maps every class (interfaces left out) to its direct
+    superclass, hierarchy maps it to its subclasses like
+    Lifter.getSubclassesOf. Class signatures are loaded on first access.
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        superclasses: dict[str, str],
+        hierarchy: dict[str, list[str]],
+        classes: Mapping[str, SootClass],
+    ):
+        self.platform = platform
+        self.superclasses = superclasses
+        self.hierarchy = hierarchy
+        self._classes = dict(classes)
+        self._names = frozenset(self._classes)
+        # set by load(): class name -> (offset, length) of its record
+        self._path: str | None = None
+        self._index: dict[str, tuple[int, int]] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._path is not None:
+            # loaded records can be read again from the file
+            state["_classes"] = {}
+        return state
+
+    def __repr__(self):
+        return f"<LibraryModel {self.platform}, {len(self._names)} classes>"
+
+    def __contains__(self, class_name: str) -> bool:
+        return class_name in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._names))
+
+    def get_class(self, class_name: str) -> SootClass | None:
+        """The (body-less) SootClass of a platform class, or None."""
+        soot_class = self._classes.get(class_name)
+        if soot_class is None and class_name in self._index:
+            offset, length = self._index[class_name]
+            with open(self._path, "rb") as f:
+                f.seek(offset)
+                record = f.read(length)
+            soot_class = pickle.loads(zlib.decompress(record))
+            self._classes[class_name] = soot_class
+        return soot_class
+
+    def extend_hierarchy(self, superclasses: Mapping[str, str]) -> dict[str, list[str]]:
+        """Hierarchy of the classes outside the model (see
+        pysoot.hierarchy.extend_hierarchy); model classes missing from the
+        result keep their subclasses from self.hierarchy."""
+        return extend_hierarchy(superclasses, self.superclasses, self.hierarchy)
+
+    def save(self, path: str):
+        """Write the model; every class is stored as its own compressed record,
+        so that loading only has to read the header."""
+        records = []
+        index = {}
+        offset = 0
+        for name in sorted(self._names):
+            record = zlib.compress(
+                pickle.dumps(self.get_class(name), pickle.HIGHEST_PROTOCOL)
+            )
+            index[name] = (offset, len(record))
+            records.append(record)
+            offset += len(record)
+
+        header = zlib.compress(
+            pickle.dumps(
+                (self.platform, self.superclasses, self.hierarchy, index),
+                pickle.HIGHEST_PROTOCOL,
+            )
+        )
+        with open(path, "wb") as f:
+            f.write(_PREAMBLE.pack(_MAGIC, _VERSION, len(header)))
+            f.write(header)
+            f.writelines(records)
+
+    @classmethod
+    def load(cls, path: str) -> LibraryModel:
+        with open(path, "rb") as f:
+            magic, version, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ParameterError(f"{path} is not a pysoot library model")
+            header = f.read(header_size)
+        platform, superclasses, hierarchy, index = pickle.loads(zlib.decompress(header))
+
+        base = _PREAMBLE.size + header_size
+        model = cls(platform, superclasses, hierarchy, {})
+        model._path = os.path.realpath(path)
+        model._index = {name: (base + o, n) for name, (o, n) in index.items()}
+        model._names = frozenset(index)
+        return model
+
+
+def build_library_model(
+    path: str,
+    android_jar: str | None = None,
+    modules: Collection[str] | None = None,
+) -> LibraryModel:
+    """Summarize a platform library with Soot and save the model to path.
+
+    With android_jar (e.g. ~/Android/Sdk/platforms/android-30/android.jar)
+    the model covers that jar; otherwise it covers the JDK pysoot runs on,
+    optionally only the given modules (e.g. {"java.base"}).
+    """
+    from .lifter import _find_jrt_jar  # pylint: disable=import-outside-toplevel
+    from .soot_manager import convert_library_classes, jdk_class_names  # pylint: disable=import-outside-toplevel
+
+    if android_jar is not None:
+        if modules is not None:
+            raise ParameterError("modules can only be selected for the JDK")
+        android_jar = os.path.realpath(android_jar)
+        with zipfile.ZipFile(android_jar) as jar:
+            class_names = [
+                n.removesuffix(".class").replace("/", ".")
+                for n in jar.namelist()
+                if n.endswith(".class") and not n.endswith("module-info.class")
+            ]
+        platform = os.path.basename(os.path.dirname(android_jar))
+        classes = convert_library_classes(android_jar, class_names)
+    else:
+        class_names, java_version = jdk_class_names(modules)
+        platform = "jdk-" + java_version
+        classes = convert_library_classes(_find_jrt_jar(), class_names)
+
+    superclasses = {
+        c.name: c.super_class for c in classes.values() if "INTERFACE" not in c.attrs
+    }
+    model = LibraryModel(
+        platform, superclasses, compute_hierarchy(superclasses), classes
+    )
+    model.save(path)
+    return LibraryModel.load(path)
@@ -3,8 +3,18 @@ from __future__ import annotations
 import os
 import logging
 import subprocess
+from functools import cached_property
+from typing import TYPE_CHECKING
 
 from .errors import JavaNotFoundError, MissingJavaRuntimeJarsError, ParameterError
+from .java_env import cached_java_home, cached_jrt_jar
+
+if TYPE_CHECKING:
+    from .callgraph import CallGraph
+    from .field_index import FieldIndex
+    from .memory import MemoryReport
+    from .soot_manager import JvmHeapUsage
+    from .sootir.soot_class import SootClass
 
 
 log = logging.getLogger("pysoot.lifter")
@@ -19,19 +29,86 @@ class Lifter:
         additional_jars=None,
         additional_jar_roots=None,
         android_sdk=None,
+        count_jni_calls=False,
+        processes=None,
+        library_model=None,
+        class_cache=None,
+        lazy_bodies=False,
+        max_materialized_bodies=None,
+        max_method_statements=None,
+        max_class_seconds=None,
+        max_lift_seconds=None,
+        index_constants=False,
+        soot_call_graph=None,
+        scene_retention="keep",
+        conversion_threads=None,
+        progress=None,
+        progress_interval=1.0,
+        skeleton=False,
+        warm_scene=False,
+        entry_points=None,
     ):
         self.input_file = os.path.realpath(input_file)
         allowed_irs = ["shimple", "jimple"]
-        if ir_format not in allowed_irs:
-            raise ParameterError("ir_format needs to be in " + repr(allowed_irs))
-        self.ir_format = ir_format
+        # several formats are lifted from one Soot run; classes holds the
+        # first one, classes_by_format all of them
+        ir_formats = (ir_format,) if isinstance(ir_format, str) else tuple(ir_format)
+        if (
+            not ir_formats
+            or len(set(ir_formats)) != len(ir_formats)
+            or any(f not in allowed_irs for f in ir_formats)
+        ):
+            raise ParameterError(
+                "ir_format needs to be in "
+                + repr(allowed_irs)
+                + ", or a sequence of both"
+            )
+        if len(ir_formats) > 1 and not skeleton:
+            both_options = {
+                "processes": processes is not None and processes > 1,
+                "class_cache": class_cache is not None,
+                "lazy_bodies": lazy_bodies,
+                "index_constants": index_constants,
+                "soot_call_graph": soot_call_graph is not None,
+            }
+            used = [name for name, value in both_options.items() if value]
+            if used:
+                raise ParameterError(
+                    "lifting several ir formats cannot use " + ", ".join(used)
+                )
+        self.ir_formats = ir_formats
+        self.ir_format = ir_formats[0]
 
         allowed_formats = ["jar", "apk"]
         if input_format not in allowed_formats:
             raise ParameterError("format needs to be in " + repr(allowed_formats))
         self.input_format = input_format
 
-        if input_format == "jar":
+        self.skeleton = skeleton
+        if skeleton:
+            # skeleton lifts read the input directly: no classpath, no Soot
+            soot_options = {
+                "processes": processes is not None and processes > 1,
+                "class_cache": class_cache is not None,
+                "lazy_bodies": lazy_bodies,
+                "max_method_statements": max_method_statements is not None,
+                "max_class_seconds": max_class_seconds is not None,
+                "max_lift_seconds": max_lift_seconds is not None,
+                "index_constants": index_constants,
+                "soot_call_graph": soot_call_graph is not None,
+                "count_jni_calls": count_jni_calls,
+                "conversion_threads": conversion_threads is not None,
+                "warm_scene": warm_scene,
+                "entry_points": entry_points is not None,
+            }
+            used = [name for name, value in soot_options.items() if value]
+            if used:
+                raise ParameterError(
+                    "skeleton lifts do not run Soot, so they cannot use "
+                    + ", ".join(used)
+                )
+
+        elif input_format == "jar":
             if android_sdk is not None:
                 log.warning(
                     "when input_format is 'jar', setting android_sdk is pointless"
@@ -71,9 +148,161 @@ class Lifter:
                 )
             self.android_sdk = android_sdk
 
+        if processes is not None and (not isinstance(processes, int) or processes < 1):
+            raise ParameterError("processes needs to be a positive integer")
+        self.processes = processes
+
+        if conversion_threads is not None and (
+            not isinstance(conversion_threads, int) or conversion_threads < 1
+        ):
+            raise ParameterError("conversion_threads needs to be a positive integer")
+        self.conversion_threads = conversion_threads
+
+        if isinstance(library_model, str):
+            from .library_model import LibraryModel  # pylint: disable=import-outside-toplevel
+
+            library_model = LibraryModel.load(library_model)
+        self.library_model = library_model
+
+        if isinstance(class_cache, str):
+            from .class_cache import ClassCache  # pylint: disable=import-outside-toplevel
+
+            class_cache = ClassCache(class_cache)
+        self.class_cache = class_cache
+
+        allowed_retentions = ["keep", "on_demand", "release"]
+        if scene_retention not in allowed_retentions:
+            raise ParameterError(
+                "scene_retention needs to be in " + repr(allowed_retentions)
+            )
+        if scene_retention == "release" and lazy_bodies:
+            raise ParameterError(
+                "lazy_bodies needs the Soot Scene, so it cannot be released"
+            )
+        self.scene_retention = scene_retention
+
+        # warm_scene keeps the library classes of the previous warm lift in
+        # the Scene, unless some of them link to the previous input's classes
+        if warm_scene and (
+            scene_retention == "release" or (processes is not None and processes > 1)
+        ):
+            raise ParameterError(
+                "warm_scene reuses the Soot Scene of this process, so it cannot "
+                "be combined with processes or scene_retention='release'"
+            )
+        self.warm_scene = warm_scene
+
+        self.body_store = None
+        if lazy_bodies:
+            if processes is not None and processes > 1:
+                raise ParameterError(
+                    "lazy_bodies needs the Soot Scene, so it cannot use processes"
+                )
+            from .soot_manager import BodyStore  # pylint: disable=import-outside-toplevel
+
+            self.body_store = BodyStore(
+                max_materialized_bodies,
+                release_soot_bodies=scene_retention == "on_demand",
+            )
+        elif max_materialized_bodies is not None:
+            raise ParameterError("max_materialized_bodies requires lazy_bodies")
+
+        self.budget = None
+        limits = (max_method_statements, max_class_seconds, max_lift_seconds)
+        if any(limit is not None for limit in limits):
+            if lazy_bodies:
+                raise ParameterError("conversion budgets do not apply to lazy_bodies")
+            from .soot_manager import ConversionBudget  # pylint: disable=import-outside-toplevel
+
+            self.budget = ConversionBudget(*limits)
+
+        self.constants = None
+        if index_constants:
+            if lazy_bodies:
+                raise ParameterError("index_constants does not apply to lazy_bodies")
+            from .constant_index import ConstantIndex  # pylint: disable=import-outside-toplevel
+
+            self.constants = ConstantIndex()
+
+        self.soot_call_graph = None
+        if soot_call_graph is not None:
+            if processes is not None and processes > 1:
+                raise ParameterError("soot_call_graph cannot use processes")
+            if class_cache is not None or lazy_bodies:
+                # the cg phase runs in runPacks, on the bodies of the
+                # application classes: lazy_bodies skips it and cached
+                # classes are demoted
+                raise ParameterError(
+                    "soot_call_graph cannot be combined with class_cache or lazy_bodies"
+                )
+            from .callgraph import SootCallGraph  # pylint: disable=import-outside-toplevel
+
+            self.soot_call_graph = SootCallGraph(soot_call_graph)
+
+        self.progress = None
+        if progress is not None:
+            if not callable(progress):
+                raise ParameterError("progress needs to be a callable")
+            from .progress import ProgressReporter  # pylint: disable=import-outside-toplevel
+
+            self.progress = ProgressReporter(progress, progress_interval)
+
+        self.reachability = None
+        if entry_points is not None:
+            reachability_options = {
+                "several ir formats": len(ir_formats) > 1,
+                "processes": processes is not None and processes > 1,
+                "class_cache": class_cache is not None,
+                "lazy_bodies": lazy_bodies,
+                "conversion budgets": self.budget is not None,
+                "soot_call_graph": soot_call_graph is not None,
+                "conversion_threads": conversion_threads is not None,
+            }
+            used = [name for name, value in reachability_options.items() if value]
+            if used:
+                raise ParameterError(
+                    "entry_points converts bodies as it reaches them, so it "
+                    "cannot use " + ", ".join(used)
+                )
+            from .reachability import ANDROID_COMPONENTS, Reachability  # pylint: disable=import-outside-toplevel
+
+            if isinstance(entry_points, str):
+                if entry_points != ANDROID_COMPONENTS or input_format != "apk":
+                    raise ParameterError(
+                        "entry_points needs to be a list of method signatures, "
+                        "or 'android-components' for apks"
+                    )
+                self.reachability = Reachability(entry_points)
+            else:
+                self.reachability = Reachability(_parse_entry_points(entry_points))
+
+        self.jni_calls = None
+        if count_jni_calls:
+            from .soot_manager import JNICallCounter  # pylint: disable=import-outside-toplevel
+
+            self.jni_calls = JNICallCounter()
+
         self._get_ir()
+        if self.progress is not None:
+            self.progress.start_phase("done")
 
     def _get_ir(self):
+        # the Scene this lift loaded, if any (skeleton lifts run no Soot,
+        # and sharded ones run it in worker processes only)
+        self._scene = None
+        if self.skeleton:
+            from .skeleton import lift_skeleton  # pylint: disable=import-outside-toplevel
+
+            self.classes, self._hierarchy = lift_skeleton(
+                self.input_file, self.input_format, self.library_model, self.progress
+            )
+            # without bodies, every format is the same
+            self.classes_by_format = {f: self.classes for f in self.ir_formats}
+            return
+        if len(self.ir_formats) > 1:
+            self._get_jimple_and_shimple()
+            return
+
         config = {}
         settings = [
             "input_file",
@@ -85,21 +314,180 @@ class Lifter:
         for s in settings:
             config[s] = str(getattr(self, s, None))
 
-        from .soot_manager import run_soot  # pylint: disable=import-outside-toplevel
+        from .soot_manager import release_scene, run_soot, scene_generation  # pylint: disable=import-outside-toplevel
 
         log.info("Running Soot with the following config: " + repr(config))
-        self.classes, self._hierarchy = run_soot(**config)
+        if self.processes is not None and self.processes > 1:
+            from .parallel import apk_shards, jar_shards, lift_sharded  # pylint: disable=import-outside-toplevel
+
+            # APKs are split by dex file (group), JARs by class name hash
+            if self.input_format == "apk":
+                shards = apk_shards(self.input_file, self.processes)
+            else:
+                shards = jar_shards(self.input_file, self.processes)
+            if len(shards) > 1:
+                self.classes, self._hierarchy = lift_sharded(
+                    config,
+                    shards,
+                    self.jni_calls,
+                    self.budget,
+                    self.constants,
+                    library_model=self.library_model,
+                    class_cache=self.class_cache,
+                    conversion_threads=self.conversion_threads,
+                    progress=self.progress,
+                )
+                self.classes_by_format = {self.ir_format: self.classes}
+                return
+
+        self.classes, self._hierarchy = run_soot(
+            **config,
+            jni_counter=self.jni_calls,
+            library_model=self.library_model,
+            class_cache=self.class_cache,
+            lazy_bodies=self.body_store,
+            budget=self.budget,
+            constant_index=self.constants,
+            soot_call_graph=self.soot_call_graph,
+            conversion_threads=self.conversion_threads,
+            progress=self.progress,
+            warm_scene=self.warm_scene,
+            reachability=self.reachability,
+        )
+        self.classes_by_format = {self.ir_format: self.classes}
+        self._scene = scene_generation()
+        release_scene(self.scene_retention, self._scene)
+
+    def _get_jimple_and_shimple(self):
+        from .soot_manager import release_scene, run_soot, scene_generation  # pylint: disable=import-outside-toplevel
+
+        config = {
+            s: str(getattr(self, s, None))
+            for s in ["input_file", "input_format", "android_sdk", "soot_classpath"]
+        }
+        log.info("Running Soot with the following config: " + repr(config))
+        shimple_classes = {}
+        jimple_classes, self._hierarchy = run_soot(
+            **config,
+            ir_format="jimple",
+            jni_counter=self.jni_calls,
+            library_model=self.library_model,
+            budget=self.budget,
+            conversion_threads=self.conversion_threads,
+            progress=self.progress,
+            shimple_classes=shimple_classes,
+            warm_scene=self.warm_scene,
+        )
+        self.classes_by_format = {
+            f: jimple_classes if f == "jimple" else shimple_classes
+            for f in self.ir_formats
+        }
+        self.classes = self.classes_by_format[self.ir_format]
+        self._scene = scene_generation()
+        release_scene(self.scene_retention, self._scene)
+
+    def release_scene(self, retention: str = "release"):
+        """Free the Soot state this lift still holds, down to retention
+        ("on_demand" or "release", see scene_retention). Does nothing if
+        another lift has replaced the Scene since."""
+        if self._scene is None:
+            return
+        from .soot_manager import release_scene  # pylint: disable=import-outside-toplevel
+
+        if retention == "release" and self.body_store is not None:
+            raise ParameterError(
+                "lazy_bodies needs the Soot Scene, so it cannot be released"
+            )
+        release_scene(retention, self._scene)
+
+    def reach(self, entry_points) -> list[tuple[str, str, tuple[str, ...]]]:
+        """Lift what more entry_points (method signatures) reach, in a lift
+        with entry_points, and return the methods newly reached as (class
+        name, method name, parameter types). classes is updated: the
+        classes that reached new methods are replaced. Needs the Soot Scene
+        of the lift (see scene_retention)."""
+        if self.reachability is None:
+            raise ParameterError("reach() needs a lift with entry_points")
+        reached = self.reachability.expand(_parse_entry_points(entry_points))
+        self.classes = self.reachability.classes()
+        self.classes_by_format = {self.ir_format: self.classes}
+        # built from the previous classes
+        self.__dict__.pop("field_index", None)
+        return reached
+
+    @staticmethod
+    def jvm_heap_usage(collect: bool = False) -> JvmHeapUsage | None:
+        """Heap usage of the JVM of this process, None if it is not running
+        (see pysoot.soot_manager.jvm_heap_usage)."""
+        from .soot_manager import jvm_heap_usage  # pylint: disable=import-outside-toplevel
+
+        return jvm_heap_usage(collect)
 
     def getSubclassesOf(self, class_name: str) -> list[str]:
         """Return pre-computed subclasses of the given class name."""
+        if class_name not in self._hierarchy and self.library_model is not None:
+            return self.library_model.hierarchy.get(class_name, [])
         return self._hierarchy.get(class_name, [])
 
+    @cached_property
+    def field_index(self) -> FieldIndex:
+        """Readers and writers of every field of the lifted classes, built on
+        first access (with lazy_bodies, this materializes every body)."""
+        from .field_index import FieldIndex  # pylint: disable=import-outside-toplevel
+
+        return FieldIndex(self.classes.values())
+
+    def call_graph(self, algorithm: str = "cha") -> CallGraph:
+        """Build the call graph of the lifted classes ("cha" or "rta", see
+        pysoot.callgraph). Methods inherited from classes that were not
+        lifted are found through get_class()."""
+        from .callgraph import CallGraph  # pylint: disable=import-outside-toplevel
+
+        return CallGraph(self.classes.values(), algorithm, self.get_class)
+
+    def memory_report(self) -> MemoryReport:
+        """Objects and approximate bytes of the lifted classes by type, and
+        the JVM heap usage (see pysoot.memory). Lazy bodies count while
+        the body store holds them, not before they are loaded or once they
+        are evicted."""
+        from .memory import memory_report  # pylint: disable=import-outside-toplevel
+
+        return memory_report(self.classes.values())
+
+    def get_class(self, class_name: str) -> SootClass | None:
+        """Return the lifted class with the given name. With a library model,
+        platform classes that were not lifted are looked up in the model
+        (their methods have no bodies)."""
+        soot_class = self.classes.get(class_name)
+        if soot_class is None and self.library_model is not None:
+            soot_class = self.library_model.get_class(class_name)
+        return soot_class
+
+
+def _parse_entry_points(signatures) -> list[tuple[str, str, tuple[str, ...]]]:
+    from .callgraph import parse_method_signature  # pylint: disable=import-outside-toplevel
+
+    if isinstance(signatures, str):
+        raise ParameterError("entry_points needs to be a list of method signatures")
+    entry_points = []
+    for signature in signatures:
+        if not (signature.startswith("<") and signature.endswith(">")):
+            raise ParameterError(
+                f"invalid method signature {signature!r}, expected e.g. "
+                "'<a.B: void main(java.lang.String[])>'"
+            )
+        entry_points.append(parse_method_signature(signature))
+    return entry_points
+
 
 def _get_java_home() -> str:
     # Use $JAVA_HOME if it is set
     if "JAVA_HOME" in os.environ:
         return os.environ["JAVA_HOME"]
+    return cached_java_home(_discover_java_home)
+
 
+def _discover_java_home() -> str:
     # Command to get Java properties
     command = ["java", "-XshowSettings:properties", "-version"]
     # Execute the command and capture the output
@@ -113,8 +501,7 @@ def _get_java_home() -> str:
 
 
 def _find_jrt_jar() -> str:
-    java_home = _get_java_home()
-    jrt_fs = os.path.join(java_home, "lib", "jrt-fs.jar")
-    if not os.path.exists(jrt_fs):
+    jrt_fs = cached_jrt_jar(_get_java_home())
+    if jrt_fs is None:
         raise MissingJavaRuntimeJarsError
     return jrt_fs
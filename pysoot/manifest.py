@@ -0,0 +1,165 @@
+"""Minimal reader for the binary AndroidManifest.xml of APKs.
+
+Only what identifies the components Android can start is decoded: the
+package name, the Application class and the activities, services,
+broadcast receivers and content providers. See the ResXMLTree chunk format
+in frameworks/base/libs/androidfw/include/androidfw/ResourceTypes.h.
+"""
+
+from __future__ import annotations
+
+import struct
+import zipfile
+from dataclasses import dataclass
+
+from .errors import ManifestFormatError
+
+_RES_STRING_POOL_TYPE = 0x0001
+_RES_XML_TYPE = 0x0003
+_RES_XML_START_ELEMENT_TYPE = 0x0102
+_RES_XML_RESOURCE_MAP_TYPE = 0x0180
+_UTF8_FLAG = 0x100
+_TYPE_STRING = 0x03
+_NO_INDEX = 0xFFFFFFFF
+
+# resource ids of the attributes read, for manifests whose attribute names
+# were stripped
+_ATTRIBUTE_IDS = {0x01010003: "name"}
+
+# the manifest elements declaring components, which are also their kinds
+COMPONENT_KINDS = ("activity", "service", "receiver", "provider")
+
+
+@dataclass(slots=True, frozen=True)
+class AndroidManifest:
+    package: str
+    # the android:name of <application>, if the app subclasses Application
+    application: str | None
+    # (kind, class name) of every component, in manifest order
+    components: tuple[tuple[str, str], ...]
+
+    def component_classes(self) -> list[str]:
+        """The Application class (if any) and the component classes, without
+        duplicates."""
+        names = [self.application] if self.application else []
+        names += [name for _, name in self.components]
+        return list(dict.fromkeys(names))
+
+
+def read_manifest(apk_path: str) -> AndroidManifest:
+    with zipfile.ZipFile(apk_path) as apk:
+        try:
+            data = apk.read("AndroidManifest.xml")
+        except KeyError:
+            raise ManifestFormatError(f"{apk_path} has no AndroidManifest.xml")
+    return parse_manifest(data)
+
+
+def parse_manifest(data: bytes) -> AndroidManifest:
+    try:
+        return _parse(data)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ManifestFormatError("truncated or malformed manifest") from e
+
+
+def _parse(data: bytes) -> AndroidManifest:
+    chunk_type, header_size, _ = struct.unpack_from("<HHI", data, 0)
+    if chunk_type != _RES_XML_TYPE:
+        raise ManifestFormatError("not a binary XML file")
+
+    strings: list[str] = []
+    resource_ids: tuple[int, ...] = ()
+    package = ""
+    application = None
+    components = []
+
+    offset = header_size
+    while offset < len(data):
+        chunk_type, header_size, size = struct.unpack_from("<HHI", data, offset)
+        if size < 8:
+            raise ManifestFormatError(f"invalid chunk size {size}")
+        if chunk_type == _RES_STRING_POOL_TYPE:
+            strings = _string_pool(data, offset)
+        elif chunk_type == _RES_XML_RESOURCE_MAP_TYPE:
+            count = (size - header_size) // 4
+            resource_ids = struct.unpack_from(f"<{count}I", data, offset + header_size)
+        elif chunk_type == _RES_XML_START_ELEMENT_TYPE:
+            element, attributes = _start_element(
+                data, offset + header_size, strings, resource_ids
+            )
+            if element == "manifest":
+                package = attributes.get("package", "")
+            elif element == "application":
+                name = attributes.get("name")
+                application = _class_name(package, name) if name else None
+            elif element in COMPONENT_KINDS and "name" in attributes:
+                components.append((element, _class_name(package, attributes["name"])))
+        offset += size
+
+    return AndroidManifest(package, application, tuple(components))
+
+
+def _string_pool(data: bytes, offset: int) -> list[str]:
+    _, header_size, _, count, _, flags, strings_start, _ = struct.unpack_from(
+        "<HHIIIIII", data, offset
+    )
+    offsets = struct.unpack_from(f"<{count}I", data, offset + header_size)
+    utf8 = flags & _UTF8_FLAG
+    strings = []
+    for string_offset in offsets:
+        start = offset + strings_start + string_offset
+        if utf8:
+            # UTF-16 length, then UTF-8 length, each on 1 or 2 bytes
+            _, start = _utf8_length(data, start)
+            length, start = _utf8_length(data, start)
+            strings.append(data[start : start + length].decode("utf-8", "replace"))
+        else:
+            (length,) = struct.unpack_from("<H", data, start)
+            start += 2
+            if length & 0x8000:
+                (low,) = struct.unpack_from("<H", data, start)
+                length = ((length & 0x7FFF) << 16) | low
+                start += 2
+            raw = data[start : start + 2 * length]
+            strings.append(raw.decode("utf-16-le", "replace"))
+    return strings
+
+
+def _utf8_length(data: bytes, offset: int) -> tuple[int, int]:
+    length = data[offset]
+    if length & 0x80:
+        return ((length & 0x7F) << 8) | data[offset + 1], offset + 2
+    return length, offset + 1
+
+
+def _start_element(
+    data: bytes, offset: int, strings: list[str], resource_ids: tuple[int, ...]
+) -> tuple[str, dict[str, str]]:
+    """(element name, attributes with a string value) of a start element
+    whose extension (ResXMLTree_attrExt) is at offset."""
+    _, name_idx, attribute_start, attribute_size, count = struct.unpack_from(
+        "<IIHHH", data, offset
+    )
+    attributes = {}
+    for i in range(count):
+        attribute = offset + attribute_start + i * attribute_size
+        _, attr_name_idx, raw_value, _, _, data_type, value = struct.unpack_from(
+            "<IIIHBBI", data, attribute
+        )
+        attr_name = strings[attr_name_idx] if attr_name_idx < len(strings) else ""
+        if not attr_name and attr_name_idx < len(resource_ids):
+            attr_name = _ATTRIBUTE_IDS.get(resource_ids[attr_name_idx], "")
+        if raw_value != _NO_INDEX:
+            attributes[attr_name] = strings[raw_value]
+        elif data_type == _TYPE_STRING:
+            attributes[attr_name] = strings[value]
+    return strings[name_idx], attributes
+
+
+def _class_name(package: str, name: str) -> str:
+    # ".Main" and "Main" are relative to the package
+    if name.startswith("."):
+        return package + name
+    if "." not in name:
+        return f"{package}.{name}"
+    return name
@@ -0,0 +1,169 @@
+"""Memory accounting for lifted IR.
+
+memory_report walks lift results (e.g. Lifter.classes) and tallies, per
+Python type, the objects it reaches and their approximate size, so that one
+can tell which part of the IR a worker's memory goes to. Sizes are shallow
+(sys.getsizeof): an object's size excludes what it refers to, which is
+counted under its own type. Objects reached more than once (e.g. a block,
+from its method's blocks and basic_cfg, or an interned type name) are
+counted once and reported as shared.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, fields, is_dataclass
+from typing import TYPE_CHECKING, Any
+
+from frozendict import frozendict
+
+from .sootir.soot_method import LazySootMethod
+
+if TYPE_CHECKING:
+    from .soot_manager import JvmHeapUsage
+
+# values that are not allocated per use
+_SKIPPED = (type(None), bool)
+_BODY_FIELDS = frozenset(("blocks", "basic_cfg", "exceptional_preds"))
+
+
+@dataclass(slots=True)
+class TypeUsage:
+    """What the walked IR holds of one type.
+
+    count and size are for distinct objects; references counts every time
+    one of them was reached. shared and shared_size cover the objects
+    reached more than once.
+    """
+
+    count: int = 0
+    size: int = 0
+    references: int = 0
+    shared: int = 0
+    shared_size: int = 0
+
+
+@dataclass(slots=True, frozen=True)
+class MemoryReport:
+    # by type name, largest total size first
+    types: dict[str, TypeUsage]
+    size: int
+    # the JVM heap when the report was made, if the JVM was running
+    jvm_heap: JvmHeapUsage | None = None
+    # lazy methods whose body was not loaded (and not counted)
+    lazy_methods: int = 0
+
+    def format(self) -> str:
+        """The report as a text table."""
+        lines = [
+            f"{'type':<28}{'count':>10}{'bytes':>14}{'shared':>10}{'shared bytes':>14}"
+        ]
+        for name, usage in self.types.items():
+            lines.append(
+                f"{name:<28}{usage.count:>10}{usage.size:>14}"
+                f"{usage.shared:>10}{usage.shared_size:>14}"
+            )
+        lines.append(f"{'total':<28}{'':>10}{self.size:>14}")
+        if self.lazy_methods:
+            lines.append(f"{self.lazy_methods} lazy method bodies not counted")
+        if self.jvm_heap is not None:
+            heap = self.jvm_heap
+            lines.append(
+                f"JVM heap: {heap.used} used, {heap.committed} committed, "
+                f"{heap.max} max"
+            )
+        return "\n".join(lines)
+
+
+def memory_report(roots: Iterable[Any], jvm_heap: bool = True) -> MemoryReport:
+    """Account for everything reachable from roots (e.g.
+    Lifter.classes.values()), and, with jvm_heap, record the JVM heap usage
+    at the same moment.
+
+    The bodies of lazily lifted methods are not materialized by the walk:
+    those already loaded (e.g. held by a BodyStore) are counted, the others
+    are not.
+    """
+    usage: dict[type, TypeUsage] = {}
+    # times every object was reached, by id
+    refs: dict[int, int] = {}
+    # every distinct object, which also keeps the ids unique
+    reached: list[Any] = []
+    lazy_methods = 0
+
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, _SKIPPED):
+            continue
+        n = refs.get(id(obj), 0)
+        refs[id(obj)] = n + 1
+        if n:
+            continue
+        reached.append(obj)
+        if isinstance(obj, LazySootMethod) and not obj.body_loaded():
+            lazy_methods += 1
+        stack.extend(_referents(type(obj))(obj))
+
+    for obj in reached:
+        cls = type(obj)
+        entry = usage.get(cls)
+        if entry is None:
+            entry = usage[cls] = TypeUsage()
+        size = sys.getsizeof(obj)
+        n = refs[id(obj)]
+        entry.count += 1
+        entry.size += size
+        entry.references += n
+        if n > 1:
+            entry.shared += 1
+            entry.shared_size += size
+
+    heap = None
+    if jvm_heap:
+        from .soot_manager import jvm_heap_usage  # pylint: disable=import-outside-toplevel
+
+        heap = jvm_heap_usage()
+
+    types = {
+        cls.__name__: u
+        for cls, u in sorted(usage.items(), key=lambda item: -item[1].size)
+    }
+    return MemoryReport(
+        types=types,
+        size=sum(u.size for u in types.values()),
+        jvm_heap=heap,
+        lazy_methods=lazy_methods,
+    )
+
+
+# type -> function returning the objects an instance refers to
+_referent_getters: dict[type, Callable[[Any], Iterable[Any]]] = {}
+
+
+def _referents(cls: type) -> Callable[[Any], Iterable[Any]]:
+    getter = _referent_getters.get(cls)
+    if getter is None:
+        getter = _referent_getters[cls] = _make_referents(cls)
+    return getter
+
+
+def _make_referents(cls: type) -> Callable[[Any], Iterable[Any]]:
+    if issubclass(cls, (tuple, list, set, frozenset)):
+        return iter
+    if issubclass(cls, (dict, frozendict)):
+        return lambda d: [x for item in d.items() for x in item]
+    if is_dataclass(cls):
+        names = [f.name for f in fields(cls)]
+        if issubclass(cls, LazySootMethod):
+            signature = [name for name in names if name not in _BODY_FIELDS]
+            body = [name for name in names if name in _BODY_FIELDS]
+            # bodies not loaded yet are not loaded by the walk
+            return lambda obj: [
+                getattr(obj, name, None)
+                for name in (body + signature if obj.body_loaded() else signature)
+            ]
+        return lambda obj: [getattr(obj, name, None) for name in names]
+    # str, bytes, numbers...
+    return lambda obj: ()
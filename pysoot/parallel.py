@@ -0,0 +1,169 @@
+"""Lifting a single input across several worker processes.
+
+Every worker runs Soot on the whole input, so that references resolve exactly
+as in a single-process lift, but only converts (and only builds bodies for)
+its own shard of the application classes. The shards are merged back into one
+classes map, in the order a single-process lift would produce.
+
+Workers are spawned rather than forked: JPype cannot start a second JVM in a
+process, and soot_manager shuts the JVM down before forking.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING
+
+from .dex import DexFile, apk_dex_entries
+
+if TYPE_CHECKING:
+    from .constant_index import ConstantIndex
+    from .progress import ProgressReporter
+    from .sootir.soot_class import SootClass
+    from .soot_manager import ConversionBudget, JNICallCounter
+
+
+log = logging.getLogger("pysoot.parallel")
+
+
+def apk_shards(apk_path: str, processes: int) -> list[list[str]]:
+    """Split the classes of an APK into at most `processes` groups of whole
+    dex files, balancing the number of classes per group.
+
+    The grouping only depends on the APK's content, so it is stable across
+    runs.
+    """
+    with zipfile.ZipFile(apk_path) as apk:
+        per_dex = [
+            DexFile(apk.read(entry)).class_names()
+            for entry in apk_dex_entries(apk_path)
+        ]
+
+    groups: list[list[str]] = [[] for _ in range(min(processes, len(per_dex)))]
+    sizes = [0] * len(groups)
+    # largest dex files first, each into the currently smallest group; the
+    # sort is stable, so ties keep multidex order
+    for names in sorted(per_dex, key=len, reverse=True):
+        i = sizes.index(min(sizes))
+        groups[i].extend(names)
+        sizes[i] += len(names)
+    return [g for g in groups if g]
+
+
+def jar_shards(jar_path: str, processes: int) -> list[list[str]]:
+    """Split the classes of a JAR into at most `processes` groups.
+
+    A class goes to the group picked by the CRC32 of its name, so the split
+    is stable across runs and a class keeps its group when others are added
+    or removed.
+    """
+    groups: list[list[str]] = [[] for _ in range(processes)]
+    with zipfile.ZipFile(jar_path) as jar:
+        for entry in jar.namelist():
+            if not entry.endswith(".class") or entry.startswith("META-INF/"):
+                continue
+            if entry.rpartition("/")[2] == "module-info.class":
+                continue
+            name = entry.removesuffix(".class").replace("/", ".")
+            groups[zlib.crc32(name.encode()) % processes].append(name)
+    return [g for g in groups if g]
+
+
+def lift_sharded(
+    config: dict[str, str],
+    shards: list[list[str]],
+    jni_counter: JNICallCounter | None = None,
+    budget: ConversionBudget | None = None,
+    constant_index: ConstantIndex | None = None,
+    progress: ProgressReporter | None = None,
+    **run_soot_kwargs,
+) -> tuple[dict[str, SootClass], dict[str, list[str]]]:
+    """Lift config (run_soot's arguments) with one worker process per shard.
+
+    Returns the same (classes, hierarchy) pair as run_soot. The hierarchy only
+    depends on the full Scene, which every worker loads, so it is computed by
+    the first worker alone. run_soot_kwargs are passed on to every worker.
+
+    Every worker enforces budget on its own, max_lift_seconds included; the
+    methods they truncated are appended to budget.truncated. The constants
+    recorded by every worker are added to constant_index.
+
+    progress is advanced by whole shards, as workers finish.
+    """
+    if progress is not None:
+        progress.start_phase("converting", classes_total=sum(map(len, shards)))
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=mp_context) as pool:
+        futures = [
+            pool.submit(
+                _lift_shard,
+                config,
+                shard,
+                i == 0,
+                jni_counter is not None,
+                budget,
+                constant_index is not None,
+                run_soot_kwargs,
+            )
+            for i, shard in enumerate(shards)
+        ]
+        if progress is not None:
+            for future in as_completed(futures):
+                shard_classes = future.result()[0]
+                progress.advance(
+                    classes=len(shard_classes),
+                    methods=sum(len(c.methods) for c in shard_classes.values()),
+                )
+        results = [f.result() for f in futures]
+
+    converted: dict[str, SootClass] = {}
+    for shard_classes, _, _, shard_counter, shard_budget, shard_index in results:
+        converted.update(shard_classes)
+        if jni_counter is not None:
+            jni_counter.nodes.update(shard_counter.nodes)
+            jni_counter.calls.update(shard_counter.calls)
+        if budget is not None:
+            budget.truncated.extend(shard_budget.truncated)
+        if constant_index is not None:
+            constant_index.update(shard_index)
+
+    _, hierarchy, class_order, _, _, _ = results[0]
+    classes = {name: converted[name] for name in class_order if name in converted}
+    missing = [name for name in class_order if name not in converted]
+    if missing:
+        log.warning(
+            "%d application classes were not in any shard: %r", len(missing), missing
+        )
+    return classes, hierarchy
+
+
+def _lift_shard(
+    config: dict[str, str],
+    shard: list[str],
+    primary: bool,
+    count_jni_calls: bool,
+    budget: ConversionBudget | None,
+    index_constants: bool,
+    run_soot_kwargs: dict,
+):
+    from .constant_index import ConstantIndex  # pylint: disable=import-outside-toplevel
+    from .soot_manager import JNICallCounter, run_soot  # pylint: disable=import-outside-toplevel
+
+    jni_counter = JNICallCounter() if count_jni_calls else None
+    constant_index = ConstantIndex() if index_constants else None
+    class_order: list[str] | None = [] if primary else None
+    classes, hierarchy = run_soot(
+        **config,
+        jni_counter=jni_counter,
+        only_classes=frozenset(shard),
+        compute_hierarchy=primary,
+        class_order=class_order,
+        budget=budget,
+        constant_index=constant_index,
+        **run_soot_kwargs,
+    )
+    return classes, hierarchy, class_order, jni_counter, budget, constant_index
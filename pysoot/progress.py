@@ -0,0 +1,115 @@
+"""Progress reporting for long lifts.
+
+Lifter(progress=callback) calls callback(Progress(...)) when the lift enters
+a new phase and, while classes are converted, at most every
+progress_interval seconds, so that schedulers can spot stuck jobs and
+estimate completion times.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+# in order; "packs" only runs without lazy_bodies, "shimple" when both IR
+# formats are lifted, "call_graph" with soot_call_graph, "hierarchy" in
+# single-process lifts
+PHASES = (
+    "loading",
+    "packs",
+    "converting",
+    "shimple",
+    "call_graph",
+    "hierarchy",
+    "done",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class Progress:
+    """A snapshot of a lift.
+
+    The totals are None until known (methods_total stays None for lifts
+    split across processes, which report whole shards). The throughputs
+    are averages since the "converting" phase started.
+    """
+
+    phase: str
+    classes_done: int
+    classes_total: int | None
+    methods_done: int
+    methods_total: int | None
+    # seconds since the lift started
+    elapsed: float
+    classes_per_second: float
+    methods_per_second: float
+
+
+class ProgressReporter:
+    """Counts converted classes and methods and forwards Progress snapshots
+    to callback: on every phase change, otherwise at most every
+    min_interval seconds. Thread-safe; callback is called from the thread
+    that made progress."""
+
+    def __init__(self, callback: Callable[[Progress], None], min_interval: float = 1.0):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.phase = ""
+        self.classes_done = 0
+        self.classes_total: int | None = None
+        self.methods_done = 0
+        self.methods_total: int | None = None
+        # reentrant, so that callback can take a snapshot
+        self._lock = threading.RLock()
+        self._start = time.monotonic()
+        self._converting_start: float | None = None
+        self._next_report = 0.0
+
+    def start_phase(
+        self,
+        phase: str,
+        classes_total: int | None = None,
+        methods_total: int | None = None,
+    ):
+        with self._lock:
+            self.phase = phase
+            if classes_total is not None:
+                self.classes_total = classes_total
+            if methods_total is not None:
+                self.methods_total = methods_total
+            if phase == "converting" and self._converting_start is None:
+                self._converting_start = time.monotonic()
+            self._report(time.monotonic())
+
+    def advance(self, classes: int = 0, methods: int = 0):
+        with self._lock:
+            self.classes_done += classes
+            self.methods_done += methods
+            now = time.monotonic()
+            if now >= self._next_report:
+                self._report(now)
+
+    def snapshot(self) -> Progress:
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def _snapshot(self, now: float) -> Progress:
+        converting = 0.0
+        if self._converting_start is not None:
+            converting = now - self._converting_start
+        return Progress(
+            phase=self.phase,
+            classes_done=self.classes_done,
+            classes_total=self.classes_total,
+            methods_done=self.methods_done,
+            methods_total=self.methods_total,
+            elapsed=now - self._start,
+            classes_per_second=self.classes_done / converting if converting else 0.0,
+            methods_per_second=self.methods_done / converting if converting else 0.0,
+        )
+
+    def _report(self, now: float):
+        self._next_report = now + self.min_interval
+        self.callback(self._snapshot(now))
@@ -0,0 +1,238 @@
+"""Reachability-driven lifting.
+
+Starting from entry points, a Reachability converts the bodies of the
+methods they transitively invoke only, instead of those of every
+application class. Call targets are resolved by class hierarchy analysis
+over the declarations of all the application classes (see
+pysoot.callgraph). Besides invoke expressions, a method is reached when:
+
+- it is the static initializer of a class whose methods or static fields
+  are used;
+- it overrides a library method, in an application class that reached code
+  allocates: the library may call it back (e.g. Runnable.run, or
+  View.OnClickListener.onClick);
+- it is a lambda body (a synthetic lambda$ method) of a class whose reached
+  code has a dynamic invoke. The IR does not keep the bootstrap arguments
+  of dynamic invokes, so every lambda body of the class is reached, and
+  the targets of method references (e.g. String::length) are not: reach
+  them with more entry points if needed.
+
+For APKs, the entry points can be derived from the manifest: the
+constructors of the Application class and of the components (activities,
+services, receivers and providers), and the library methods they override,
+which include their lifecycle callbacks (onCreate, onReceive...).
+
+Everything reachable from the entry points is converted up front: bodies
+are not loaded on access. Only expand() (Lifter.reach) adds entry points
+later, converting only what they newly reach.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+from .callgraph import CallGraph, MethodSig
+from .sootir.soot_expr import (
+    SootDynamicInvokeExpr,
+    SootInvokeExpr,
+    SootNewExpr,
+    SootStaticInvokeExpr,
+)
+from .sootir.soot_value import SootStaticFieldRef
+from .sootir.visitor import iter_values
+
+if TYPE_CHECKING:
+    from .manifest import AndroidManifest
+    from .progress import ProgressReporter
+    from .sootir.soot_class import SootClass
+
+# the entry points Lifter derives from the manifest of an APK
+ANDROID_COMPONENTS = "android-components"
+
+_INITIALIZERS = ("<init>", "<clinit>")
+
+
+class Reachability:
+    """The methods reached from entry points, with their converted bodies.
+
+    Pass an instance to run_soot (or entry_points to Lifter): run_soot
+    attaches it to the declarations of the application classes and to a
+    loader of method bodies from its Scene, then expands the entry points.
+    Once the Scene is reset, expand() can no longer load bodies.
+    """
+
+    def __init__(self, entry_points: Iterable[MethodSig] | str):
+        # method signatures, or ANDROID_COMPONENTS
+        self.entry_points = (
+            entry_points if isinstance(entry_points, str) else tuple(entry_points)
+        )
+        # every method reached, in order, with its body (None for methods
+        # without one, e.g. abstract ones)
+        self.reached: dict[MethodSig, tuple | None] = {}
+        self._declarations: dict[str, SootClass] = {}
+        self._declared: set[MethodSig] = set()
+        self._get_class: Callable[[str], SootClass | None] | None = None
+        self._load_body: Callable[[MethodSig], tuple | None] | None = None
+        self._graph = CallGraph()
+        self._progress: ProgressReporter | None = None
+        self._allocated: set[str] = set()
+        # class name -> lifted class, None when it reached new methods
+        self._classes: dict[str, SootClass | None] = {}
+
+    def attach(
+        self,
+        declarations: dict[str, SootClass],
+        load_body: Callable[[MethodSig], tuple | None],
+        get_class: Callable[[str], SootClass | None] | None = None,
+        progress: ProgressReporter | None = None,
+    ):
+        """Bind to the application classes of a lift, in lift order, given
+        without bodies. load_body returns the (blocks, basic_cfg,
+        exceptional_preds) of a method, or None if it has no body; get_class
+        finds the declarations of library classes."""
+        self.reached.clear()
+        self._declarations = declarations
+        self._declared = {
+            (c.name, m.name, m.params) for c in declarations.values() for m in c.methods
+        }
+        self._get_class = get_class
+        self._load_body = load_body
+        self._graph = CallGraph(declarations.values(), "cha", get_class)
+        self._progress = progress
+        self._allocated.clear()
+        self._classes.clear()
+
+    def android_entry_points(self, manifest: AndroidManifest) -> list[MethodSig]:
+        """The no-argument constructors of the manifest's application and
+        component classes, and the library methods they override."""
+        entry_points = []
+        for class_name in manifest.component_classes():
+            if class_name not in self._declarations:
+                continue
+            if (class_name, "<init>", ()) in self._declared:
+                entry_points.append((class_name, "<init>", ()))
+            entry_points.extend(self._callbacks(class_name))
+        return entry_points
+
+    def expand(self, entry_points: Iterable[MethodSig]) -> list[MethodSig]:
+        """Reach entry_points (methods of application classes, inherited
+        ones included) and what they transitively invoke; return the
+        methods newly reached, in order."""
+        start = len(self.reached)
+        queue = deque()
+        for class_name, name, params in entry_points:
+            target = self._graph.resolve(class_name, name, params)
+            queue.append(target or (class_name, name, params))
+
+        while queue:
+            method = queue.popleft()
+            if method in self.reached or method not in self._declared:
+                continue
+            class_name = method[0]
+            if class_name not in self._classes:
+                if self._progress is not None:
+                    self._progress.advance(classes=1)
+                queue.append((class_name, "<clinit>", ()))
+            self._classes[class_name] = None
+
+            body = self._load_body(method)
+            self.reached[method] = body
+            if body is None:
+                continue
+            for block in body[0]:
+                for stmt in block.statements:
+                    for value in iter_values(stmt):
+                        if isinstance(value, SootInvokeExpr):
+                            queue.extend(self._graph.invoke_targets(value))
+                            if isinstance(value, SootStaticInvokeExpr):
+                                queue.append((value.class_name, "<clinit>", ()))
+                            elif isinstance(value, SootDynamicInvokeExpr):
+                                queue.extend(self._lambda_bodies(class_name))
+                        elif isinstance(value, SootNewExpr):
+                            allocated = value.base_type
+                            if (
+                                allocated in self._declarations
+                                and allocated not in self._allocated
+                            ):
+                                self._allocated.add(allocated)
+                                queue.append((allocated, "<clinit>", ()))
+                                queue.extend(self._callbacks(allocated))
+                        elif isinstance(value, SootStaticFieldRef):
+                            queue.append((value.field[1], "<clinit>", ()))
+        return list(self.reached)[start:]
+
+    def classes(self) -> dict[str, SootClass]:
+        """The classes with reached methods, in lift order. Reached methods
+        have their body; the other concrete ones have none and get the
+        "Unreached" attr."""
+        classes = {}
+        for class_name, declaration in self._declarations.items():
+            if class_name not in self._classes:
+                continue
+            soot_class = self._classes[class_name]
+            if soot_class is None:
+                soot_class = self._classes[class_name] = self._lift(declaration)
+            classes[class_name] = soot_class
+        return classes
+
+    def _lift(self, declaration: SootClass) -> SootClass:
+        methods = []
+        for method in declaration.methods:
+            body = self.reached.get((declaration.name, method.name, method.params))
+            if body is not None:
+                blocks, basic_cfg, exceptional_preds = body
+                method = replace(
+                    method,
+                    blocks=blocks,
+                    basic_cfg=basic_cfg,
+                    exceptional_preds=exceptional_preds,
+                )
+            elif not {"ABSTRACT", "NATIVE"} & set(method.attrs):
+                method = replace(method, attrs=method.attrs + ("Unreached",))
+            methods.append(method)
+        return replace(declaration, methods=tuple(methods))
+
+    def _lambda_bodies(self, class_name: str) -> list[MethodSig]:
+        """The methods javac generates for the lambdas of class_name."""
+        return [
+            (class_name, m.name, m.params)
+            for m in self._declarations[class_name].methods
+            if m.name.startswith("lambda$")
+        ]
+
+    def _callbacks(self, class_name: str) -> list[MethodSig]:
+        """The methods of class_name (declared or inherited from an
+        application class) overriding the instance methods of its library
+        supertypes."""
+        overridable = set()
+        seen = set()
+        stack = [class_name]
+        while stack:
+            name = stack.pop()
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            soot_class = self._declarations.get(name)
+            if soot_class is None and self._get_class is not None:
+                soot_class = self._get_class(name)
+            if soot_class is None:
+                continue
+            if name not in self._declarations:
+                overridable.update(
+                    (m.name, m.params)
+                    for m in soot_class.methods
+                    if m.name not in _INITIALIZERS
+                    and not {"STATIC", "PRIVATE", "FINAL"} & set(m.attrs)
+                )
+            stack.append(soot_class.super_class)
+            stack.extend(soot_class.interfaces)
+
+        callbacks = []
+        for name, params in sorted(overridable):
+            target = self._graph.resolve(class_name, name, params)
+            if target is not None and target[0] in self._declarations:
+                callbacks.append(target)
+        return callbacks
@@ -0,0 +1,163 @@
+"""Lifting declarations only, without Java.
+
+A skeleton lift reads the class files of a JAR, or the dex files of an APK,
+directly (see pysoot.classfile and pysoot.dex) and returns the same classes
+map and hierarchy as a Soot lift, except that methods have no body. It
+neither needs Java nor starts a JVM, which makes it suitable for triage.
+
+Only the input's own classes are known: the hierarchy relates them to each
+other and, with a library model, to the model's classes.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from typing import TYPE_CHECKING
+
+from frozendict import frozendict
+
+from .classfile import ACC_SUPER, ClassFile, parse_class_file
+from .descriptors import descriptor_to_type
+from .dex import DexClass, DexFile, apk_dex_entries
+from .hierarchy import compute_hierarchy
+from .sootir import convert_soot_attributes
+from .sootir.soot_class import SootClass
+from .sootir.soot_method import SootMethod
+
+if TYPE_CHECKING:
+    from .library_model import LibraryModel
+    from .progress import ProgressReporter
+
+_THROWS = "Ldalvik/annotation/Throws;"
+
+
+def lift_skeleton(
+    input_file: str,
+    input_format: str,
+    library_model: LibraryModel | None = None,
+    progress: ProgressReporter | None = None,
+) -> tuple[dict[str, SootClass], dict[str, list[str]]]:
+    """Return (classes, hierarchy) like run_soot, with bodiless methods.
+
+    Classes come in the order of the input: JAR entries, or dex files in
+    multidex order. A class defined twice keeps its first definition.
+    """
+    if progress is not None:
+        progress.start_phase("converting")
+    classes: dict[str, SootClass] = {}
+    if input_format == "apk":
+        for entry in apk_dex_entries(input_file):
+            dex = DexFile.from_apk(input_file, entry)
+            for dex_class in dex.classes():
+                if dex_class.name not in classes:
+                    classes[dex_class.name] = _from_dex(dex, dex_class)
+                    _advance(progress, classes[dex_class.name])
+    else:
+        with zipfile.ZipFile(input_file) as jar:
+            for entry in jar.namelist():
+                if not entry.endswith(".class") or entry.startswith("META-INF/"):
+                    continue
+                if entry.rpartition("/")[2] == "module-info.class":
+                    continue
+                soot_class = _from_class_file(parse_class_file(jar.read(entry)))
+                if soot_class.name not in classes:
+                    classes[soot_class.name] = soot_class
+                    _advance(progress, soot_class)
+
+    superclasses = {
+        name: c.super_class for name, c in classes.items() if "INTERFACE" not in c.attrs
+    }
+    if library_model is not None:
+        return classes, library_model.extend_hierarchy(superclasses)
+    return classes, compute_hierarchy(superclasses)
+
+
+def _advance(progress: ProgressReporter | None, soot_class: SootClass):
+    if progress is not None:
+        progress.advance(classes=1, methods=len(soot_class.methods))
+
+
+def _method(
+    class_name: str,
+    name: str,
+    params: tuple[str, ...],
+    ret: str,
+    access_flags: int,
+    exceptions: tuple[str, ...],
+) -> SootMethod:
+    return SootMethod(
+        class_name=class_name,
+        name=name,
+        ret=ret,
+        attrs=tuple(convert_soot_attributes(access_flags)),
+        exceptions=exceptions,
+        blocks=(),
+        params=params,
+        basic_cfg=frozendict(),
+        exceptional_preds=frozendict(),
+    )
+
+
+def _from_class_file(class_file: ClassFile) -> SootClass:
+    name = class_file.name
+    return SootClass(
+        name=name,
+        super_class=class_file.superclass or "",
+        interfaces=class_file.interfaces,
+        attrs=tuple(convert_soot_attributes(class_file.access_flags & ~ACC_SUPER)),
+        methods=tuple(
+            _method(name, m.name, m.params, m.ret, m.access_flags, m.exceptions)
+            for m in class_file.methods
+        ),
+        fields=frozendict(
+            (f.name, (tuple(convert_soot_attributes(f.access_flags)), f.type))
+            for f in class_file.fields
+        ),
+    )
+
+
+def _from_dex(dex: DexFile, dex_class: DexClass) -> SootClass:
+    name = dex_class.name
+    throws: dict[int, tuple[str, ...]] = {}
+    if dex_class.annotations_off:
+        for method_idx, annotations in dex.annotations(dex_class)[2].items():
+            for annotation in annotations:
+                if annotation.type != _THROWS:
+                    continue
+                for element, value in annotation.elements:
+                    if element == "value":
+                        throws[method_idx] = tuple(
+                            descriptor_to_type(t[1]) for t in value
+                        )
+
+    methods = tuple(
+        _method(
+            name,
+            m.name,
+            tuple(descriptor_to_type(p) for p in m.params),
+            descriptor_to_type(m.ret),
+            m.access_flags,
+            throws.get(m.method_idx, ()),
+        )
+        for m in dex_class.direct_methods + dex_class.virtual_methods
+    )
+    fields = frozendict(
+        (
+            f.name,
+            (
+                tuple(convert_soot_attributes(f.access_flags)),
+                descriptor_to_type(f.type),
+            ),
+        )
+        for f in dex_class.static_fields + dex_class.instance_fields
+    )
+    return SootClass(
+        name=name,
+        super_class=(
+            descriptor_to_type(dex_class.superclass) if dex_class.superclass else ""
+        ),
+        interfaces=tuple(descriptor_to_type(i) for i in dex_class.interfaces),
+        attrs=tuple(convert_soot_attributes(dex_class.access_flags)),
+        methods=methods,
+        fields=fields,
+    )
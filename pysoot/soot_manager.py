@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import inspect
+import itertools
+import operator
 import os
-from dataclasses import dataclass
-from typing import Any
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Collection, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any
 
 import jpype
 from jpype.types import JClass
 from frozendict import frozendict
 
+from pysoot.class_cache import class_keys
+from pysoot.constant_index import ConstantIndex
+from pysoot.errors import ParameterError, PySootError
+from pysoot.java_env import appcds_options
+from pysoot.manifest import read_manifest
+from pysoot.reachability import ANDROID_COMPONENTS
 from pysoot.sootir import convert_soot_attributes
 from pysoot.sootir.soot_block import SootBlock
 from pysoot.sootir.soot_class import SootClass
@@ -28,7 +43,7 @@ from pysoot.sootir.soot_expr import (
     SootUnopExpr,
     SootVirtualInvokeExpr,
 )
-from pysoot.sootir.soot_method import SootMethod
+from pysoot.sootir.soot_method import LazySootMethod, SootMethod
 from pysoot.sootir.soot_statement import (
     AssignStmt,
     BreakpointStmt,
@@ -63,40 +78,303 @@ from pysoot.sootir.soot_value import (
     SootValue,
 )
 
+if TYPE_CHECKING:
+    from pysoot.callgraph import SootCallGraph
+    from pysoot.class_cache import ClassCache
+    from pysoot.constant_index import MethodConstants
+    from pysoot.library_model import LibraryModel
+    from pysoot.progress import ProgressReporter
+    from pysoot.reachability import Reachability
+
 
 def _start_jvm():
     if jpype.isJVMStarted():
         return
-    jpype.addClassPath(os.path.join(os.path.dirname(__file__), "soot-trunk.jar"))
-    jpype.startJVM("-Xmx2G")
+    soot_jar = os.path.join(os.path.dirname(__file__), "soot-trunk.jar")
+    jpype.addClassPath(soot_jar)
+    jpype.startJVM("-Xmx2G", *appcds_options(jpype.getDefaultJVMPath(), [soot_jar]))
     if os.name != "nt":
         os.register_at_fork(before=jpype.shutdownJVM)
 
 
+# Incremented on every G.reset(), which invalidates all Java objects of the
+# previous Scene (see BodyStore).
+_scene_generation = 0
+
+
+def _reset_scene():
+    global _scene_generation  # pylint: disable=global-statement
+    JClass("soot.G").reset()
+    _scene_generation += 1
+
+
+# What the current Scene was loaded with, if it can be reused by a warm lift
+# (see _clear_application_classes), and the application classes to remove
+_warm_key: tuple | None = None
+_warm_classes: list[str] = []
+
+
+def _clear_application_classes() -> bool:
+    """Remove the classes of the last input from the Scene, keeping the
+    library classes it resolved, so that another input can be loaded.
+
+    The previous application classes (demoted ones included) and the
+    phantom classes, which the new input may define, are removed; the
+    caches derived from them are released.
+
+    A kept class that extends, implements or is nested in a removed one
+    (e.g. a class of additional_jars subclassing one of the input) would
+    keep pointing to it: then nothing is removed and False is returned, so
+    that the Scene gets a full reset instead.
+    """
+    global _scene_generation  # pylint: disable=global-statement
+    Scene = JClass("soot.Scene")
+    scene = Scene.v()
+    previous = set(_warm_classes)
+    removed = []
+    kept = []
+    for raw_class in list(scene.getClasses()):
+        if str(raw_class.getName()) in previous or raw_class.isPhantom():
+            removed.append(raw_class)
+        else:
+            kept.append(raw_class)
+    removed_names = {str(c.getName()) for c in removed}
+    for raw_class in kept:
+        if not removed_names.isdisjoint(_linked_classes(raw_class)):
+            return False
+
+    for raw_class in removed:
+        scene.removeClass(raw_class)
+    scene.releaseCallGraph()
+    scene.releasePointsToAnalysis()
+    scene.releaseReachableMethods()
+    scene.releaseActiveHierarchy()
+    scene.releaseFastHierarchy()
+    # loadNecessaryClasses refuses to resolve more classes once done; the
+    # flag has no setter
+    done_resolving = Scene.class_.getDeclaredField("doneResolving")
+    done_resolving.setAccessible(True)
+    done_resolving.setBoolean(scene, False)
+    _scene_generation += 1
+    return True
+
+
+def _linked_classes(raw_class) -> list[str]:
+    """Names of the classes a SootClass holds direct references to: its
+    superclass, interfaces and outer class."""
+    names = [str(i.getName()) for i in raw_class.getInterfaces()]
+    if raw_class.hasSuperclass():
+        names.append(str(raw_class.getSuperclass().getName()))
+    if raw_class.hasOuterClass():
+        names.append(str(raw_class.getOuterClass().getName()))
+    return names
+
+
+def scene_generation() -> int:
+    """Identifies the current Scene: changes whenever a lift resets it."""
+    return _scene_generation
+
+
+# What release_scene keeps of the Scene of a lift, from most to least
+SCENE_RETENTION = ("keep", "on_demand", "release")
+
+
+def release_scene(retention: str, generation: int | None = None):
+    """Free the part of the current Scene that retention does not keep.
+
+    "keep" frees nothing. "on_demand" keeps the classes and their members,
+    which is all a BodyStore needs, but releases the method bodies Soot
+    built and the whole-program analyses (call graph, points-to, hierarchy).
+    "release" resets the Scene altogether; a BodyStore attached to it can no
+    longer load bodies afterwards.
+
+    If generation (see scene_generation) is given and the Scene has been
+    reset since, it belongs to another lift and is left alone.
+    """
+    if retention not in SCENE_RETENTION:
+        raise ParameterError("retention needs to be in " + repr(SCENE_RETENTION))
+    if retention == "keep" or not jpype.isJVMStarted():
+        return
+    if generation is not None and generation != _scene_generation:
+        return
+
+    if retention == "release":
+        _reset_scene()
+    else:
+        Scene = JClass("soot.Scene")
+        whole_program = JClass("soot.options.Options").v().whole_program()
+        # outside whole-program mode, only application bodies are ever built
+        for raw_class in Scene.v().getClasses():
+            if not (whole_program or raw_class.isApplicationClass()):
+                continue
+            for ir_method in raw_class.getMethods():
+                if ir_method.hasActiveBody():
+                    ir_method.releaseActiveBody()
+        Scene.v().releaseCallGraph()
+        Scene.v().releasePointsToAnalysis()
+        Scene.v().releaseReachableMethods()
+        Scene.v().releaseActiveHierarchy()
+        Scene.v().releaseFastHierarchy()
+    JClass("java.lang.System").gc()
+
+
+@dataclass(slots=True, frozen=True)
+class JvmHeapUsage:
+    """Sizes of the JVM heap, in bytes."""
+
+    used: int
+    committed: int
+    max: int
+
+
+def jvm_heap_usage(collect: bool = False) -> JvmHeapUsage | None:
+    """Current heap usage of the JVM of this process, or None if it has not
+    been started. With collect, a garbage collection is requested first, so
+    that used approximates the live data."""
+    if not jpype.isJVMStarted():
+        return None
+    if collect:
+        JClass("java.lang.System").gc()
+    runtime = JClass("java.lang.Runtime").getRuntime()
+    committed = int(runtime.totalMemory())
+    return JvmHeapUsage(
+        used=committed - int(runtime.freeMemory()),
+        committed=committed,
+        max=int(runtime.maxMemory()),
+    )
+
+
 def run_soot(
     input_file: str,
     input_format: str,
     android_sdk: str | None,
     soot_classpath: str | None,
     ir_format: str,
+    jni_counter: JNICallCounter | None = None,
+    only_classes: Collection[str] | None = None,
+    compute_hierarchy: bool = True,
+    class_order: list[str] | None = None,
+    library_model: LibraryModel | None = None,
+    class_cache: ClassCache | None = None,
+    lazy_bodies: BodyStore | None = None,
+    budget: ConversionBudget | None = None,
+    constant_index: ConstantIndex | None = None,
+    soot_call_graph: SootCallGraph | None = None,
+    conversion_threads: int | None = None,
+    progress: ProgressReporter | None = None,
+    shimple_classes: dict[str, SootClass] | None = None,
+    warm_scene: bool = False,
+    reachability: Reachability | None = None,
 ) -> tuple[dict[str, SootClass], dict[str, list[str]]]:
     """Run Soot on the given input and return (classes, hierarchy).
 
     classes: dict mapping class name to SootClass (application classes only)
     hierarchy: dict mapping class name to list of subclass names
+
+    If jni_counter is given, it is filled with per-node-type statistics about
+    the Java calls made during conversion.
+
+    only_classes restricts conversion to the named application classes; the
+    other ones are still loaded, so references to them resolve exactly as in
+    a full lift. With compute_hierarchy=False an empty hierarchy is returned.
+    If class_order is given, the names of all application classes are
+    appended to it in the order a full lift would return them.
+
+    With a library_model, the subclass relations of the model's classes are
+    not derived from Soot. The returned hierarchy then only has entries for
+    the other classes and for the model classes that gained subclasses; look
+    the rest up in library_model.hierarchy. Soot still resolves the library
+    classes the input references: the model only saves the hierarchy pass.
+
+    With a class_cache, classes whose content was already converted by an
+    earlier lift are taken from the cache, and new conversions are added.
+
+    With lazy_bodies, bodies are neither built nor converted here: concrete
+    methods are returned as LazySootMethods whose body is materialized from
+    the Scene through the store on first access. Lazily lifted classes are
+    not added to class_cache, as storing them would materialize every body.
+
+    With a budget, methods over its limits are converted without their body
+    (see ConversionBudget); classes with such methods are not cached.
+
+    With a constant_index, the string and class constants of the converted
+    (or cached) classes are recorded in it.
+
+    With a soot_call_graph, Soot runs in whole-program mode and the call
+    graph its cg phase computes (with soot_call_graph.algorithm, from every
+    application method) is imported into it.
+
+    With conversion_threads, classes are converted by that many threads (see
+    _convert_classes); the result is the same as with one.
+
+    With progress, the phases of the lift (up to "hierarchy") and the
+    classes and methods converted are reported to it.
+
+    With shimple_classes (and ir_format "jimple"), the Shimple form of the
+    converted classes is added to it, in the same order, from the same
+    Soot run: the Shimple bodies are built from the Jimple ones, as Soot
+    does for ir_format "shimple", and the two forms share everything but
+    the method bodies. Cached classes (and the bodies of lazy methods) are
+    not converted, so shimple_classes cannot be combined with class_cache
+    or lazy_bodies.
+
+    With warm_scene, if the previous run_soot call was a warm one with the
+    same configuration (everything but input_file) and its Scene is still
+    current, the Scene is not reset: only the previous input's classes are
+    swapped out, and the library classes it resolved are reused. The
+    classes are the same as with a fresh Scene; the hierarchy may also
+    cover library classes that only earlier inputs needed. When a library
+    class extends, implements or is nested in a class of the previous
+    input, the Scene is reset as without warm_scene (see
+    _clear_application_classes).
+
+    With a reachability, only the application classes its entry points
+    reach are returned, and only the methods they reach have a body (see
+    pysoot.reachability): bodies are built on demand instead of by
+    runPacks. The reachability stays attached to the Scene, so that it
+    can expand to more entry points later. It converts bodies as it
+    reaches them, so it cannot be combined with only_classes, class_cache,
+    lazy_bodies, budget, soot_call_graph, conversion_threads or
+    shimple_classes (Lifter rejects those combinations).
     """
+    global _warm_key, _warm_classes  # pylint: disable=global-statement
+    if shimple_classes is not None and (
+        ir_format != "jimple" or class_cache is not None or lazy_bodies is not None
+    ):
+        raise PySootError(
+            "shimple_classes needs ir_format 'jimple', without class_cache "
+            "or lazy_bodies"
+        )
+    if budget is not None:
+        budget.start_lift()
+    if progress is not None:
+        progress.start_phase("loading")
     _start_jvm()
 
     Collections = JClass("java.util.Collections")
-    G = JClass("soot.G")
-    Hierarchy = JClass("soot.Hierarchy")
     Options = JClass("soot.options.Options")
     PackManager = JClass("soot.PackManager")
     Scene = JClass("soot.Scene")
 
-    G.reset()
+    warm_key = (
+        input_format,
+        android_sdk,
+        soot_classpath,
+        ir_format,
+        soot_call_graph.algorithm if soot_call_graph is not None else None,
+        _scene_generation,
+    )
+    reuse = warm_scene and warm_key == _warm_key
+    _warm_key = None
+    if reuse:
+        reuse = _clear_application_classes()
+    if not reuse:
+        _reset_scene()
 
     Options.v().set_process_dir(Collections.singletonList(input_file))
+    if reuse:
+        # recomputed from the options, with the new process dir
+        Scene.v().setSootClassPath(None)
 
     if input_format == "apk":
         Options.v().set_android_jars(android_sdk)
@@ -123,35 +401,422 @@ def run_soot(
     Options.v().setPhaseOption("jj.dae", "enabled:false")
     Options.v().setPhaseOption("jj.uce", "enabled:false")
 
+    if soot_call_graph is not None:
+        # the cg phase only runs in whole-program mode
+        Options.v().set_whole_program(True)
+        spark = "true" if soot_call_graph.algorithm == "spark" else "false"
+        Options.v().setPhaseOption("cg.spark", "enabled:" + spark)
+
     # this avoids an exception in some apks
     Options.v().set_wrong_staticness(Options.wrong_staticness_ignore)
 
     Scene.v().loadNecessaryClasses()
-    PackManager.v().runPacks()
 
     raw_classes = Scene.v().getClasses()
-    class_name_map = {c.getName(): c for c in raw_classes}
+    app_classes = [(str(c.getName()), c) for c in raw_classes if c.isApplicationClass()]
+    if warm_scene:
+        _warm_classes = [name for name, _ in app_classes]
+        _warm_key = warm_key[:-1] + (_scene_generation,)
+    if class_order is not None:
+        class_order.extend(name for name, _ in app_classes)
+
+    if jni_counter is None:
+        converters = _default_converters
+    else:
+        converters = _Converters(jni_counter)
+
+    if reachability is not None:
+        classes = _convert_reachable(
+            reachability,
+            app_classes,
+            input_file,
+            input_format,
+            ir_format,
+            converters,
+            library_model,
+            constant_index,
+            progress,
+        )
+        if not compute_hierarchy:
+            return classes, {}
+        if progress is not None:
+            progress.start_phase("hierarchy")
+        return classes, _soot_hierarchy(raw_classes, library_model)
+
+    cache_keys = {}
+    if class_cache is not None:
+        cache_keys = class_keys(
+            input_file, input_format, ir_format, soot_classpath, android_sdk
+        )
+
+    # Classes that are not converted here (outside the shard, or cached) are
+    # demoted: they stay in the Scene, so references to them resolve exactly
+    # as in a full lift, but runPacks skips their bodies.
+    done: dict[str, SootClass] = {}
+    to_convert = []
+    for name, raw_class in app_classes:
+        if only_classes is not None and name not in only_classes:
+            raw_class.setLibraryClass()
+            continue
+        key = cache_keys.get(name)
+        cached = class_cache.get(key) if key is not None else None
+        if cached is not None:
+            done[name] = cached
+            if constant_index is not None:
+                constant_index.add_class(cached)
+            raw_class.setLibraryClass()
+        else:
+            to_convert.append((name, raw_class))
+
+    if lazy_bodies is None:
+        if progress is not None:
+            progress.start_phase("packs")
+        PackManager.v().runPacks()
+    else:
+        lazy_bodies.attach(ir_format, converters)
 
     # Convert application classes to Python IR
-    classes = {}
-    for raw_class in raw_classes:
-        if raw_class.isApplicationClass():
-            soot_class = _convert_class(raw_class)
-            classes[soot_class.name] = soot_class
+    if progress is not None:
+        progress.start_phase(
+            "converting",
+            classes_total=len(to_convert),
+            methods_total=sum(int(c.getMethodCount()) for _, c in to_convert),
+        )
+    converted = _convert_classes(
+        [raw_class for _, raw_class in to_convert],
+        converters,
+        lazy_bodies,
+        budget,
+        constant_index,
+        conversion_threads,
+        progress,
+    )
+    for (name, _), (soot_class, truncated) in zip(to_convert, converted):
+        done[name] = soot_class
+        if name in cache_keys and lazy_bodies is None and not truncated:
+            class_cache.put(cache_keys[name], soot_class)
+    classes = {name: done[name] for name, _ in app_classes if name in done}
+
+    if shimple_classes is not None:
+        if progress is not None:
+            progress.start_phase("shimple")
+        for name, raw_class in to_convert:
+            shimple_classes[name] = _shimple_class(raw_class, done[name], converters)
+
+    if soot_call_graph is not None:
+        if progress is not None:
+            progress.start_phase("call_graph")
+        # one transfer for all the edges; see SootCallGraph.load
+        soot_call_graph.load(
+            str(Scene.v().getCallGraph().toString()), _unit_labels_by_text
+        )
+
+    if not compute_hierarchy:
+        return classes, {}
+    if progress is not None:
+        progress.start_phase("hierarchy")
+    return classes, _soot_hierarchy(raw_classes, library_model)
+
+
+def _soot_hierarchy(
+    raw_classes: Any, library_model: LibraryModel | None
+) -> dict[str, list[str]]:
+    """The subclasses of every class of the Scene, by class name (see
+    run_soot for what library_model leaves out)."""
+    Hierarchy = JClass("soot.Hierarchy")
+
+    if library_model is not None:
+        # Only the direct superclasses of the classes outside the model are
+        # read from Soot; everything else comes precomputed.
+        superclasses = {}
+        for raw_class in raw_classes:
+            name = str(raw_class.getName())
+            if name in library_model or raw_class.isInterface():
+                continue
+            if raw_class.hasSuperclass():
+                superclasses[name] = str(raw_class.getSuperclass().getName())
+            else:
+                superclasses[name] = ""
+        return library_model.extend_hierarchy(superclasses)
 
     # Pre-compute subclass relationships
-    hierarchy_obj = Hierarchy()
     hierarchy = {}
+    hierarchy_obj = Hierarchy()
+    class_name_map = {str(c.getName()): c for c in raw_classes}
     for name, raw_class in class_name_map.items():
         try:
             hierarchy[name] = [
-                c.getName() for c in hierarchy_obj.getSubclassesOf(raw_class)
+                str(c.getName()) for c in hierarchy_obj.getSubclassesOf(raw_class)
             ]
         except Exception:
             # Some classes (e.g. interfaces) may not support getSubclassesOf
             pass
 
-    return classes, hierarchy
+    return hierarchy
+
+
+def _convert_reachable(
+    reachability: Reachability,
+    app_classes: list[tuple[str, Any]],
+    input_file: str,
+    input_format: str,
+    ir_format: str,
+    converters: _Converters,
+    library_model: LibraryModel | None,
+    constant_index: ConstantIndex | None,
+    progress: ProgressReporter | None,
+) -> dict[str, SootClass]:
+    """Attach reachability to the Scene, expand its entry points and return
+    the classes they reach.
+
+    The declarations of every application class are converted, for call
+    resolution; library classes are resolved (at signature level) and
+    converted when resolution reaches them, unless library_model has them.
+    """
+    Scene = JClass("soot.Scene")
+    SootClass_ = JClass("soot.SootClass")
+
+    if progress is not None:
+        progress.start_phase("converting")
+    raw_by_name = dict(app_classes)
+    declarations = {name: _convert_class(raw, converters) for name, raw in app_classes}
+    raw_methods: dict[str, list[Any]] = {}
+    library: dict[str, SootClass | None] = {}
+    generation = _scene_generation
+
+    def get_class(class_name: str) -> SootClass | None:
+        if class_name in library:
+            return library[class_name]
+        soot_class = None
+        if library_model is not None:
+            soot_class = library_model.get_class(class_name)
+        if soot_class is None:
+            raw_class = Scene.v().forceResolve(class_name, SootClass_.SIGNATURES)
+            if not raw_class.isPhantom():
+                soot_class = _convert_class(raw_class, converters)
+        library[class_name] = soot_class
+        return soot_class
+
+    def load_body(method: tuple[str, str, tuple[str, ...]]) -> tuple | None:
+        class_name, name, params = method
+        if generation != _scene_generation:
+            raise PySootError(
+                f"cannot load the body of {class_name}.{name}: "
+                "the Soot Scene it was lifted from has been reset"
+            )
+        # the declarations list the methods in Soot's order
+        if class_name not in raw_methods:
+            raw_methods[class_name] = list(raw_by_name[class_name].getMethods())
+        position = next(
+            i
+            for i, m in enumerate(declarations[class_name].methods)
+            if (m.name, m.params) == (name, params)
+        )
+        ir_method = raw_methods[class_name][position]
+        if not ir_method.isConcrete():
+            return None
+        constants = None
+        if constant_index is not None:
+            constants = constant_index.method_recorder(class_name, name, params)
+        body = _convert_body(_build_body(ir_method, ir_format), converters, constants)
+        if progress is not None:
+            progress.advance(methods=1)
+        return body
+
+    reachability.attach(declarations, load_body, get_class, progress)
+    entry_points = reachability.entry_points
+    if entry_points == ANDROID_COMPONENTS:
+        if input_format != "apk":
+            raise PySootError("android-components entry points need an apk")
+        entry_points = reachability.android_entry_points(read_manifest(input_file))
+    reachability.expand(entry_points)
+    return reachability.classes()
+
+
+def _unit_labels_by_text(method_signature: str) -> dict[str, list[int]] | None:
+    """Labels of the statements of a method of the Scene, by statement text.
+
+    Soot's call graph refers to the Jimple text of statements. In a Shimple
+    body, the SSA versions of a local (r0_1) are renamed after their Jimple
+    local (r0) while the statements are written, so that only the locals,
+    and not e.g. method names or constants, are affected.
+    """
+    ir_method = JClass("soot.Scene").v().grabMethod(method_signature)
+    if ir_method is None or not ir_method.hasActiveBody():
+        return None
+    body = ir_method.getActiveBody()
+    renamed = []
+    if isinstance(body, JClass("soot.shimple.ShimpleBody")):
+        for local in body.getLocals():
+            name = str(local.getName())
+            match = _ssa_version.fullmatch(name)
+            if match is not None:
+                local.setName(match[1])
+                renamed.append((local, name))
+    try:
+        labels: dict[str, list[int]] = {}
+        for label, unit in enumerate(body.getUnits()):
+            labels.setdefault(str(unit), []).append(label)
+        return labels
+    finally:
+        for local, name in renamed:
+            local.setName(name)
+
+
+# Shimple names the SSA versions of a local after it: r0_1, $i2_3
+_ssa_version = re.compile(r"(.+)_[0-9]+")
+
+
+def jdk_class_names(modules: Collection[str] | None = None) -> tuple[list[str], str]:
+    """Return the names of the classes of the running JDK (restricted to the
+    given modules, if any) and its version."""
+    _start_jvm()
+
+    FileSystems = JClass("java.nio.file.FileSystems")
+    Files = JClass("java.nio.file.Files")
+    System = JClass("java.lang.System")
+    URI = JClass("java.net.URI")
+
+    jrt = FileSystems.getFileSystem(URI.create("jrt:/"))
+    names = []
+    for module_dir in Files.list(jrt.getPath("/modules")).iterator():
+        if modules is not None and str(module_dir.getFileName()) not in modules:
+            continue
+        for path in Files.walk(module_dir).iterator():
+            # e.g. /modules/java.base/java/lang/Object.class
+            path_str = str(path)
+            if path_str.endswith(".class") and not path_str.endswith(
+                "module-info.class"
+            ):
+                names.append(path_str.split("/", 3)[3][:-6].replace("/", "."))
+    return names, str(System.getProperty("java.version"))
+
+
+def convert_library_classes(
+    soot_classpath: str, class_names: Collection[str]
+) -> dict[str, SootClass]:
+    """Resolve the given classes from soot_classpath at signature level only
+    and convert them (methods have no bodies). Classes that cannot be found
+    are left out."""
+    _start_jvm()
+
+    Options = JClass("soot.options.Options")
+    Scene = JClass("soot.Scene")
+    SootClass_ = JClass("soot.SootClass")
+
+    _reset_scene()
+    Options.v().set_soot_classpath(soot_classpath)
+    Options.v().set_allow_phantom_refs(True)
+    Scene.v().loadNecessaryClasses()
+
+    classes = {}
+    for name in class_names:
+        raw_class = Scene.v().forceResolve(name, SootClass_.SIGNATURES)
+        if raw_class.isPhantom():
+            continue
+        soot_class = _convert_class(raw_class)
+        classes[soot_class.name] = soot_class
+    return classes
+
+
+class BodyStore:
+    """Method bodies materialized on demand from the Scene of a lift.
+
+    Pass an instance to run_soot (or lazy_bodies=True to Lifter) to lift
+    methods with their signatures only. A body is built in Soot (jb, then the
+    body packs runPacks would apply) and converted the first time one of its
+    method's body fields is read, then memoized. With max_bodies, only the
+    most recently used bodies are kept and evicted ones are converted again
+    when read.
+
+    Bodies come from the live Scene: once another lift resets it, the ones
+    not materialized yet can no longer be loaded. materialized counts the
+    bodies converted so far, conversions after an eviction included.
+
+    With release_soot_bodies, the Soot body of a method is released once
+    converted, so the Scene only holds the bodies being materialized; a body
+    converted again after an eviction is then rebuilt from the class file.
+    """
+
+    def __init__(
+        self, max_bodies: int | None = None, release_soot_bodies: bool = False
+    ):
+        self.max_bodies = max_bodies
+        self.release_soot_bodies = release_soot_bodies
+        self.materialized = 0
+        self._ir_format = "shimple"
+        self._converters = _default_converters
+        self._generation = -1
+        self._bodies: OrderedDict[int, tuple] = OrderedDict()
+        # next() on a count is atomic, so loaders can be made from threads
+        self._keys = itertools.count()
+
+    def attach(self, ir_format: str, converters: _Converters):
+        """Bind the store to the Scene run_soot just loaded."""
+        self._ir_format = ir_format
+        self._converters = converters
+        self._generation = _scene_generation
+        self._bodies.clear()
+
+    def loader(self, ir_method: Any) -> _BodyLoader:
+        # one key per lifted method, independent of how Java hashes it
+        return _BodyLoader(self, next(self._keys), ir_method)
+
+    def is_loaded(self, key: int) -> bool:
+        return key in self._bodies
+
+    def _body(self, key: int, ir_method: Any) -> tuple:
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+        if self._generation != _scene_generation:
+            raise PySootError(
+                f"cannot load the body of {ir_method.getSignature()}: "
+                "the Soot Scene it was lifted from has been reset"
+            )
+        body = _convert_body(_build_body(ir_method, self._ir_format), self._converters)
+        if self.release_soot_bodies:
+            ir_method.releaseActiveBody()
+        self.materialized += 1
+        self._bodies[key] = body
+        if self.max_bodies is not None and len(self._bodies) > self.max_bodies:
+            self._bodies.popitem(last=False)
+        return body
+
+
+class _BodyLoader:
+    """The loader of one lazy method: its body from a BodyStore."""
+
+    __slots__ = ("store", "key", "ir_method")
+
+    def __init__(self, store: BodyStore, key: int, ir_method: Any):
+        self.store = store
+        self.key = key
+        self.ir_method = ir_method
+
+    def __call__(self) -> tuple:
+        return self.store._body(self.key, self.ir_method)  # pylint: disable=protected-access
+
+    def is_loaded(self) -> bool:
+        return self.store.is_loaded(self.key)
+
+
+def _build_body(ir_method: Any, ir_format: str) -> Any:
+    """Build the active body of ir_method the way runPacks would."""
+    PackManager = JClass("soot.PackManager")
+
+    body = ir_method.retrieveActiveBody()
+    if ir_format == "shimple":
+        if not isinstance(body, JClass("soot.shimple.ShimpleBody")):
+            body = JClass("soot.shimple.Shimple").v().newBody(body)
+            ir_method.setActiveBody(body)
+            PackManager.v().getPack("stp").apply(body)
+            PackManager.v().getPack("sop").apply(body)
+    else:
+        for pack in ("jtp", "jop", "jap"):
+            PackManager.v().getPack(pack).apply(body)
+    return body
 
 
 # ========== Soot IR -> pysoot dataclass conversion ==========
@@ -159,6 +824,201 @@ def run_soot(
 # and the keys of the per-method maps below are typed as Any.
 
 
+@dataclass(slots=True, frozen=True)
+class TruncatedMethod:
+    """A method converted without its body by a ConversionBudget.
+
+    reason is "statements", "class_seconds" or "lift_seconds", after the
+    limit that was exceeded.
+    """
+
+    class_name: str
+    name: str
+    params: tuple[str, ...]
+    reason: str
+
+
+class ConversionBudget:
+    """Limits on the conversion work of a lift.
+
+    A method is converted without its body, and gets the "Truncated" attr,
+    if its body has more than max_method_statements statements (where a
+    switch counts once plus once per target, as converting it is linear in
+    its targets), or if its
+    class has been converting for more than max_class_seconds, or the lift
+    has been running for more than max_lift_seconds. The time limits are
+    checked between methods; Soot's body building, which precedes
+    conversion, is not interrupted but counts towards max_lift_seconds.
+    They are wall-clock limits: with conversion_threads, the time a class
+    waits for the GIL counts too.
+
+    Pass an instance to run_soot (or the limits to Lifter); truncated lists
+    every method that was cut, in conversion order.
+    """
+
+    def __init__(
+        self,
+        max_method_statements: int | None = None,
+        max_class_seconds: float | None = None,
+        max_lift_seconds: float | None = None,
+    ):
+        self.max_method_statements = max_method_statements
+        self.max_class_seconds = max_class_seconds
+        self.max_lift_seconds = max_lift_seconds
+        self.truncated: list[TruncatedMethod] = []
+        self._lift_deadline = float("inf")
+        self._class_deadline = float("inf")
+
+    def start_lift(self):
+        if self.max_lift_seconds is not None:
+            self._lift_deadline = time.monotonic() + self.max_lift_seconds
+
+    def for_class(self) -> ConversionBudget:
+        """A budget with the same limits and lift deadline, to convert one
+        class with (see _convert_classes)."""
+        budget = ConversionBudget(
+            self.max_method_statements, self.max_class_seconds, self.max_lift_seconds
+        )
+        budget._lift_deadline = self._lift_deadline
+        return budget
+
+    def start_class(self):
+        if self.max_class_seconds is not None:
+            self._class_deadline = time.monotonic() + self.max_class_seconds
+
+    def exceeded(self, body: Any) -> str | None:
+        """The limit converting body would exceed, if any."""
+        now = time.monotonic()
+        if now > self._lift_deadline:
+            return "lift_seconds"
+        if now > self._class_deadline:
+            return "class_seconds"
+        if self.max_method_statements is not None:
+            limit = self.max_method_statements
+            units = body.getUnits()
+            size = units.size()
+            if size > limit:
+                return "statements"
+            SwitchStmt = JClass("soot.jimple.SwitchStmt")
+            for unit in units:
+                if isinstance(unit, SwitchStmt):
+                    size += unit.getTargets().size()
+                    if size > limit:
+                        return "statements"
+        return None
+
+
+class JNICallCounter:
+    """Tallies the Java calls made while converting each IR node type.
+
+    Pass an instance to run_soot (or count_jni_calls=True to Lifter) to find
+    out which node types dominate the Python<->Java crossings of a lift.
+
+    nodes maps a node type name (e.g. "JAssignStmt", "Local") to the number
+    of nodes of that type that were converted; calls maps it to the number of
+    Java methods (and fields) invoked on those nodes. Calls made on objects
+    returned by those methods, e.g. the toString() behind str(ir.getType()),
+    are not attributed.
+    """
+
+    def __init__(self):
+        self.nodes: Counter[str] = Counter()
+        self.calls: Counter[str] = Counter()
+
+    def calls_per_node(self) -> dict[str, float]:
+        """Average number of Java calls per converted node, by node type."""
+        return {name: self.calls[name] / n for name, n in self.nodes.items() if n}
+
+
+class _Accessors:
+    """Java members of one IR node class, looked up once per class.
+
+    Converters call them unbound (accessors.getOp(ir_value)) so that the
+    per-instance attribute lookup JPype would otherwise do is skipped. With a
+    counter attached every call is tallied under the node type's name.
+    """
+
+    def __init__(self, jclass: Any, node_name: str, counter: JNICallCounter | None):
+        self._jclass = jclass
+        self._node_name = node_name
+        self._counter = counter
+
+    def __getattr__(self, name: str) -> Callable[[Any], Any]:
+        # Only reached on a miss: the accessor is cached on the instance below.
+        member = inspect.getattr_static(self._jclass, name, None)
+        accessor = member if callable(member) else operator.attrgetter(name)
+        if self._counter is not None:
+            accessor = _counting(accessor, self._counter.calls, self._node_name)
+        setattr(self, name, accessor)
+        return accessor
+
+
+def _counting(accessor, calls: Counter[str], node_name: str):
+    def counted(*args):
+        calls[node_name] += 1
+        return accessor(*args)
+
+    return counted
+
+
+class _Converters:
+    """Converter dispatch keyed by the JPype class of each Soot object.
+
+    The first time a Java class is seen its simple name is resolved once and
+    mapped to a converter function and an _Accessors instance; every later
+    node of that class is dispatched with a single dict lookup on type(node).
+    """
+
+    def __init__(self, counter: JNICallCounter | None = None):
+        self.counter = counter
+        self._stmts: dict[type, tuple[Callable, _Accessors]] = {}
+        self._values: dict[type, tuple[Callable, _Accessors]] = {}
+
+    def stmt(self, ir_stmt: Any) -> tuple[Callable, _Accessors]:
+        try:
+            entry = self._stmts[type(ir_stmt)]
+        except KeyError:
+            entry = self._stmts[type(ir_stmt)] = self._resolve(
+                type(ir_stmt), _STMT_CONVERTERS
+            )
+        if self.counter is not None:
+            self.counter.nodes[entry[1]._node_name] += 1
+        return entry
+
+    def value(self, ir_value: Any) -> tuple[Callable, _Accessors]:
+        try:
+            entry = self._values[type(ir_value)]
+        except KeyError:
+            entry = self._values[type(ir_value)] = self._resolve(
+                type(ir_value), _VALUE_CONVERTERS
+            )
+        if self.counter is not None:
+            self.counter.nodes[entry[1]._node_name] += 1
+        return entry
+
+    def _resolve(
+        self, jclass: Any, table: dict[str, Callable]
+    ) -> tuple[Callable, _Accessors]:
+        name = str(jclass.class_.getSimpleName())
+        if table is _VALUE_CONVERTERS:
+            name = name.replace("Jimple", "").replace("Shimple", "")
+        convert = table.get(name)
+        if convert is None:
+            if table is _STMT_CONVERTERS:
+                msg = f"Statement type {name} is not supported yet."
+            elif name.endswith("Expr"):
+                msg = f"Unsupported Soot expression type {name}."
+            else:
+                msg = f"Unsupported SootValue type {name}."
+            raise NotImplementedError(msg)
+        return convert, _Accessors(jclass, name, self.counter)
+
+
+# Dispatch state is only tied to JPype classes, which outlive G.reset(), so
+# lifts that don't count JNI calls share one instance.
+_default_converters = _Converters()
+
+
 @dataclass(slots=True, frozen=True)
 class _Ctx:
     """Per-method conversion context, threaded through value/stmt conversion.
@@ -167,18 +1027,149 @@ class _Ctx:
     method body; used for statement labels and jump targets.
     stmt_to_block_idx maps each Unit to the index of the block that contains
     it; used by SootPhiExpr to record which block each value came from.
+    converters is the dispatch table used for every node of the method.
+    constants, if set, collects the string and class constants of the
+    statement being converted.
     """
 
     stmt_map: dict[Any, int]
     stmt_to_block_idx: dict[Any, int]
+    converters: _Converters
+    constants: MethodConstants | None = None
+
 
+def _shimple_class(
+    ir_class: Any, jimple_class: SootClass, converters: _Converters
+) -> SootClass:
+    """The Shimple form of a converted Jimple class: method bodies are
+    converted from Shimple copies of the active Jimple bodies, everything
+    else is shared with jimple_class."""
+    Shimple = JClass("soot.shimple.Shimple")
+    PackManager = JClass("soot.PackManager")
+
+    methods = []
+    for ir_method, method in zip(ir_class.getMethods(), jimple_class.methods):
+        if not ir_method.hasActiveBody() or "Truncated" in method.attrs:
+            methods.append(method)
+            continue
+        # newBody copies the body, the Jimple one stays active
+        body = Shimple.v().newBody(ir_method.getActiveBody())
+        PackManager.v().getPack("stp").apply(body)
+        PackManager.v().getPack("sop").apply(body)
+        blocks, basic_cfg, exceptional_preds = _convert_body(body, converters)
+        methods.append(
+            replace(
+                method,
+                blocks=blocks,
+                basic_cfg=basic_cfg,
+                exceptional_preds=exceptional_preds,
+            )
+        )
+    return replace(jimple_class, methods=tuple(methods))
+
+
+def _convert_classes(
+    ir_classes: Sequence[Any],
+    converters: _Converters,
+    body_store: BodyStore | None,
+    budget: ConversionBudget | None,
+    constant_index: ConstantIndex | None,
+    threads: int | None = None,
+    progress: ProgressReporter | None = None,
+) -> list[tuple[SootClass, bool]]:
+    """Convert ir_classes to (class, truncated) pairs, in order, where
+    truncated tells whether budget cut any of the class's methods.
 
-def _convert_class(ir_class: Any) -> SootClass:
+    With several threads, the JNI latency of a class overlaps with the
+    conversion of others (JPype releases the GIL during Java calls). Soot
+    only reads bodies at this point, except to build their block graphs,
+    which resolves classes and hierarchies in the shared Scene: those are
+    built one at a time (see _convert_body). Every class gets its own
+    budget and constant index, merged in class order, and every thread its
+    own JNI call counter, so the outcome does not depend on scheduling.
+    """
+    if threads is None or threads < 2 or len(ir_classes) < 2:
+        converted = []
+        for ir_class in ir_classes:
+            n_truncated = len(budget.truncated) if budget is not None else 0
+            soot_class = _convert_class(
+                ir_class, converters, body_store, budget, constant_index, progress
+            )
+            truncated = budget is not None and len(budget.truncated) > n_truncated
+            converted.append((soot_class, truncated))
+        return converted
+
+    results: list[Any] = [None] * len(ir_classes)
+    counters: list[JNICallCounter] = []
+    next_class = itertools.count()
+    failed = False
+
+    def work():
+        nonlocal failed
+        thread_converters = converters
+        if converters.counter is not None:
+            thread_converters = _Converters(JNICallCounter())
+            counters.append(thread_converters.counter)
+        try:
+            while not failed and (i := next(next_class)) < len(ir_classes):
+                class_budget = budget.for_class() if budget is not None else None
+                class_index = ConstantIndex() if constant_index is not None else None
+                soot_class = _convert_class(
+                    ir_classes[i],
+                    thread_converters,
+                    body_store,
+                    class_budget,
+                    class_index,
+                    progress,
+                )
+                results[i] = (soot_class, class_budget, class_index)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # threads calling into Java are attached to the JVM on demand
+            JClass("java.lang.Thread").detach()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        workers = [pool.submit(work) for _ in range(min(threads, len(ir_classes)))]
+    for worker in workers:
+        worker.result()
+
+    for counter in counters:
+        converters.counter.nodes.update(counter.nodes)
+        converters.counter.calls.update(counter.calls)
+    converted = []
+    for soot_class, class_budget, class_index in results:
+        if class_index is not None:
+            constant_index.update(class_index)
+        truncated = class_budget is not None and bool(class_budget.truncated)
+        if truncated:
+            budget.truncated.extend(class_budget.truncated)
+        converted.append((soot_class, truncated))
+    return converted
+
+
+def _convert_class(
+    ir_class: Any,
+    converters: _Converters = _default_converters,
+    body_store: BodyStore | None = None,
+    budget: ConversionBudget | None = None,
+    constant_index: ConstantIndex | None = None,
+    progress: ProgressReporter | None = None,
+) -> SootClass:
     class_name = str(ir_class.getName())
 
-    methods = tuple(
-        _convert_method(class_name, ir_method) for ir_method in ir_class.getMethods()
-    )
+    if budget is not None:
+        budget.start_class()
+    methods = []
+    for ir_method in ir_class.getMethods():
+        methods.append(
+            _convert_method(
+                class_name, ir_method, converters, body_store, budget, constant_index
+            )
+        )
+        if progress is not None:
+            progress.advance(methods=1)
 
     attrs = convert_soot_attributes(ir_class.getModifiers())
     for extra in ("LibraryClass", "JavaLibraryClass", "Phantom"):
@@ -198,324 +1189,443 @@ def _convert_class(ir_class: Any) -> SootClass:
     else:
         super_class = str(ir_class.getSuperclass().getName())
 
+    if progress is not None:
+        progress.advance(classes=1)
     return SootClass(
         name=class_name,
         super_class=super_class,
         interfaces=interfaces,
         attrs=tuple(attrs),
-        methods=methods,
+        methods=tuple(methods),
         fields=frozendict(fields),
     )
 
 
-def _convert_method(class_name: str, ir_method: Any) -> SootMethod:
-    blocks: tuple[SootBlock, ...] = ()
-    basic_cfg: dict[SootBlock, tuple[SootBlock, ...]] = {}
-    exceptional_preds: dict[SootBlock, tuple[SootBlock, ...]] = {}
-
-    if ir_method.hasActiveBody():
-        ExceptionalBlockGraph = JClass("soot.toolkits.graph.ExceptionalBlockGraph")
-        body = ir_method.getActiveBody()
-        cfg = ExceptionalBlockGraph(body)
-        units = body.getUnits()
-
-        # Soot Units and Blocks are hashed by identity (Python's default
-        # for objects that don't override __hash__); we rely on each Java
-        # object being a single instance throughout this method's conversion.
-        stmt_map: dict[Any, int] = {u: i for i, u in enumerate(units)}
-        idx_map: dict[Any, int] = {b: i for i, b in enumerate(cfg)}
-
-        stmt_to_block_idx: dict[Any, int] = {}
-        for ir_block in cfg:
-            for ir_stmt in ir_block:
-                stmt_to_block_idx[ir_stmt] = idx_map[ir_block]
-
-        ctx = _Ctx(stmt_map=stmt_map, stmt_to_block_idx=stmt_to_block_idx)
-
-        # Convert blocks. Phi values are populated in this single pass
-        # because _convert_value uses ctx.stmt_to_block_idx directly.
-        block_by_idx: dict[int, SootBlock] = {}
-        blocks_list: list[SootBlock] = []
-        for ir_block in cfg:
-            idx = idx_map[ir_block]
-            block = _convert_block(ir_block, idx, ctx)
-            blocks_list.append(block)
-            block_by_idx[idx] = block
-        blocks = tuple(blocks_list)
-
-        for ir_block in cfg:
-            block = block_by_idx[idx_map[ir_block]]
-            succs = tuple(block_by_idx[idx_map[s]] for s in ir_block.getSuccs())
-            if succs:
-                basic_cfg[block] = succs
-
-            preds = tuple(
-                block_by_idx[idx_map[p]] for p in cfg.getExceptionalPredsOf(ir_block)
-            )
-            if preds:
-                exceptional_preds[block] = preds
-
-    return SootMethod(
+def _convert_method(
+    class_name: str,
+    ir_method: Any,
+    converters: _Converters = _default_converters,
+    body_store: BodyStore | None = None,
+    budget: ConversionBudget | None = None,
+    constant_index: ConstantIndex | None = None,
+) -> SootMethod:
+    signature = dict(
         class_name=class_name,
         name=str(ir_method.getName()),
         ret=str(ir_method.getReturnType()),
         attrs=tuple(convert_soot_attributes(ir_method.getModifiers())),
         exceptions=tuple(str(e.getName()) for e in ir_method.getExceptions()),
         params=tuple(str(p) for p in ir_method.getParameterTypes()),
+    )
+    if body_store is not None and ir_method.isConcrete():
+        return LazySootMethod(body_store.loader(ir_method), **signature)
+
+    body = ir_method.getActiveBody() if ir_method.hasActiveBody() else None
+    reason = None
+    if body is not None and budget is not None:
+        reason = budget.exceeded(body)
+        if reason is not None:
+            budget.truncated.append(
+                TruncatedMethod(
+                    class_name, signature["name"], signature["params"], reason
+                )
+            )
+            signature["attrs"] += ("Truncated",)
+
+    if body is not None and reason is None:
+        constants = None
+        if constant_index is not None:
+            constants = constant_index.method_recorder(
+                class_name, signature["name"], signature["params"]
+            )
+        blocks, basic_cfg, exceptional_preds = _convert_body(
+            body, converters, constants
+        )
+    else:
+        blocks, basic_cfg, exceptional_preds = (), frozendict(), frozendict()
+    return SootMethod(
+        **signature,
         blocks=blocks,
-        basic_cfg=frozendict(basic_cfg),
-        exceptional_preds=frozendict(exceptional_preds),
+        basic_cfg=basic_cfg,
+        exceptional_preds=exceptional_preds,
     )
 
 
+# The throw analysis behind ExceptionalBlockGraph resolves classes and
+# builds hierarchies in the Scene, which is not thread-safe
+_block_graph_lock = threading.Lock()
+
+
+def _convert_body(
+    body: Any, converters: _Converters, constants: MethodConstants | None = None
+) -> tuple[tuple[SootBlock, ...], frozendict, frozendict]:
+    """Convert a Soot Body to (blocks, basic_cfg, exceptional_preds)."""
+    ExceptionalBlockGraph = JClass("soot.toolkits.graph.ExceptionalBlockGraph")
+    with _block_graph_lock:
+        cfg = ExceptionalBlockGraph(body)
+    units = body.getUnits()
+
+    # Soot Units and Blocks are hashed by identity (Python's default
+    # for objects that don't override __hash__); we rely on each Java
+    # object being a single instance throughout this method's conversion.
+    stmt_map: dict[Any, int] = {u: i for i, u in enumerate(units)}
+    idx_map: dict[Any, int] = {b: i for i, b in enumerate(cfg)}
+
+    stmt_to_block_idx: dict[Any, int] = {}
+    for ir_block in cfg:
+        for ir_stmt in ir_block:
+            stmt_to_block_idx[ir_stmt] = idx_map[ir_block]
+
+    ctx = _Ctx(
+        stmt_map=stmt_map,
+        stmt_to_block_idx=stmt_to_block_idx,
+        converters=converters,
+        constants=constants,
+    )
+
+    # Convert blocks. Phi values are populated in this single pass
+    # because _convert_value uses ctx.stmt_to_block_idx directly.
+    block_by_idx: dict[int, SootBlock] = {}
+    blocks_list: list[SootBlock] = []
+    for ir_block in cfg:
+        idx = idx_map[ir_block]
+        block = _convert_block(ir_block, idx, ctx)
+        blocks_list.append(block)
+        block_by_idx[idx] = block
+
+    basic_cfg: dict[SootBlock, tuple[SootBlock, ...]] = {}
+    exceptional_preds: dict[SootBlock, tuple[SootBlock, ...]] = {}
+    for ir_block in cfg:
+        block = block_by_idx[idx_map[ir_block]]
+        succs = tuple(block_by_idx[idx_map[s]] for s in ir_block.getSuccs())
+        if succs:
+            basic_cfg[block] = succs
+
+        preds = tuple(
+            block_by_idx[idx_map[p]] for p in cfg.getExceptionalPredsOf(ir_block)
+        )
+        if preds:
+            exceptional_preds[block] = preds
+
+    return tuple(blocks_list), frozendict(basic_cfg), frozendict(exceptional_preds)
+
+
 def _convert_block(ir_block: Any, idx: int, ctx: _Ctx) -> SootBlock:
     label = ctx.stmt_map[ir_block.getHead()]
-    stmts = tuple(_convert_stmt(s, ctx) for s in ir_block)
+    if ctx.constants is None:
+        stmts = tuple(_convert_stmt(s, ctx) for s in ir_block)
+    else:
+        stmts_list = []
+        for s in ir_block:
+            stmt = _convert_stmt(s, ctx)
+            if ctx.constants.found:
+                ctx.constants.flush(stmt.label)
+            stmts_list.append(stmt)
+        stmts = tuple(stmts_list)
     return SootBlock(label=label, statements=stmts, idx=idx)
 
 
 def _convert_stmt(ir_stmt: Any, ctx: _Ctx) -> SootStmt:
-    stmt_type = str(ir_stmt.getClass().getSimpleName())
-    label = ctx.stmt_map[ir_stmt]
-    # TODO Soot appears to always set the bytecode offset to null
-    offset = 0
-
-    match stmt_type:
-        case "JAssignStmt":
-            return AssignStmt(
-                label,
-                offset,
-                _convert_value(ir_stmt.getLeftOp(), ctx),
-                _convert_value(ir_stmt.getRightOp(), ctx),
-            )
-        case "JIdentityStmt":
-            return IdentityStmt(
-                label,
-                offset,
-                _convert_value(ir_stmt.getLeftOp(), ctx),
-                _convert_value(ir_stmt.getRightOp(), ctx),
-            )
-        case "JBreakpointStmt":
-            return BreakpointStmt(label, offset)
-        case "JEnterMonitorStmt":
-            return EnterMonitorStmt(label, offset, _convert_value(ir_stmt.getOp(), ctx))
-        case "JExitMonitorStmt":
-            return ExitMonitorStmt(label, offset, _convert_value(ir_stmt.getOp(), ctx))
-        case "JGotoStmt":
-            return GotoStmt(label, offset, ctx.stmt_map[ir_stmt.getTarget()])
-        case "JIfStmt":
-            return IfStmt(
-                label,
-                offset,
-                _convert_value(ir_stmt.getCondition(), ctx),
-                ctx.stmt_map[ir_stmt.getTarget()],
-            )
-        case "JInvokeStmt":
-            return InvokeStmt(
-                label, offset, _convert_value(ir_stmt.getInvokeExpr(), ctx)
-            )
-        case "JReturnStmt":
-            return ReturnStmt(label, offset, _convert_value(ir_stmt.getOp(), ctx))
-        case "JReturnVoidStmt":
-            return ReturnVoidStmt(label, offset)
-        case "JLookupSwitchStmt":
-            lookup_values = (int(str(v)) for v in ir_stmt.getLookupValues())
-            targets = (ctx.stmt_map[t] for t in ir_stmt.getTargets())
-            return LookupSwitchStmt(
-                label=label,
-                offset=offset,
-                key=_convert_value(ir_stmt.getKey(), ctx),
-                lookup_values_and_targets=frozendict(zip(lookup_values, targets)),
-                default_target=ctx.stmt_map[ir_stmt.getDefaultTarget()],
-            )
-        case "JTableSwitchStmt":
-            low, high = int(ir_stmt.getLowIndex()), int(ir_stmt.getHighIndex())
-            table_targets = tuple(ctx.stmt_map[t] for t in ir_stmt.getTargets())
-            return TableSwitchStmt(
-                label=label,
-                offset=offset,
-                key=_convert_value(ir_stmt.getKey(), ctx),
-                low_index=low,
-                high_index=high,
-                targets=table_targets,
-                lookup_values_and_targets=frozendict(
-                    zip(range(low, high + 1), table_targets)
-                ),
-                default_target=ctx.stmt_map[ir_stmt.getDefaultTarget()],
-            )
-        case "JThrowStmt":
-            return ThrowStmt(label, offset, _convert_value(ir_stmt.getOp(), ctx))
-        case _:
-            raise NotImplementedError(
-                f"Statement type {stmt_type} is not supported yet."
-            )
+    convert, jm = ctx.converters.stmt(ir_stmt)
+    return convert(ir_stmt, ctx, jm)
 
 
 def _convert_value(ir_value: Any, ctx: _Ctx) -> SootValue:
-    subtype = str(ir_value.getClass().getSimpleName())
-    subtype = subtype.replace("Jimple", "").replace("Shimple", "")
-
-    if subtype.endswith("Expr"):
-        return _convert_expr(subtype, ir_value, ctx)
-
-    type_str = str(ir_value.getType())
-
-    match subtype:
-        case "Local":
-            return SootLocal(type_str, str(ir_value.getName()))
-        case "JArrayRef":
-            return SootArrayRef(
-                type_str,
-                _convert_value(ir_value.getBase(), ctx),
-                _convert_value(ir_value.getIndex(), ctx),
-            )
-        case "JCaughtExceptionRef":
-            return SootCaughtExceptionRef(type_str)
-        case "ParameterRef":
-            return SootParamRef(type_str, int(ir_value.getIndex()))
-        case "ThisRef":
-            return SootThisRef(type_str)
-        case "StaticFieldRef":
-            raw_field = ir_value.getField()
-            return SootStaticFieldRef(type_str, _field_ref(raw_field))
-        case "JInstanceFieldRef":
-            raw_field = ir_value.getField()
-            return SootInstanceFieldRef(
-                type_str,
-                _convert_value(ir_value.getBase(), ctx),
-                _field_ref(raw_field),
-            )
-        case "ClassConstant":
-            return SootClassConstant(type_str, str(ir_value.getValue()))
-        case "DoubleConstant":
-            return SootDoubleConstant(type_str, float(ir_value.value))
-        case "FloatConstant":
-            return SootFloatConstant(type_str, float(ir_value.value))
-        case "IntConstant":
-            return SootIntConstant(type_str, int(ir_value.value))
-        case "LongConstant":
-            return SootLongConstant(type_str, int(ir_value.value))
-        case "NullConstant":
-            return SootNullConstant(type_str)
-        case "StringConstant":
-            return SootStringConstant(type_str, str(ir_value.value))
-        case _:
-            raise NotImplementedError(f"Unsupported SootValue type {subtype}.")
-
-
-def _convert_expr(expr_name: str, ir_expr: Any, ctx: _Ctx) -> SootValue:
-    type_str = str(ir_expr.getType())
-
-    match expr_name:
-        case "JCastExpr":
-            return SootCastExpr(
-                type_str,
-                str(ir_expr.getCastType()),
-                _convert_value(ir_expr.getOp(), ctx),
-            )
-        case "JLengthExpr":
-            return SootLengthExpr(type_str, _convert_value(ir_expr.getOp(), ctx))
-        case "JNewExpr":
-            return SootNewExpr(type_str, str(ir_expr.getBaseType()))
-        case "JNewArrayExpr":
-            return SootNewArrayExpr(
-                type_str,
-                str(ir_expr.getBaseType()),
-                _convert_value(ir_expr.getSize(), ctx),
-            )
-        case "JNewMultiArrayExpr":
-            return SootNewMultiArrayExpr(
-                type_str,
-                str(ir_expr.getBaseType()),
-                tuple(_convert_value(s, ctx) for s in ir_expr.getSizes()),
-            )
-        case "JInstanceOfExpr":
-            return SootInstanceOfExpr(
-                type_str,
-                str(ir_expr.getCheckType()),
-                _convert_value(ir_expr.getOp(), ctx),
-            )
-        case "SPhiExpr":
-            # Single-pass construction: we resolve the (value, block_idx) tuples
-            # here using the method-level context, so SootPhiExpr can be created
-            # once with its final values — no post-init mutation required.
-            values = tuple(
-                (
-                    _convert_value(arg.getValue(), ctx),
-                    ctx.stmt_to_block_idx[arg.getUnit()],
-                )
-                for arg in ir_expr.getArgs()
-            )
-            return SootPhiExpr(type_str, values)
-        case "JStaticInvokeExpr":
-            return SootStaticInvokeExpr(
-                type=type_str, **_invoke_method_info(ir_expr, ctx)
-            )
-        case "JDynamicInvokeExpr":
-            return SootDynamicInvokeExpr(
-                type=type_str,
-                **_invoke_method_info(ir_expr, ctx),
-                bootstrap_method=None,
-                bootstrap_args=None,
-            )
-        case "JVirtualInvokeExpr":
-            return SootVirtualInvokeExpr(
-                type=type_str,
-                **_invoke_method_info(ir_expr, ctx),
-                base=_convert_value(ir_expr.getBase(), ctx),
-            )
-        case "JInterfaceInvokeExpr":
-            return SootInterfaceInvokeExpr(
-                type=type_str,
-                **_invoke_method_info(ir_expr, ctx),
-                base=_convert_value(ir_expr.getBase(), ctx),
-            )
-        case "JSpecialInvokeExpr":
-            return SootSpecialInvokeExpr(
-                type=type_str,
-                **_invoke_method_info(ir_expr, ctx),
-                base=_convert_value(ir_expr.getBase(), ctx),
-            )
-        # Binop, condition, and unop expressions derive their op name from the
-        # class simple name (e.g. "JAddExpr" -> "add"); they're listed inline
-        # here so the dispatch table stays in one place.
-        # fmt: off
-        case (
-            "JAddExpr"
-            | "JAndExpr"
-            | "JCmpExpr"
-            | "JCmpgExpr"
-            | "JCmplExpr"
-            | "JDivExpr"
-            | "JMulExpr"
-            | "JOrExpr"
-            | "JRemExpr"
-            | "JShlExpr"
-            | "JShrExpr"
-            | "JSubExpr"
-            | "JUshrExpr"
-            | "JXorExpr"
-        ):
-            return SootBinopExpr(
-                type_str,
-                _op_name(expr_name),
-                _convert_value(ir_expr.getOp1(), ctx),
-                _convert_value(ir_expr.getOp2(), ctx),
-            )
-        case "JEqExpr" | "JGeExpr" | "JGtExpr" | "JLeExpr" | "JLtExpr" | "JNeExpr":
-            return SootConditionExpr(
-                type_str,
-                _op_name(expr_name),
-                _convert_value(ir_expr.getOp1(), ctx),
-                _convert_value(ir_expr.getOp2(), ctx),
-            )
-        # fmt: on
-        case "JNegExpr":
-            return SootUnopExpr(
-                type_str, _op_name(expr_name), _convert_value(ir_expr.getOp(), ctx)
-            )
-        case _:
-            raise NotImplementedError(f"Unsupported Soot expression type {expr_name}.")
+    convert, jm = ctx.converters.value(ir_value)
+    return convert(ir_value, ctx, jm)
+
+
+# ---------- statements ----------
+# Every converter takes (ir_node, ctx, jm), jm being the _Accessors of the
+# node's Java class. Soot appears to always set the bytecode offset to null,
+# so every statement gets offset 0.
+
+
+def _assign_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    return AssignStmt(
+        ctx.stmt_map[ir_stmt],
+        0,
+        _convert_value(jm.getLeftOp(ir_stmt), ctx),
+        _convert_value(jm.getRightOp(ir_stmt), ctx),
+    )
+
+
+def _identity_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    return IdentityStmt(
+        ctx.stmt_map[ir_stmt],
+        0,
+        _convert_value(jm.getLeftOp(ir_stmt), ctx),
+        _convert_value(jm.getRightOp(ir_stmt), ctx),
+    )
+
+
+def _breakpoint_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    return BreakpointStmt(ctx.stmt_map[ir_stmt], 0)
+
+
+def _enter_monitor_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    op = _convert_value(jm.getOp(ir_stmt), ctx)
+    return EnterMonitorStmt(ctx.stmt_map[ir_stmt], 0, op)
+
+
+def _exit_monitor_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    op = _convert_value(jm.getOp(ir_stmt), ctx)
+    return ExitMonitorStmt(ctx.stmt_map[ir_stmt], 0, op)
+
+
+def _goto_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    target = ctx.stmt_map[jm.getTarget(ir_stmt)]
+    return GotoStmt(ctx.stmt_map[ir_stmt], 0, target)
+
+
+def _if_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    return IfStmt(
+        ctx.stmt_map[ir_stmt],
+        0,
+        _convert_value(jm.getCondition(ir_stmt), ctx),
+        ctx.stmt_map[jm.getTarget(ir_stmt)],
+    )
+
+
+def _invoke_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    expr = _convert_value(jm.getInvokeExpr(ir_stmt), ctx)
+    return InvokeStmt(ctx.stmt_map[ir_stmt], 0, expr)
+
+
+def _return_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    op = _convert_value(jm.getOp(ir_stmt), ctx)
+    return ReturnStmt(ctx.stmt_map[ir_stmt], 0, op)
+
+
+def _return_void_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    return ReturnVoidStmt(ctx.stmt_map[ir_stmt], 0)
+
+
+def _lookup_switch_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    lookup_values = (int(str(v)) for v in jm.getLookupValues(ir_stmt))
+    targets = (ctx.stmt_map[t] for t in jm.getTargets(ir_stmt))
+    return LookupSwitchStmt(
+        label=ctx.stmt_map[ir_stmt],
+        offset=0,
+        key=_convert_value(jm.getKey(ir_stmt), ctx),
+        lookup_values_and_targets=frozendict(zip(lookup_values, targets)),
+        default_target=ctx.stmt_map[jm.getDefaultTarget(ir_stmt)],
+    )
+
+
+def _table_switch_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    low, high = int(jm.getLowIndex(ir_stmt)), int(jm.getHighIndex(ir_stmt))
+    table_targets = tuple(ctx.stmt_map[t] for t in jm.getTargets(ir_stmt))
+    return TableSwitchStmt(
+        label=ctx.stmt_map[ir_stmt],
+        offset=0,
+        key=_convert_value(jm.getKey(ir_stmt), ctx),
+        low_index=low,
+        high_index=high,
+        targets=table_targets,
+        lookup_values_and_targets=frozendict(zip(range(low, high + 1), table_targets)),
+        default_target=ctx.stmt_map[jm.getDefaultTarget(ir_stmt)],
+    )
+
+
+def _throw_stmt(ir_stmt: Any, ctx: _Ctx, jm: _Accessors) -> SootStmt:
+    op = _convert_value(jm.getOp(ir_stmt), ctx)
+    return ThrowStmt(ctx.stmt_map[ir_stmt], 0, op)
+
+
+_STMT_CONVERTERS: dict[str, Callable[[Any, _Ctx, _Accessors], SootStmt]] = {
+    "JAssignStmt": _assign_stmt,
+    "JIdentityStmt": _identity_stmt,
+    "JBreakpointStmt": _breakpoint_stmt,
+    "JEnterMonitorStmt": _enter_monitor_stmt,
+    "JExitMonitorStmt": _exit_monitor_stmt,
+    "JGotoStmt": _goto_stmt,
+    "JIfStmt": _if_stmt,
+    "JInvokeStmt": _invoke_stmt,
+    "JReturnStmt": _return_stmt,
+    "JReturnVoidStmt": _return_void_stmt,
+    "JLookupSwitchStmt": _lookup_switch_stmt,
+    "JTableSwitchStmt": _table_switch_stmt,
+    "JThrowStmt": _throw_stmt,
+}
+
+
+# ---------- values ----------
+# Keys are Java simple names with "Jimple"/"Shimple" removed, so that e.g.
+# JimpleLocal is looked up as "Local".
+
+
+def _local(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootLocal(str(jm.getType(ir_value)), str(jm.getName(ir_value)))
+
+
+def _array_ref(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootArrayRef(
+        str(jm.getType(ir_value)),
+        _convert_value(jm.getBase(ir_value), ctx),
+        _convert_value(jm.getIndex(ir_value), ctx),
+    )
+
+
+def _caught_exception_ref(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootCaughtExceptionRef(str(jm.getType(ir_value)))
+
+
+def _param_ref(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootParamRef(str(jm.getType(ir_value)), int(jm.getIndex(ir_value)))
+
+
+def _this_ref(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootThisRef(str(jm.getType(ir_value)))
+
+
+def _static_field_ref(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    field = _field_ref(jm.getField(ir_value))
+    return SootStaticFieldRef(str(jm.getType(ir_value)), field)
+
+
+def _instance_field_ref(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootInstanceFieldRef(
+        str(jm.getType(ir_value)),
+        _convert_value(jm.getBase(ir_value), ctx),
+        _field_ref(jm.getField(ir_value)),
+    )
+
+
+def _class_constant(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    value = str(jm.getValue(ir_value))
+    if ctx.constants is not None:
+        ctx.constants.found.append(("class", value))
+    return SootClassConstant(str(jm.getType(ir_value)), value)
+
+
+def _double_constant(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootDoubleConstant(str(jm.getType(ir_value)), float(jm.value(ir_value)))
+
+
+def _float_constant(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootFloatConstant(str(jm.getType(ir_value)), float(jm.value(ir_value)))
+
+
+def _int_constant(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootIntConstant(str(jm.getType(ir_value)), int(jm.value(ir_value)))
+
+
+def _long_constant(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootLongConstant(str(jm.getType(ir_value)), int(jm.value(ir_value)))
+
+
+def _null_constant(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootNullConstant(str(jm.getType(ir_value)))
+
+
+def _string_constant(ir_value: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    value = str(jm.value(ir_value))
+    if ctx.constants is not None:
+        ctx.constants.found.append(("string", value))
+    return SootStringConstant(str(jm.getType(ir_value)), value)
+
+
+def _cast_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootCastExpr(
+        str(jm.getType(ir_expr)),
+        str(jm.getCastType(ir_expr)),
+        _convert_value(jm.getOp(ir_expr), ctx),
+    )
+
+
+def _length_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    op = _convert_value(jm.getOp(ir_expr), ctx)
+    return SootLengthExpr(str(jm.getType(ir_expr)), op)
+
+
+def _new_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootNewExpr(str(jm.getType(ir_expr)), str(jm.getBaseType(ir_expr)))
+
+
+def _new_array_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootNewArrayExpr(
+        str(jm.getType(ir_expr)),
+        str(jm.getBaseType(ir_expr)),
+        _convert_value(jm.getSize(ir_expr), ctx),
+    )
+
+
+def _new_multi_array_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootNewMultiArrayExpr(
+        str(jm.getType(ir_expr)),
+        str(jm.getBaseType(ir_expr)),
+        tuple(_convert_value(s, ctx) for s in jm.getSizes(ir_expr)),
+    )
+
+
+def _instance_of_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootInstanceOfExpr(
+        str(jm.getType(ir_expr)),
+        str(jm.getCheckType(ir_expr)),
+        _convert_value(jm.getOp(ir_expr), ctx),
+    )
+
+
+def _phi_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    # Single-pass construction: we resolve the (value, block_idx) tuples
+    # here using the method-level context, so SootPhiExpr can be created
+    # once with its final values — no post-init mutation required.
+    values = tuple(
+        (
+            _convert_value(arg.getValue(), ctx),
+            ctx.stmt_to_block_idx[arg.getUnit()],
+        )
+        for arg in jm.getArgs(ir_expr)
+    )
+    return SootPhiExpr(str(jm.getType(ir_expr)), values)
+
+
+def _static_invoke_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootStaticInvokeExpr(
+        type=str(jm.getType(ir_expr)), **_invoke_method_info(ir_expr, ctx, jm)
+    )
+
+
+def _dynamic_invoke_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    return SootDynamicInvokeExpr(
+        type=str(jm.getType(ir_expr)),
+        **_invoke_method_info(ir_expr, ctx, jm),
+        bootstrap_method=None,
+        bootstrap_args=None,
+    )
+
+
+def _instance_invoke_expr(expr_cls: type[SootValue]):
+    """Converter for the invoke expressions that have a base object."""
+
+    def convert(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+        return expr_cls(
+            type=str(jm.getType(ir_expr)),
+            **_invoke_method_info(ir_expr, ctx, jm),
+            base=_convert_value(jm.getBase(ir_expr), ctx),
+        )
+
+    return convert
+
+
+def _binop_expr(expr_cls: type[SootValue], op: str):
+    """Converter for binop and condition expressions (op1 <op> op2)."""
+
+    def convert(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+        return expr_cls(
+            str(jm.getType(ir_expr)),
+            op,
+            _convert_value(jm.getOp1(ir_expr), ctx),
+            _convert_value(jm.getOp2(ir_expr), ctx),
+        )
+
+    return convert
+
+
+def _neg_expr(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> SootValue:
+    op = _convert_value(jm.getOp(ir_expr), ctx)
+    return SootUnopExpr(str(jm.getType(ir_expr)), "neg", op)
 
 
 def _op_name(expr_name: str) -> str:
@@ -523,16 +1633,69 @@ def _op_name(expr_name: str) -> str:
     return expr_name[1:].removesuffix("Expr").lower()
 
 
+_VALUE_CONVERTERS: dict[str, Callable[[Any, _Ctx, _Accessors], SootValue]] = {
+    "Local": _local,
+    "JArrayRef": _array_ref,
+    "JCaughtExceptionRef": _caught_exception_ref,
+    "ParameterRef": _param_ref,
+    "ThisRef": _this_ref,
+    "StaticFieldRef": _static_field_ref,
+    "JInstanceFieldRef": _instance_field_ref,
+    "ClassConstant": _class_constant,
+    "DoubleConstant": _double_constant,
+    "FloatConstant": _float_constant,
+    "IntConstant": _int_constant,
+    "LongConstant": _long_constant,
+    "NullConstant": _null_constant,
+    "StringConstant": _string_constant,
+    "JCastExpr": _cast_expr,
+    "JLengthExpr": _length_expr,
+    "JNewExpr": _new_expr,
+    "JNewArrayExpr": _new_array_expr,
+    "JNewMultiArrayExpr": _new_multi_array_expr,
+    "JInstanceOfExpr": _instance_of_expr,
+    "SPhiExpr": _phi_expr,
+    "JStaticInvokeExpr": _static_invoke_expr,
+    "JDynamicInvokeExpr": _dynamic_invoke_expr,
+    "JVirtualInvokeExpr": _instance_invoke_expr(SootVirtualInvokeExpr),
+    "JInterfaceInvokeExpr": _instance_invoke_expr(SootInterfaceInvokeExpr),
+    "JSpecialInvokeExpr": _instance_invoke_expr(SootSpecialInvokeExpr),
+    "JNegExpr": _neg_expr,
+}
+# Binop and condition expressions derive their op name from the class simple
+# name (e.g. "JAddExpr" -> "add").
+for _name in (
+    "JAddExpr",
+    "JAndExpr",
+    "JCmpExpr",
+    "JCmpgExpr",
+    "JCmplExpr",
+    "JDivExpr",
+    "JMulExpr",
+    "JOrExpr",
+    "JRemExpr",
+    "JShlExpr",
+    "JShrExpr",
+    "JSubExpr",
+    "JUshrExpr",
+    "JXorExpr",
+):
+    _VALUE_CONVERTERS[_name] = _binop_expr(SootBinopExpr, _op_name(_name))
+for _name in ("JEqExpr", "JGeExpr", "JGtExpr", "JLeExpr", "JLtExpr", "JNeExpr"):
+    _VALUE_CONVERTERS[_name] = _binop_expr(SootConditionExpr, _op_name(_name))
+del _name
+
+
 def _field_ref(raw_field: Any) -> tuple[str, str]:
     return (str(raw_field.getName()), str(raw_field.getDeclaringClass().getName()))
 
 
-def _invoke_method_info(ir_expr: Any, ctx: _Ctx) -> dict[str, Any]:
+def _invoke_method_info(ir_expr: Any, ctx: _Ctx, jm: _Accessors) -> dict[str, Any]:
     """The 4 kwargs shared by every invoke expression."""
-    method = ir_expr.getMethod()
+    method = jm.getMethod(ir_expr)
     return {
         "class_name": str(method.getDeclaringClass().getName()),
         "method_name": str(method.getName()),
         "method_params": tuple(str(p) for p in method.getParameterTypes()),
-        "args": tuple(_convert_value(a, ctx) for a in ir_expr.getArgs()),
+        "args": tuple(_convert_value(a, ctx) for a in jm.getArgs(ir_expr)),
     }
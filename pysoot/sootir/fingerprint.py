@@ -0,0 +1,159 @@
+"""Merkle-style content fingerprints of blocks, methods and classes.
+
+A block is hashed from its statements, a method from its signature, the
+fingerprints of its blocks and its control flow, and a class from its
+declaration and the fingerprints of its methods. Equal objects have equal
+fingerprints. Fingerprints are SHA-256 digests.
+
+The IR objects do not keep them. To compute each one once over several
+calls (as diff_programs does), pass the same FingerprintMemo to all of them.
+
+With ignore_local_names, locals are identified by their type and the order in
+which they first appear in the method instead of by name, so that two
+versions that only differ by a consistent renaming of locals match.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable, Mapping
+from dataclasses import fields, is_dataclass
+from typing import TYPE_CHECKING, Any
+
+from .soot_value import SootLocal
+
+if TYPE_CHECKING:
+    from .soot_block import SootBlock
+    from .soot_class import SootClass
+    from .soot_method import SootMethod
+
+# (id of the object, ignore_local_names) -> (object, fingerprint). The object
+# is kept so that its id is not reused while the memo lives.
+FingerprintMemo = dict[tuple[int, bool], tuple[Any, bytes]]
+
+
+def block_fingerprint(
+    block: SootBlock,
+    ignore_local_names: bool = False,
+    memo: FingerprintMemo | None = None,
+) -> bytes:
+    def compute():
+        h = hashlib.sha256()
+        h.update(repr((block.label, block.idx)).encode())
+        local_ids = {} if ignore_local_names else None
+        for stmt in block.statements:
+            h.update(_node_key(stmt, local_ids).encode())
+        return h.digest()
+
+    return _cached(block, ignore_local_names, memo, compute)
+
+
+def method_fingerprint(
+    method: SootMethod,
+    ignore_local_names: bool = False,
+    memo: FingerprintMemo | None = None,
+) -> bytes:
+    def compute():
+        h = hashlib.sha256()
+        h.update(
+            repr(
+                (
+                    method.class_name,
+                    method.name,
+                    method.ret,
+                    method.attrs,
+                    method.exceptions,
+                    method.params,
+                )
+            ).encode()
+        )
+        if ignore_local_names:
+            # local ids have to be consistent across the whole method, so
+            # the blocks are hashed here rather than on their own
+            local_ids: dict[str, int] = {}
+            for block in method.blocks:
+                h.update(repr((block.label, block.idx)).encode())
+                for stmt in block.statements:
+                    h.update(_node_key(stmt, local_ids).encode())
+        else:
+            for block in method.blocks:
+                h.update(block_fingerprint(block, memo=memo))
+        for edges in (method.basic_cfg, method.exceptional_preds):
+            h.update(
+                repr(
+                    [(b.label, tuple(t.label for t in ts)) for b, ts in edges.items()]
+                ).encode()
+            )
+        return h.digest()
+
+    return _cached(method, ignore_local_names, memo, compute)
+
+
+def class_fingerprint(
+    soot_class: SootClass,
+    ignore_local_names: bool = False,
+    memo: FingerprintMemo | None = None,
+) -> bytes:
+    def compute():
+        h = hashlib.sha256()
+        h.update(
+            repr(
+                (
+                    soot_class.name,
+                    soot_class.super_class,
+                    soot_class.interfaces,
+                    soot_class.attrs,
+                    sorted(soot_class.fields.items()),
+                )
+            ).encode()
+        )
+        for method in soot_class.methods:
+            h.update(method_fingerprint(method, ignore_local_names, memo))
+        return h.digest()
+
+    return _cached(soot_class, ignore_local_names, memo, compute)
+
+
+def _cached(
+    obj: Any,
+    ignore_local_names: bool,
+    memo: FingerprintMemo | None,
+    compute: Callable[[], bytes],
+) -> bytes:
+    if memo is None:
+        return compute()
+    key = (id(obj), ignore_local_names)
+    entry = memo.get(key)
+    if entry is None:
+        entry = memo[key] = (obj, compute())
+    return entry[1]
+
+
+def _node_key(node: Any, local_ids: dict[str, int] | None) -> str:
+    """An unambiguous text key of an IR node (statement or value)."""
+    if local_ids is not None and isinstance(node, SootLocal):
+        local_id = local_ids.setdefault(node.name, len(local_ids))
+        return f"SootLocal({node.type!r},${local_id})"
+    if is_dataclass(node):
+        return (
+            type(node).__name__
+            + "("
+            + ",".join(
+                _node_key(getattr(node, f.name), local_ids)
+                for f in fields(node)
+                if f.compare
+            )
+            + ")"
+        )
+    if isinstance(node, tuple):
+        return "(" + ",".join(_node_key(n, local_ids) for n in node) + ")"
+    if isinstance(node, Mapping):
+        return (
+            "{"
+            + ",".join(
+                _node_key(k, local_ids) + ":" + _node_key(v, local_ids)
+                for k, v in node.items()
+            )
+            + "}"
+        )
+    return repr(node)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from io import StringIO
+from typing import TextIO
 
+from .fingerprint import block_fingerprint
 from .soot_statement import SootStmt
 
 
@@ -15,14 +18,25 @@ class SootBlock:
         idx = self.idx if self.idx is not None else -1
         return f"<Block {idx} [{self.label}], {len(self.statements)} statements>"
 
+    def fingerprint(self, ignore_local_names: bool = False) -> bytes:
+        return block_fingerprint(self, ignore_local_names)
+
     def __str__(self):
-        tstr = "//" + repr(self) + "\n"
+        out = StringIO()
+        self.write_to(out)
+        return out.getvalue()
 
+    def write_to(self, fp: TextIO, indent: str = ""):
+        """Write str(self) to fp, with indent after every newline."""
+        fp.write("//" + repr(self))
+        # the last statement is held back: its trailing whitespace is dropped
+        last = None
         for s in self.statements:
             sstr = str(s)
             if not sstr.strip():
                 continue
-            # assume one line per statement
-            tstr += sstr + "\n"
-        tstr = tstr.strip()
-        return tstr
+            if last is not None:
+                fp.write(("\n" + last).replace("\n", "\n" + indent))
+            last = sstr
+        if last is not None:
+            fp.write(("\n" + last.rstrip()).replace("\n", "\n" + indent))
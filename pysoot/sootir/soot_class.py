@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, fields
+from io import StringIO
+from typing import TextIO
 
 from frozendict import frozendict
 
-from .soot_method import SootMethod
+from .fingerprint import class_fingerprint
+from .soot_method import SootMethod, _method_repr
 
 
 @dataclass(slots=True, frozen=True)
@@ -16,21 +20,36 @@ class SootClass:
     methods: tuple[SootMethod, ...]
     fields: frozendict[str, tuple[tuple[str], str]]
 
+    def fingerprint(self, ignore_local_names: bool = False) -> bytes:
+        return class_fingerprint(self, ignore_local_names)
+
     def __str__(self):
-        tstr = "//" + repr(self) + "\n"
-        tstr += (
-            " ".join([a.lower() for a in self.attrs])
+        out = StringIO()
+        self.write_to(out)
+        return out.getvalue()
+
+    def write_to(self, fp: TextIO, indent: str = ""):
+        """Write str(self) to fp, with indent after every newline."""
+
+        def write(text):
+            fp.write(text.replace("\n", "\n" + indent))
+
+        fp.write("//")
+        self._write_repr(fp)
+        write(
+            "\n"
+            + " ".join([a.lower() for a in self.attrs])
             + " class "
             + self.name
             + " extends "
             + self.super_class
         )
         if self.interfaces:
-            tstr += " implements " + ", ".join(self.interfaces)
-        tstr += "{\n"
+            write(" implements " + ", ".join(self.interfaces))
+        write("{\n")
 
         for field_name, field_value in self.fields.items():
-            tstr += (
+            write(
                 "\t"
                 + " ".join([f.lower() for f in field_value[0]])
                 + " "
@@ -39,10 +58,37 @@ class SootClass:
                 + field_name
                 + "\n"
             )
-        tstr += "\n"
+        write("\n")
 
         for m in self.methods:
-            tstr += "\n".join(["\t" + line for line in str(m).split("\n")]) + "\n"
+            fp.write("\t")
+            m.write_to(fp, indent + "\t")
+            write("\n")
+
+        write("}\n")
+
+    def _write_repr(self, fp: TextIO):
+        """Write repr(self) to fp, one method at a time."""
+        fp.write(type(self).__qualname__ + "(")
+        for i, f in enumerate(f for f in fields(self) if f.repr):
+            if i:
+                fp.write(", ")
+            if f.name != "methods":
+                fp.write(f"{f.name}={getattr(self, f.name)!r}")
+                continue
+            fp.write("methods=(")
+            for j, m in enumerate(self.methods):
+                if j:
+                    fp.write(", ")
+                fp.write(_method_repr(m))
+            fp.write(",)" if len(self.methods) == 1 else ")")
+        fp.write(")")
+
 
-        tstr += "}\n"
-        return tstr
+def write_ir(classes: Mapping[str, SootClass] | Iterable[SootClass], fp: TextIO):
+    """Write the text of every class (as in str(soot_class)) to fp, one class
+    at a time, e.g. write_ir(lifter.classes, f)."""
+    if isinstance(classes, Mapping):
+        classes = classes.values()
+    for soot_class in classes:
+        soot_class.write_to(fp)
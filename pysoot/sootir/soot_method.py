@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, fields
+from io import StringIO
+from typing import TextIO
 
 from frozendict import frozendict
 
+from .fingerprint import method_fingerprint
 from .soot_block import SootBlock
 
 
@@ -23,14 +27,133 @@ class SootMethod:
     def block_by_label(self):
         return {b.label: b for b in self.blocks}
 
+    def fingerprint(self, ignore_local_names: bool = False) -> bytes:
+        return method_fingerprint(self, ignore_local_names)
+
     def __str__(self):
-        tstr = "//" + repr(self) + "\n"
+        out = StringIO()
+        self.write_to(out)
+        return out.getvalue()
+
+    def write_to(self, fp: TextIO, indent: str = ""):
+        """Write str(self) to fp, with indent after every newline."""
+        header = "//" + _method_repr(self) + "\n"
         if self.attrs:
-            tstr += " ".join([a.lower() for a in self.attrs]) + " "
-        tstr += "{} {}({}){{\n".format(self.ret, self.name, ", ".join(self.params))
+            header += " ".join([a.lower() for a in self.attrs]) + " "
+        header += "{} {}({}){{\n".format(self.ret, self.name, ", ".join(self.params))
+        fp.write(header.replace("\n", "\n" + indent))
 
         for b in self.blocks:
-            tstr += "\n".join(["\t" + line for line in str(b).split("\n")]) + "\n"
+            fp.write("\t")
+            b.write_to(fp, indent + "\t")
+            fp.write("\n" + indent)
+
+        fp.write("}\n" + indent)
+
+
+class LazySootMethod(SootMethod):
+    """A SootMethod whose body (blocks, basic_cfg and exceptional_preds) is
+    produced by a loader on first access instead of at construction.
+
+    Compares and hashes like the equivalent SootMethod (which materializes the
+    body), is written out (str, write_ir) and pickled as one. repr() only
+    shows the body once it is loaded. dataclasses.replace() works, and
+    materializes the body.
+
+    A loader can tell whether the body is in memory with an is_loaded()
+    method (see body_loaded); loaders without one count as not loaded.
+    """
+
+    __slots__ = ("_loader",)
+
+    def __init__(
+        self,
+        loader: Callable[[], tuple[tuple[SootBlock, ...], frozendict, frozendict]]
+        | None = None,
+        **fields,
+    ):
+        # dataclasses.replace() passes the body fields instead of a loader
+        if loader is None:
+            loader = _LoadedBody(
+                (
+                    fields.pop("blocks"),
+                    fields.pop("basic_cfg"),
+                    fields.pop("exceptional_preds"),
+                )
+            )
+        # The body fields are never set: the properties below shadow them.
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_loader", loader)
+
+    def body_loaded(self) -> bool:
+        """Whether the body is in memory, i.e. reading it loads nothing."""
+        is_loaded = getattr(self._loader, "is_loaded", None)
+        return is_loaded is not None and is_loaded()
+
+    @property
+    def blocks(self) -> tuple[SootBlock, ...]:
+        return self._loader()[0]
+
+    @property
+    def basic_cfg(self) -> frozendict[SootBlock, tuple[SootBlock]]:
+        return self._loader()[1]
+
+    @property
+    def exceptional_preds(self) -> frozendict[SootBlock, tuple[SootBlock]]:
+        return self._loader()[2]
+
+    def _as_tuple(self) -> tuple:
+        return _compared_fields(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, SootMethod):
+            return NotImplemented
+        return self._as_tuple() == _compared_fields(other)
+
+    def __hash__(self):
+        return hash(self._as_tuple())
+
+    def __reduce__(self):
+        return SootMethod, self._as_tuple()
+
+    def __repr__(self):
+        if self.body_loaded():
+            return _method_repr(self)
+        signature = ", ".join(
+            f"{f.name}={getattr(self, f.name)!r}"
+            for f in fields(SootMethod)
+            if f.repr and f.name not in _BODY_FIELDS
+        )
+        return f"LazySootMethod({signature}, body not loaded)"
+
+
+class _LoadedBody:
+    __slots__ = ("body",)
+
+    def __init__(self, body: tuple):
+        self.body = body
+
+    def __call__(self) -> tuple:
+        return self.body
+
+    def is_loaded(self) -> bool:
+        return True
+
+
+_BODY_FIELDS = ("blocks", "basic_cfg", "exceptional_preds")
+
+
+def _method_repr(method: SootMethod) -> str:
+    """repr() of the SootMethod equivalent to method."""
+    return "SootMethod({})".format(
+        ", ".join(
+            f"{f.name}={getattr(method, f.name)!r}"
+            for f in fields(SootMethod)
+            if f.repr
+        )
+    )
+
 
-        tstr += "}\n"
-        return tstr
+def _compared_fields(method: SootMethod) -> tuple:
+    return tuple(getattr(method, f.name) for f in fields(SootMethod) if f.compare)
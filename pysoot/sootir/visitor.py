@@ -0,0 +1,139 @@
+"""Generic traversal of statements and values.
+
+Which fields of a node hold sub-values (SootArrayRef.base and index,
+SootInvokeExpr.args, the values of SootPhiExpr...) is derived once per node
+class from its field annotations, so passes over the IR neither repeat
+isinstance chains nor recurse: walks use an explicit stack, and deep
+expressions cannot exhaust the Python stack.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, fields
+from typing import Any
+
+from .soot_value import SootValue
+
+# node class -> function returning the direct sub-values of a node
+_child_accessors: dict[type, Callable[[Any], tuple[SootValue, ...]]] = {}
+
+
+def children(node: Any) -> tuple[SootValue, ...]:
+    """The values directly contained in a statement or value, in field order."""
+    accessor = _child_accessors.get(type(node))
+    if accessor is None:
+        accessor = _child_accessors[type(node)] = _make_accessor(type(node))
+    return accessor(node)
+
+
+def _make_accessor(cls: type) -> Callable[[Any], tuple[SootValue, ...]]:
+    getters = []
+    for f in fields(cls):
+        # annotations are strings (from __future__ import annotations)
+        annotation = str(f.type)
+        if "SootValue" not in annotation:
+            continue
+        name = f.name
+        if annotation.startswith("tuple[tuple["):
+            # e.g. SootPhiExpr.values: (value, block index) pairs
+            getters.append(lambda n, name=name: [p[0] for p in getattr(n, name)])
+        elif annotation.startswith("tuple["):
+            getters.append(lambda n, name=name: getattr(n, name))
+        else:
+            getters.append(lambda n, name=name: (getattr(n, name),))
+
+    if not getters:
+        return lambda node: ()
+    if len(getters) == 1:
+        getter = getters[0]
+        return lambda node: tuple(getter(node))
+    return lambda node: tuple(v for getter in getters for v in getter(node))
+
+
+def iter_values(node: Any) -> Iterator[SootValue]:
+    """All the values in a statement or value (node included, if it is a
+    value), in pre-order."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, SootValue):
+            yield node
+        stack.extend(reversed(children(node)))
+
+
+def iter_statements(method) -> Iterator:
+    """The statements of a SootMethod, block by block."""
+    for block in method.blocks:
+        yield from block.statements
+
+
+def iter_class_statements(soot_class) -> Iterator[tuple[Any, Any]]:
+    """(method, statement) for every statement of a SootClass, method by
+    method (see StmtLocation.of)."""
+    for method in soot_class.methods:
+        for stmt in iter_statements(method):
+            yield method, stmt
+
+
+@dataclass(slots=True, frozen=True)
+class StmtLocation:
+    """Where a statement is: its method, and its label in the method."""
+
+    class_name: str
+    method_name: str
+    method_params: tuple[str, ...]
+    label: int
+
+    @classmethod
+    def of(cls, method, label: int) -> StmtLocation:
+        return cls(method.class_name, method.name, method.params, label)
+
+
+class Visitor:
+    """Base class of IR passes.
+
+    walk() calls visit_<ClassName>(node) for every statement and value it
+    reaches, where ClassName is the node's class or, failing that, its
+    closest base class with a handler (e.g. visit_SootInvokeExpr covers all
+    invoke expressions). Nodes without a handler go to generic_visit. A
+    handler returning False keeps the walk out of that node's sub-values.
+    Handlers are looked up once per node class.
+    """
+
+    _dispatch: dict[type, Callable[[Visitor, Any], Any]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    def generic_visit(self, node: Any) -> Any:
+        return None
+
+    def _handler(self, node_cls: type) -> Callable[[Visitor, Any], Any]:
+        handler = self._dispatch.get(node_cls)
+        if handler is None:
+            handler = type(self).generic_visit
+            for base in node_cls.__mro__:
+                found = getattr(type(self), "visit_" + base.__name__, None)
+                if found is not None:
+                    handler = found
+                    break
+            self._dispatch[node_cls] = handler
+        return handler
+
+    def walk(self, node: Any):
+        """Visit node and everything it contains, in pre-order."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if self._handler(type(node))(self, node) is not False:
+                stack.extend(reversed(children(node)))
+
+    def walk_method(self, method):
+        for stmt in iter_statements(method):
+            self.walk(stmt)
+
+    def walk_class(self, soot_class):
+        for method in soot_class.methods:
+            self.walk_method(method)
@@ -0,0 +1,209 @@
+"""Columnar export of the statements of a program, for corpus-wide analytics.
+
+write_statement_table flattens lifted classes into one row per statement
+and stores the columns as an uncompressed .npz archive, so that
+
+    table = numpy.load("app.npz")
+    kinds = numpy.bincount(table["stmt_kind"])
+
+loads every column as an array without parsing, and aggregate queries
+(opcode histograms, invoke target counts...) become vectorized operations.
+NumPy is only needed to load the file: writing (and read_statement_table)
+uses the array module.
+
+Strings (class and method names, statement and operand kinds, constants) are
+interned in one pool and referred to by int32 id, -1 standing for none. The
+pool is string_data (UTF-8 bytes) sliced by string_offsets; the string with
+id i is string_data[string_offsets[i]:string_offsets[i + 1]].
+
+Columns, one value per statement:
+
+    stmt_method            index into the method_* columns
+    stmt_block             index of the statement's block in its method
+    stmt_label             statement label
+    stmt_kind              statement class name, e.g. "AssignStmt"
+    stmt_invoke_class      class, name and comma-separated parameter types
+    stmt_invoke_name       of the method the statement invokes, or -1
+    stmt_invoke_params
+
+Variable-length columns, the values of statement i being the slice
+[offsets[i]:offsets[i + 1]] (offsets have one entry per statement, plus one):
+
+    operand_offsets        kind (class name, e.g. "SootLocal") of every value
+    operand_kind           in the statement, nested ones included, in pre-order
+    constant_offsets       string and class constants used by the statement;
+    constant_value         constant_kind is 0 for strings, 1 for classes
+    constant_kind
+
+One value per method: method_class, method_name and method_params.
+"""
+
+from __future__ import annotations
+
+import array
+import ast
+import sys
+import zipfile
+from collections.abc import Iterable
+from typing import IO
+
+from .errors import PySootError
+from .sootir.soot_class import SootClass
+from .sootir.soot_expr import SootInvokeExpr
+from .sootir.soot_value import SootClassConstant, SootStringConstant
+from .sootir.visitor import iter_values
+
+# array typecode -> .npy dtype
+_DTYPES = {"b": "|i1", "i": "<i4", "q": "<i8", "B": "|u1"}
+
+CONSTANT_STRING = 0
+CONSTANT_CLASS = 1
+
+
+class _StringPool:
+    __slots__ = ("ids", "offsets", "data")
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.offsets = array.array("q", [0])
+        self.data = bytearray()
+
+    def id(self, s: str) -> int:
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.ids)
+            self.data += s.encode("utf-8", "surrogatepass")
+            self.offsets.append(len(self.data))
+        return i
+
+
+def write_statement_table(classes: Iterable[SootClass], fp: str | IO[bytes]):
+    """Write the statement table of classes (e.g. Lifter.classes.values())
+    to fp, a path or a binary file. Lazily lifted methods are materialized."""
+    strings = _StringPool()
+    sid = strings.id
+    columns = {
+        name: array.array(typecode)
+        for name, typecode in (
+            ("stmt_method", "i"),
+            ("stmt_block", "i"),
+            ("stmt_label", "i"),
+            ("stmt_kind", "i"),
+            ("stmt_invoke_class", "i"),
+            ("stmt_invoke_name", "i"),
+            ("stmt_invoke_params", "i"),
+            ("operand_offsets", "q"),
+            ("operand_kind", "i"),
+            ("constant_offsets", "q"),
+            ("constant_value", "i"),
+            ("constant_kind", "b"),
+            ("method_class", "i"),
+            ("method_name", "i"),
+            ("method_params", "i"),
+        )
+    }
+    operand_kind = columns["operand_kind"]
+    constant_value = columns["constant_value"]
+    constant_kind = columns["constant_kind"]
+    columns["operand_offsets"].append(0)
+    columns["constant_offsets"].append(0)
+    # the kind of a node class, as a string id
+    kinds: dict[type, int] = {}
+
+    for soot_class in classes:
+        class_id = sid(soot_class.name)
+        for method in soot_class.methods:
+            method_idx = len(columns["method_class"])
+            columns["method_class"].append(class_id)
+            columns["method_name"].append(sid(method.name))
+            columns["method_params"].append(sid(",".join(method.params)))
+            for block_idx, block in enumerate(method.blocks):
+                for stmt in block.statements:
+                    kind = kinds.get(type(stmt))
+                    if kind is None:
+                        kind = kinds[type(stmt)] = sid(type(stmt).__name__)
+                    columns["stmt_method"].append(method_idx)
+                    columns["stmt_block"].append(block_idx)
+                    columns["stmt_label"].append(stmt.label)
+                    columns["stmt_kind"].append(kind)
+
+                    invoke = None
+                    for value in iter_values(stmt):
+                        kind = kinds.get(type(value))
+                        if kind is None:
+                            kind = kinds[type(value)] = sid(type(value).__name__)
+                        operand_kind.append(kind)
+                        if isinstance(value, SootStringConstant):
+                            constant_value.append(sid(value.value))
+                            constant_kind.append(CONSTANT_STRING)
+                        elif isinstance(value, SootClassConstant):
+                            constant_value.append(sid(value.value))
+                            constant_kind.append(CONSTANT_CLASS)
+                        elif invoke is None and isinstance(value, SootInvokeExpr):
+                            invoke = value
+                    columns["operand_offsets"].append(len(operand_kind))
+                    columns["constant_offsets"].append(len(constant_value))
+
+                    if invoke is None:
+                        columns["stmt_invoke_class"].append(-1)
+                        columns["stmt_invoke_name"].append(-1)
+                        columns["stmt_invoke_params"].append(-1)
+                    else:
+                        columns["stmt_invoke_class"].append(sid(invoke.class_name))
+                        columns["stmt_invoke_name"].append(sid(invoke.method_name))
+                        columns["stmt_invoke_params"].append(
+                            sid(",".join(invoke.method_params))
+                        )
+
+    columns["string_offsets"] = strings.offsets
+    columns["string_data"] = array.array("B", strings.data)
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_STORED) as npz:
+        for name, column in columns.items():
+            with npz.open(name + ".npy", "w", force_zip64=True) as f:
+                _write_npy(f, column)
+
+
+def read_statement_table(fp: str | IO[bytes]) -> dict[str, array.array]:
+    """Read a file written by write_statement_table without NumPy: every
+    column as an array.array, plus "strings", the string pool as a list."""
+    columns = {}
+    with zipfile.ZipFile(fp) as npz:
+        for name in npz.namelist():
+            columns[name.removesuffix(".npy")] = _read_npy(npz.read(name))
+    data = columns["string_data"].tobytes()
+    offsets = columns["string_offsets"]
+    columns["strings"] = [
+        data[offsets[i] : offsets[i + 1]].decode("utf-8", "surrogatepass")
+        for i in range(len(offsets) - 1)
+    ]
+    return columns
+
+
+def _write_npy(f: IO[bytes], column: array.array):
+    # .npy format version 1.0: magic, header length, header (a dict literal,
+    # padded so that the data is 64-byte aligned), then the raw data
+    header = (
+        f"{{'descr': '{_DTYPES[column.typecode]}', 'fortran_order': False, "
+        f"'shape': ({len(column)},), }}"
+    )
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    f.write(b"\x93NUMPY\x01\x00")
+    f.write(len(header).to_bytes(2, "little"))
+    f.write(header.encode("latin1"))
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column = array.array(column.typecode, column)
+        column.byteswap()
+    f.write(column.tobytes())
+
+
+def _read_npy(data: bytes) -> array.array:
+    if data[:8] != b"\x93NUMPY\x01\x00":
+        raise PySootError("not a statement table column")
+    header_len = int.from_bytes(data[8:10], "little")
+    header = ast.literal_eval(data[10 : 10 + header_len].decode("latin1"))
+    typecode = {dtype: typecode for typecode, dtype in _DTYPES.items()}[header["descr"]]
+    column = array.array(typecode)
+    column.frombytes(data[10 + header_len :])
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column.byteswap()
+    return column
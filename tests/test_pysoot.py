@@ -1,9 +1,179 @@
 #!/usr/bin/env python
 
+import asyncio
+import dataclasses
+import io
 import os
+import pickle
+import struct
+import tempfile
 import unittest
+import zipfile
+from unittest import mock
 
+from frozendict import frozendict
+
+from pysoot.aio import lift_async
+from pysoot.callgraph import CallGraph, SootCallGraph
+from pysoot.constant_index import ConstantIndex
+from pysoot.dex import NO_INDEX, DexFile, apk_dex_entries
+from pysoot.diff import diff_programs
+from pysoot import java_env
+from pysoot.errors import (
+    DexFormatError,
+    ManifestFormatError,
+    ParameterError,
+    PySootError,
+)
+from pysoot.library_model import LibraryModel, build_library_model
 from pysoot.lifter import Lifter
+from pysoot.manifest import parse_manifest, read_manifest
+from pysoot.parallel import apk_shards
+from pysoot.reachability import Reachability
+from pysoot.sootir.soot_block import SootBlock
+from pysoot.sootir.soot_expr import (
+    SootDynamicInvokeExpr,
+    SootInvokeExpr,
+    SootStaticInvokeExpr,
+    SootVirtualInvokeExpr,
+)
+from pysoot.sootir.soot_statement import InvokeStmt
+from pysoot.sootir.soot_value import SootLocal
+from pysoot.sootir.soot_method import LazySootMethod, SootMethod
+from pysoot.statement_table import read_statement_table, write_statement_table
+from pysoot.sootir.visitor import Visitor, iter_statements, iter_values
+from pysoot.sootir.soot_class import SootClass, write_ir
+
+
+def _class_file(name, methods, super_name="java/lang/Object"):
+    """A minimal Java 5 class file (which needs no StackMapTable). methods
+    are (name, descriptor, access flags, max stack, max locals, code)."""
+    pool = []
+
+    def constant(tag, payload):
+        pool.append(bytes([tag]) + payload)
+        return len(pool)
+
+    def utf8(value):
+        encoded = value.encode()
+        return constant(1, struct.pack(">H", len(encoded)) + encoded)
+
+    this_class = constant(7, struct.pack(">H", utf8(name)))
+    super_class = constant(7, struct.pack(">H", utf8(super_name)))
+    code_name = utf8("Code")
+    method_data = b""
+    for method_name, descriptor, access, max_stack, max_locals, code in methods:
+        code_attr = struct.pack(">HHI", max_stack, max_locals, len(code)) + code
+        code_attr += struct.pack(">HH", 0, 0)
+        method_data += struct.pack(
+            ">HHHH", access, utf8(method_name), utf8(descriptor), 1
+        )
+        method_data += struct.pack(">HI", code_name, len(code_attr)) + code_attr
+    return (
+        struct.pack(">IHHH", 0xCAFEBABE, 0, 49, len(pool) + 1)
+        + b"".join(pool)
+        + struct.pack(">HHHHHH", 0x21, this_class, super_class, 0, 0, len(methods))
+        + method_data
+        + struct.pack(">H", 0)
+    )
+
+
+def _write_jar(path, class_files):
+    with zipfile.ZipFile(path, "w") as jar:
+        for name, data in class_files.items():
+            jar.writestr(name + ".class", data)
+
+
+def _switch_code(targets):
+    """Code of a static int(int) method: a tableswitch with that many
+    targets, all returning 0."""
+    # iload_0 at 0, tableswitch at 1, padded to 4; the targets jump past
+    # the switch, to iconst_0; ireturn
+    after = 4 + 12 + 4 * targets
+    code = b"\x1a\xaa\x00\x00" + struct.pack(">iii", after - 1, 0, targets - 1)
+    code += struct.pack(">i", after - 1) * targets
+    return code + b"\x03\xac"
+
+
+def _dex_file(class_defs):
+    """A minimal dex file defining classes without class data. class_defs
+    are (descriptor, superclass descriptor or None)."""
+    strings = sorted({d for c in class_defs for d in c if d is not None})
+    string_ids_off = 0x70
+    type_ids_off = string_ids_off + 4 * len(strings)
+    class_defs_off = type_ids_off + 4 * len(strings)
+    data_off = class_defs_off + 32 * len(class_defs)
+
+    string_ids = b""
+    string_data = b""
+    for string in strings:
+        string_ids += struct.pack("<I", data_off + len(string_data))
+        # short ASCII strings: a one-byte ULEB128 length, then MUTF-8
+        string_data += bytes([len(string)]) + string.encode() + b"\x00"
+    # one type per string, in the same order
+    type_ids = struct.pack(f"<{len(strings)}I", *range(len(strings)))
+    class_data = b""
+    for descriptor, superclass in class_defs:
+        class_data += struct.pack(
+            "<8I",
+            strings.index(descriptor),
+            0x1,
+            NO_INDEX if superclass is None else strings.index(superclass),
+            0,
+            NO_INDEX,
+            0,
+            0,
+            0,
+        )
+
+    size = data_off + len(string_data)
+    header = b"dex\n035\x00" + bytes(24)
+    header += struct.pack("<5I", size, 0x70, 0x12345678, 0, 0)
+    header += struct.pack("<I", 0)  # map_off
+    header += struct.pack(
+        "<14I",
+        len(strings),
+        string_ids_off,
+        len(strings),
+        type_ids_off,
+        0,
+        0,
+        0,
+        0,
+        0,
+        0,
+        len(class_defs),
+        class_defs_off,
+        len(string_data),
+        data_off,
+    )
+    return header + string_ids + type_ids + class_data + string_data
+
+
+def _soot_class(name, methods):
+    """A SootClass of public void() methods, given as {name: statements};
+    a method with statements has them in one block."""
+    return SootClass(
+        name=name,
+        super_class="java.lang.Object",
+        interfaces=(),
+        attrs=("PUBLIC",),
+        methods=tuple(
+            SootMethod(
+                class_name=name,
+                name=method_name,
+                ret="void",
+                attrs=("PUBLIC",),
+                exceptions=(),
+                blocks=(SootBlock(0, tuple(statements), 0),) if statements else (),
+                params=(),
+                basic_cfg=frozendict(),
+                exceptional_preds=frozendict(),
+            )
+            for method_name, statements in methods.items()
+        ),
+        fields=frozendict(),
+    )
 
 
 class TestPySoot(unittest.TestCase):
@@ -94,6 +264,809 @@ class TestPySoot(unittest.TestCase):
             elif i in [3, 4, 5, 14, 15, 16]:
                 assert block in preds
 
+    def test_jni_call_counters(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        counted = Lifter(jar, count_jni_calls=True)
+        assert Lifter(jar).jni_calls is None
+        assert counted.classes == Lifter(jar).classes
+
+        stats = counted.jni_calls
+        assert stats.nodes["JAssignStmt"] > 0
+        assert stats.calls["JAssignStmt"] >= 2 * stats.nodes["JAssignStmt"]
+        assert set(stats.calls_per_node()) == set(stats.nodes)
+
+    def test_processes_jar(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        serial = Lifter(jar)
+        sharded = Lifter(jar, processes=2)
+        assert list(sharded.classes) == list(serial.classes)
+        assert sharded.classes == serial.classes
+        assert sharded.getSubclassesOf("java.lang.Object") == serial.getSubclassesOf(
+            "java.lang.Object"
+        )
+
+    def test_library_model(self):
+        # any jar can be summarized; simple1.jar stands in for a platform jar
+        jar = os.path.join(self.test_samples_folder, "simple1.jar")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "simple1.model")
+            build_library_model(path, android_jar=jar)
+            model = LibraryModel.load(path)
+
+            lifter = Lifter(jar)
+            for name, soot_class in lifter.classes.items():
+                assert name in model
+                model_class = model.get_class(name)
+                assert model_class.super_class == soot_class.super_class
+                assert [m.name for m in model_class.methods] == [
+                    m.name for m in soot_class.methods
+                ]
+                assert all(not m.blocks for m in model_class.methods)
+                assert sorted(model.hierarchy.get(name, [])) == sorted(
+                    lifter.getSubclassesOf(name)
+                )
+
+            with_model = Lifter(jar, library_model=path)
+            assert with_model.classes == lifter.classes
+            assert with_model.get_class("simple1.Class1") is not None
+
+    def test_class_cache(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        with tempfile.TemporaryDirectory() as tmp:
+            first = Lifter(jar, class_cache=tmp)
+            assert first.class_cache.hits == 0
+            second = Lifter(jar, class_cache=tmp)
+            assert second.class_cache.hits == len(first.classes)
+            assert list(second.classes) == list(first.classes)
+            assert second.classes == first.classes
+
+            # the cache is keyed by the lifter configuration too
+            jimple = Lifter(jar, ir_format="jimple", class_cache=tmp)
+            assert jimple.class_cache.hits == 0
+
+    def test_conversion_threads(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        single = Lifter(jar, count_jni_calls=True, index_constants=True)
+        threaded = Lifter(
+            jar, count_jni_calls=True, index_constants=True, conversion_threads=4
+        )
+        assert list(threaded.classes) == list(single.classes)
+        assert threaded.classes == single.classes
+        assert threaded.jni_calls.calls == single.jni_calls.calls
+        assert threaded.constants.strings == single.constants.strings
+
+    def test_progress(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        reports = []
+        lifter = Lifter(jar, progress=reports.append, progress_interval=0)
+        phases = [p.phase for p in reports]
+        assert phases[0] == "loading" and phases[-1] == "done"
+        assert phases.index("packs") < phases.index("converting")
+        assert phases.index("converting") < phases.index("hierarchy")
+
+        done = reports[-1]
+        n_methods = sum(len(c.methods) for c in lifter.classes.values())
+        assert done.classes_done == done.classes_total == len(lifter.classes)
+        assert done.methods_done == done.methods_total == n_methods
+        assert done.classes_per_second > 0
+        methods_done = [p.methods_done for p in reports]
+        assert methods_done == sorted(methods_done)
+
+    def test_skeleton(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        full = Lifter(jar)
+        skeleton = Lifter(jar, skeleton=True)
+        assert sorted(skeleton.classes) == sorted(full.classes)
+        for name, c in skeleton.classes.items():
+            f = full.classes[name]
+            assert (c.super_class, c.interfaces, c.fields) == (
+                f.super_class,
+                f.interfaces,
+                f.fields,
+            )
+            assert [(m.name, m.params, m.ret, m.exceptions) for m in c.methods] == [
+                (m.name, m.params, m.ret, m.exceptions) for m in f.methods
+            ]
+            assert all(not m.blocks for m in c.methods)
+            if "INTERFACE" not in c.attrs:
+                assert sorted(skeleton.getSubclassesOf(name)) == sorted(
+                    full.getSubclassesOf(name)
+                )
+
+        with self.assertRaises(ParameterError):
+            Lifter(jar, skeleton=True, lazy_bodies=True)
+
+    def test_jimple_and_shimple(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        both = Lifter(jar, ir_format=("shimple", "jimple"))
+        assert both.classes is both.classes_by_format["shimple"]
+        for ir_format in ("shimple", "jimple"):
+            single = Lifter(jar, ir_format=ir_format)
+            assert both.classes_by_format[ir_format] == single.classes
+            assert single.classes_by_format == {ir_format: single.classes}
+
+        # only the bodies differ
+        shimple = both.classes_by_format["shimple"]["simple2.Class1"]
+        jimple = both.classes_by_format["jimple"]["simple2.Class1"]
+        assert shimple.fields is jimple.fields
+        assert shimple.methods[0].params is jimple.methods[0].params
+
+        with self.assertRaises(ParameterError):
+            Lifter(jar, ir_format=("shimple", "jimple"), lazy_bodies=True)
+
+    def test_warm_scene(self):
+        jar1 = os.path.join(self.test_samples_folder, "simple1.jar")
+        jar2 = os.path.join(self.test_samples_folder, "simple2.jar")
+        cold = Lifter(jar2)
+        first = Lifter(jar1, warm_scene=True, lazy_bodies=True)
+        warm = Lifter(jar2, warm_scene=True)
+        assert list(warm.classes) == list(cold.classes)
+        assert warm.classes == cold.classes
+        for name in cold.classes:
+            assert warm.getSubclassesOf(name) == cold.getSubclassesOf(name)
+        # the classes of the first input are gone from the Scene
+        lazy = [
+            m
+            for c in first.classes.values()
+            for m in c.methods
+            if isinstance(m, LazySootMethod)
+        ]
+        with self.assertRaises(PySootError):
+            lazy[0].blocks
+
+    def test_warm_scene_overlapping_classes(self):
+        ret0 = [("f", "()I", 0x9, 1, 0, b"\x03\xac")]
+        ret1 = [("g", "()I", 0x9, 1, 0, b"\x04\xac")]
+        with tempfile.TemporaryDirectory() as tmp:
+            jar1 = os.path.join(tmp, "one.jar")
+            jar2 = os.path.join(tmp, "two.jar")
+            lib = os.path.join(tmp, "lib.jar")
+            # both inputs define a.Shared; b.Gone is a phantom class of the
+            # first input, which the second one defines
+            _write_jar(
+                jar1,
+                {
+                    "a/Shared": _class_file("a/Shared", ret0, "b/Gone"),
+                    "a/Only1": _class_file("a/Only1", ret0, "c/Plugin"),
+                },
+            )
+            _write_jar(
+                jar2,
+                {
+                    "a/Shared": _class_file("a/Shared", ret1),
+                    "a/Sub": _class_file("a/Sub", ret0, "a/Shared"),
+                    "b/Gone": _class_file("b/Gone", ret1),
+                },
+            )
+            # a library class extending a class of the inputs
+            _write_jar(lib, {"c/Plugin": _class_file("c/Plugin", ret1, "a/Shared")})
+
+            for additional_jars in (None, [lib]):
+                cold = Lifter(jar2, additional_jars=additional_jars)
+                Lifter(jar1, warm_scene=True, additional_jars=additional_jars)
+                warm = Lifter(jar2, warm_scene=True, additional_jars=additional_jars)
+                assert list(warm.classes) == list(cold.classes)
+                assert warm.classes == cold.classes
+                assert warm.classes["a.Shared"].super_class == "java.lang.Object"
+                for name in cold.classes:
+                    assert warm.getSubclassesOf(name) == cold.getSubclassesOf(name)
+
+    def test_lazy_bodies(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        for ir_format in ("shimple", "jimple"):
+            eager = Lifter(jar, ir_format=ir_format)
+            lazy = Lifter(jar, ir_format=ir_format, lazy_bodies=True)
+            assert lazy.body_store.materialized == 0
+            cc = lazy.classes["simple2.Class1"]
+            # printing an unloaded method does not load it
+            assert "body not loaded" in repr(cc.methods[0])
+            assert not cc.methods[0].body_loaded()
+            assert lazy.body_store.materialized == 0
+            # writing a class out loads its bodies, and prints them as an
+            # eager lift does
+            assert str(cc) == str(eager.classes["simple2.Class1"])
+            assert cc.methods[0].body_loaded()
+            assert lazy.body_store.materialized > 0
+
+            assert lazy.classes == eager.classes
+            renamed = dataclasses.replace(cc.methods[0], name="renamed")
+            assert renamed == dataclasses.replace(
+                eager.classes["simple2.Class1"].methods[0], name="renamed"
+            )
+
+        capped = Lifter(jar, lazy_bodies=True, max_materialized_bodies=1)
+        methods = [m for c in capped.classes.values() for m in c.methods if m.blocks]
+        assert len(methods) > 1
+        n = capped.body_store.materialized
+        assert methods[0].blocks
+        assert capped.body_store.materialized == n + 1
+        # the text does not depend on which bodies are still in memory
+        capped_class = capped.classes["simple2.Class1"]
+        assert str(capped_class) == str(capped_class)
+
+    def test_scene_retention(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        keep = Lifter(jar)
+        released = Lifter(jar, scene_retention="release")
+        assert released.classes == keep.classes
+        heap = Lifter.jvm_heap_usage(collect=True)
+        assert 0 < heap.used <= heap.committed <= heap.max
+
+        lazy = Lifter(jar, lazy_bodies=True, scene_retention="on_demand")
+        assert lazy.classes == released.classes
+        with self.assertRaises(ParameterError):
+            lazy.release_scene()
+
+    def test_memory_report(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        lifter = Lifter(jar)
+        report = lifter.memory_report()
+        n_methods = sum(len(c.methods) for c in lifter.classes.values())
+        assert report.types["SootClass"].count == len(lifter.classes)
+        assert report.types["SootMethod"].count == n_methods
+        assert report.size == sum(u.size for u in report.types.values())
+        # blocks are reached from both blocks and basic_cfg
+        assert report.types["SootBlock"].shared > 0
+        assert report.jvm_heap is not None
+        assert "SootLocal" in report.format()
+
+        lazy = Lifter(jar, lazy_bodies=True)
+        before = lazy.memory_report()
+        assert before.lazy_methods > 0
+        assert lazy.body_store.materialized == 0
+        # a loaded body is counted, and its method no longer is lazy
+        method = next(m for c in lazy.classes.values() for m in c.methods if m.blocks)
+        after = lazy.memory_report()
+        assert lazy.body_store.materialized == 1
+        assert after.lazy_methods == before.lazy_methods - 1
+        assert after.size > before.size
+        assert after.types["SootBlock"].count == len(method.blocks)
+
+    def test_write_ir(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        lifter = Lifter(jar)
+        out = io.StringIO()
+        write_ir(lifter.classes, out)
+        assert out.getvalue() == "".join(str(c) for c in lifter.classes.values())
+
+        method = lifter.classes["simple2.Class1"].methods[0]
+        out = io.StringIO()
+        method.write_to(out, "\t")
+        assert out.getvalue() == str(method).replace("\n", "\n\t")
+
+    def test_statement_table(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        lifter = Lifter(jar)
+        out = io.BytesIO()
+        write_statement_table(lifter.classes.values(), out)
+        table = read_statement_table(io.BytesIO(out.getvalue()))
+        strings = table["strings"]
+
+        stmts = [
+            (c.name, m.name, stmt)
+            for c in lifter.classes.values()
+            for m in c.methods
+            for stmt in iter_statements(m)
+        ]
+        assert len(table["stmt_label"]) == len(stmts)
+        assert len(table["operand_offsets"]) == len(stmts) + 1
+        for i, (class_name, method_name, stmt) in enumerate(stmts):
+            method = table["stmt_method"][i]
+            assert strings[table["method_class"][method]] == class_name
+            assert strings[table["method_name"][method]] == method_name
+            assert table["stmt_label"][i] == stmt.label
+            assert strings[table["stmt_kind"][i]] == type(stmt).__name__
+            start, end = table["operand_offsets"][i : i + 2]
+            assert [strings[k] for k in table["operand_kind"][start:end]] == [
+                type(v).__name__ for v in iter_values(stmt)
+            ]
+            invokes = [v for v in iter_values(stmt) if isinstance(v, SootInvokeExpr)]
+            if invokes:
+                assert strings[table["stmt_invoke_name"][i]] == invokes[0].method_name
+            else:
+                assert table["stmt_invoke_name"][i] == -1
+
+    def test_diff_programs(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        shimple = Lifter(jar).classes
+        assert not diff_programs(shimple, Lifter(jar).classes)
+        cc = shimple["simple2.Class1"]
+        assert cc.fingerprint() == pickle.loads(pickle.dumps(cc)).fingerprint()
+
+        method = cc.methods[0]
+        changed = dict(shimple)
+        changed["simple2.Class1"] = dataclasses.replace(
+            cc,
+            methods=(dataclasses.replace(method, blocks=method.blocks[:-1]),)
+            + cc.methods[1:],
+        )
+        del changed["simple2.Class2"]
+        diff = diff_programs(shimple, changed)
+        assert diff.added_classes == ()
+        assert diff.removed_classes == ("simple2.Class2",)
+        assert list(diff.changed_classes) == ["simple2.Class1"]
+        class_diff = diff.changed_classes["simple2.Class1"]
+        assert not class_diff.added_methods and not class_diff.removed_methods
+        assert not class_diff.declaration_changed
+        assert class_diff.changed_methods == ((method.name, method.params),)
+
+        # fingerprints are not part of the IR, nor kept on it
+        for ir_class in (SootClass, SootMethod, SootBlock):
+            assert all(not f.name.startswith("_") for f in dataclasses.fields(ir_class))
+        renamed = {}
+        for name in ("r0", "r1"):
+            call = SootVirtualInvokeExpr(
+                "void", "a.A", "f", (), (), base=SootLocal("a.A", name)
+            )
+            renamed[name] = {"a.A": _soot_class("a.A", {"f": [InvokeStmt(0, 0, call)]})}
+        assert diff_programs(renamed["r0"], renamed["r1"])
+        assert not diff_programs(renamed["r0"], renamed["r1"], ignore_local_names=True)
+        cls = renamed["r0"]["a.A"]
+        pickled = pickle.dumps(cls)
+        cls.fingerprint()
+        assert pickle.dumps(cls) == pickled
+
+    def test_constant_index(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        lifter = Lifter(jar, index_constants=True)
+        assert lifter.constants.strings
+
+        # recorded during conversion, the index matches a walk of the IR
+        walked = ConstantIndex()
+        for cls in lifter.classes.values():
+            walked.add_class(cls)
+        assert walked.strings == lifter.constants.strings
+        assert walked.classes == lifter.constants.classes
+
+        value, uses = next(iter(lifter.constants.strings.items()))
+        assert lifter.constants.lookup(value) == uses
+        assert lifter.constants.prefix_lookup(value[:1])[value] == uses
+        for use in uses:
+            method = next(
+                m
+                for m in lifter.classes[use.class_name].methods
+                if (m.name, m.params) == (use.method_name, use.method_params)
+            )
+            stmt = next(
+                s for b in method.blocks for s in b.statements if s.label == use.label
+            )
+            assert repr(value) in str(stmt)
+
+    def test_field_index(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        lifter = Lifter(jar)
+        index = lifter.field_index
+        assert lifter.field_index is index
+        assert index.reads or index.writes
+        for accesses, side in ((index.reads, "right_op"), (index.writes, "left_op")):
+            for field, sites in accesses.items():
+                for site in sites:
+                    method = next(
+                        m
+                        for m in lifter.classes[site.class_name].methods
+                        if (m.name, m.params) == (site.method_name, site.method_params)
+                    )
+                    stmt = next(
+                        s
+                        for b in method.blocks
+                        for s in b.statements
+                        if s.label == site.label
+                    )
+                    assert getattr(stmt, side).field == field
+
+    def test_call_graph(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        lifter = Lifter(jar)
+        cha = lifter.call_graph()
+        assert len(cha)
+        for caller, label, callee in cha.edges():
+            assert caller[0] in lifter.classes
+            assert (label, callee) in cha.callees(caller)
+            assert (caller, label) in cha.callers(callee)
+
+        # RTA keeps a subset of the CHA edges
+        rta = lifter.call_graph("rta")
+        assert set(rta.edges()) <= set(cha.edges())
+
+        # adding the classes one at a time gives the same graph
+        incremental = CallGraph(get_class=lifter.get_class)
+        for cls in lifter.classes.values():
+            incremental.add_classes([cls])
+        assert set(incremental.edges()) == set(cha.edges())
+        assert len(incremental) == len(cha)
+
+        # a class added after get_class returned another version of it
+        graph = CallGraph(get_class={"a.B": _soot_class("a.B", {"m1": ()})}.get)
+        assert graph.resolve("a.B", "m2", ()) is None
+        graph.add_classes([_soot_class("a.B", {"m1": (), "m2": ()})])
+        assert graph.resolve("a.B", "m2", ()) == ("a.B", "m2", ())
+
+    def test_entry_points(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        full = Lifter(jar)
+        main = next(
+            m for m in full.classes["simple2.Class1"].methods if m.name == "main"
+        )
+        signature = f"<simple2.Class1: {main.ret} main({','.join(main.params)})>"
+        lifter = Lifter(jar, entry_points=[signature])
+        reached = lifter.reachability.reached
+        assert ("simple2.Class1", "main", main.params) in reached
+
+        # reached methods are lifted as in a full lift, and their calls into
+        # the application classes are reached too
+        cha = full.call_graph()
+        for class_name, soot_class in lifter.classes.items():
+            for method in soot_class.methods:
+                sig = (class_name, method.name, method.params)
+                if sig not in reached:
+                    assert not method.blocks
+                    continue
+                full_class = full.classes[class_name]
+                assert method == full_class.methods[soot_class.methods.index(method)]
+                for _, callee in cha.callees(sig):
+                    if callee[0] in full.classes:
+                        assert callee in reached
+
+        unreached = [
+            (c.name, m.name, m.params)
+            for c in full.classes.values()
+            for m in c.methods
+            if m.blocks and (c.name, m.name, m.params) not in reached
+        ]
+        if unreached:
+            class_name, name, params = unreached[0]
+            method = next(
+                m
+                for m in full.classes[class_name].methods
+                if (m.name, m.params) == (name, params)
+            )
+            new = lifter.reach(
+                [f"<{class_name}: {method.ret} {name}({','.join(params)})>"]
+            )
+            assert (class_name, name, params) in new
+            assert (
+                lifter.classes[class_name].methods[
+                    full.classes[class_name].methods.index(method)
+                ]
+                == method
+            )
+
+        with self.assertRaises(ParameterError):
+            Lifter(jar, entry_points="android-components")
+        with self.assertRaises(ParameterError):
+            Lifter(jar, entry_points=["simple2.Class1.main"])
+        with self.assertRaises(ParameterError):
+            Lifter(jar, entry_points=[signature], lazy_bodies=True)
+        with self.assertRaises(ParameterError):
+            full.reach([signature])
+
+    def test_reachability_lambdas(self):
+        def invoke(expr_type, class_name, name):
+            return InvokeStmt(0, 0, expr_type("void", class_name, name, (), ()))
+
+        # Soot's dynamic invokes name a dummy class; the lambda bodies are
+        # only found through the bootstrap arguments
+        run = SootDynamicInvokeExpr(
+            "java.lang.Runnable",
+            "soot.dummy.InvokeDynamic",
+            "run",
+            (),
+            (),
+            bootstrap_method=None,
+            bootstrap_args=None,
+        )
+        classes = [
+            _soot_class(
+                "a.Main",
+                {
+                    "main": [InvokeStmt(0, 0, run)],
+                    "lambda$main$0": [invoke(SootStaticInvokeExpr, "a.Util", "f")],
+                    "unused": [invoke(SootStaticInvokeExpr, "a.Other", "g")],
+                },
+            ),
+            _soot_class("a.Util", {"f": ()}),
+            _soot_class("a.Other", {"g": (), "lambda$g$0": ()}),
+        ]
+        methods = {
+            (m.class_name, m.name, m.params): m for c in classes for m in c.methods
+        }
+
+        def load_body(sig):
+            method = methods[sig]
+            if not method.blocks:
+                return None
+            return method.blocks, method.basic_cfg, method.exceptional_preds
+
+        reachability = Reachability([("a.Main", "main", ())])
+        reachability.attach({c.name: c for c in classes}, load_body)
+        reached = reachability.expand(reachability.entry_points)
+        assert ("a.Main", "lambda$main$0", ()) in reached
+        assert ("a.Util", "f", ()) in reached
+        assert ("a.Main", "unused", ()) not in reached
+        assert "a.Other" not in reachability.classes()
+
+    def test_soot_call_graph(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        for ir_format in ("shimple", "jimple"):
+            lifter = Lifter(jar, ir_format=ir_format, soot_call_graph="cha")
+            graph = lifter.soot_call_graph
+            assert len(graph)
+            checked = 0
+            for caller, label, callee, kind in graph.edges():
+                cls = lifter.classes.get(caller[0])
+                if cls is None or label < 0 or kind not in ("VIRTUAL", "STATIC"):
+                    continue
+                method = next(
+                    m for m in cls.methods if (m.name, m.params) == caller[1:]
+                )
+                stmt = next(
+                    s for b in method.blocks for s in b.statements if s.label == label
+                )
+                assert callee[1] in str(stmt)
+                checked += 1
+            assert checked
+
+        # only locals are matched across Jimple and Shimple: a method named
+        # like an SSA local (m1_2) keeps its call sites apart
+        graph = SootCallGraph()
+        graph.load(
+            "VIRTUAL edge: virtualinvoke r0.<a.B: void m1_2()>() in <a.B: void f()>"
+            " ==> <a.B: void m1_2()>\n"
+            "VIRTUAL edge: virtualinvoke r0.<a.B: void m1()>() in <a.B: void f()>"
+            " ==> <a.B: void m1()>",
+            lambda signature: {
+                "virtualinvoke r0.<a.B: void m1_2()>()": [1],
+                "virtualinvoke r0.<a.B: void m1()>()": [2],
+            },
+        )
+        assert {(label, callee[1]) for _, label, callee, _ in graph.edges()} == {
+            (1, "m1_2"),
+            (2, "m1"),
+        }
+
+    def test_visitor(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        lifter = Lifter(jar)
+
+        class InvokeCollector(Visitor):
+            def __init__(self):
+                self.invokes = []
+
+            def visit_SootInvokeExpr(self, node):
+                self.invokes.append(node)
+
+        for cls in lifter.classes.values():
+            collector = InvokeCollector()
+            collector.walk_class(cls)
+            expected = [
+                v
+                for m in cls.methods
+                for s in iter_statements(m)
+                for v in iter_values(s)
+                if isinstance(v, SootInvokeExpr)
+            ]
+            assert collector.invokes == expected
+            for invoke in expected:
+                assert all(str(arg) in str(invoke) for arg in invoke.args)
+
+    def test_conversion_budget(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+        full = Lifter(jar)
+        lifter = Lifter(jar, max_method_statements=3)
+        truncated = {(t.class_name, t.name, t.params) for t in lifter.budget.truncated}
+        assert truncated
+        assert all(t.reason == "statements" for t in lifter.budget.truncated)
+        for name, cls in lifter.classes.items():
+            for method, full_method in zip(cls.methods, full.classes[name].methods):
+                if (name, method.name, method.params) in truncated:
+                    assert "Truncated" in method.attrs
+                    assert not method.blocks
+                    assert sum(len(b.statements) for b in full_method.blocks) > 3
+                else:
+                    assert method == full_method
+
+        lifter = Lifter(jar, max_lift_seconds=0)
+        assert all(not m.blocks for c in lifter.classes.values() for m in c.methods)
+        assert {t.reason for t in lifter.budget.truncated} == {"lift_seconds"}
+
+        # a switch counts as many statements as it has targets
+        with tempfile.TemporaryDirectory() as tmp:
+            jar = os.path.join(tmp, "switch.jar")
+            big = ("big", "(I)I", 0x9, 1, 1, _switch_code(20000))
+            _write_jar(jar, {"Switch": _class_file("Switch", [big])})
+            lifter = Lifter(jar, max_method_statements=100)
+            assert [(t.name, t.reason) for t in lifter.budget.truncated] == [
+                ("big", "statements")
+            ]
+            assert not Lifter(jar, max_method_statements=30000).budget.truncated
+
+    def test_lift_async(self):
+        jar = os.path.join(self.test_samples_folder, "simple2.jar")
+
+        async def lift_both():
+            limit = asyncio.Semaphore(1)
+            return await asyncio.gather(
+                lift_async(jar, limit=limit),
+                lift_async(jar, ir_format="jimple", limit=limit),
+            )
+
+        shimple, jimple = asyncio.run(lift_both())
+        serial = Lifter(jar)
+        assert shimple.classes == serial.classes
+        assert shimple.getSubclassesOf("java.lang.Object") == serial.getSubclassesOf(
+            "java.lang.Object"
+        )
+        assert jimple.classes == Lifter(jar, ir_format="jimple").classes
+        # the worker's Scene is gone: releasing it leaves this process's alone
+        assert shimple._scene is None
+        lazy = Lifter(jar, lazy_bodies=True)
+        shimple.release_scene()
+        assert lazy.classes == serial.classes
+
+        with self.assertRaises(ParameterError):
+            asyncio.run(lift_async(jar, progress=print))
+
+    @unittest.skipIf(os.name == "nt", "needs an executable named java")
+    def test_cached_java_home(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bin_dir = os.path.join(tmp, "bin")
+            os.mkdir(bin_dir)
+            java = os.path.join(bin_dir, "java")
+            with open(java, "w") as f:
+                f.write("#!/bin/sh\n")
+            os.chmod(java, 0o755)
+            java_home = os.path.join(tmp, "home")
+            os.makedirs(os.path.join(java_home, "lib"))
+            cache_file = os.path.join(tmp, "cache", "java_homes.json")
+            discovered = []
+
+            def discover():
+                discovered.append(java_home)
+                return java_home
+
+            def fresh_process():
+                # a new process only has the cache file
+                java_env._java_homes.clear()
+                return java_env.cached_java_home(discover)
+
+            environ = {"PATH": bin_dir, "PYSOOT_CACHE_DIR": os.path.dirname(cache_file)}
+            with (
+                mock.patch.dict(os.environ, environ),
+                mock.patch.dict(java_env._java_homes, clear=True),
+            ):
+                assert fresh_process() == java_home
+                assert len(discovered) == 1
+                # a hit, in the process and from the file
+                assert java_env.cached_java_home(discover) == java_home
+                assert fresh_process() == java_home
+                assert len(discovered) == 1
+
+                # the cached home no longer exists
+                os.rename(java_home, java_home + ".old")
+                fresh_process()
+                assert len(discovered) == 2
+                os.rename(java_home + ".old", java_home)
+
+                # a corrupt cache file is rewritten
+                with open(cache_file, "w") as f:
+                    f.write("{not json")
+                assert fresh_process() == java_home
+                assert len(discovered) == 3
+                assert fresh_process() == java_home
+                assert len(discovered) == 3
+
+            assert java_env.cached_jrt_jar(java_home) is None
+            jrt_fs = os.path.join(java_home, "lib", "jrt-fs.jar")
+            open(jrt_fs, "wb").close()
+            assert java_env.cached_jrt_jar(java_home) == jrt_fs
+
+    def test_dex_file(self):
+        dex = DexFile(
+            _dex_file(
+                [
+                    ("La/Main;", "Landroid/app/Activity;"),
+                    ("La/b/Helper;", "Ljava/lang/Object;"),
+                    ("Ljava/lang/Object;", None),
+                ]
+            )
+        )
+        assert dex.string(2) == "Landroid/app/Activity;"
+        assert dex.type_descriptors == (
+            "La/Main;",
+            "La/b/Helper;",
+            "Landroid/app/Activity;",
+            "Ljava/lang/Object;",
+        )
+        assert dex.type_name(1) == "a.b.Helper"
+        assert dex.class_names() == ["a.Main", "a.b.Helper", "java.lang.Object"]
+        main, helper, obj = dex.classes()
+        assert main.name == "a.Main"
+        assert main.superclass == "Landroid/app/Activity;"
+        assert helper.superclass == "Ljava/lang/Object;"
+        assert obj.superclass is None
+        assert main.interfaces == () and main.direct_methods == ()
+
+        with self.assertRaises(DexFormatError):
+            DexFile(b"PK\x03\x04" + bytes(0x70))
+
+    def test_apk_shards(self):
+        def dex(*names):
+            return _dex_file([(f"La/{n};", None) for n in names])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            apk = os.path.join(tmp, "app.apk")
+            with zipfile.ZipFile(apk, "w") as z:
+                z.writestr("AndroidManifest.xml", b"\x03\x00\x08\x00")
+                z.writestr("classes10.dex", dex("J", "K"))
+                z.writestr("assets/extra.dex", dex("X"))
+                z.writestr("classes2.dex", dex("D"))
+                z.writestr("classes.dex", dex("A", "B", "C"))
+
+            # multidex order, then the other dex files
+            assert apk_dex_entries(apk) == [
+                "classes.dex",
+                "classes2.dex",
+                "classes10.dex",
+                "assets/extra.dex",
+            ]
+            # largest dex first into the smallest group; ties keep the
+            # multidex order
+            assert apk_shards(apk, 2) == [
+                ["a.A", "a.B", "a.C", "a.X"],
+                ["a.J", "a.K", "a.D"],
+            ]
+            assert apk_shards(apk, 10) == [
+                ["a.A", "a.B", "a.C"],
+                ["a.J", "a.K"],
+                ["a.D"],
+                ["a.X"],
+            ]
+            assert apk_shards(apk, 1) == [
+                ["a.A", "a.B", "a.C", "a.J", "a.K", "a.D", "a.X"]
+            ]
+
+    def test_manifest(self):
+        # a UTF-16 manifest with a resource map, as aapt writes them
+        path = os.path.join(os.path.dirname(__file__), "minimal_manifest.xml")
+        with open(path, "rb") as f:
+            data = f.read()
+        manifest = parse_manifest(data)
+        assert manifest.package == "com.example.app"
+        assert manifest.application == "com.example.app.App"
+        # relative names are resolved against the package; <uses-permission>
+        # has an android:name but declares no component
+        assert manifest.components == (
+            ("activity", "com.example.app.MainActivity"),
+            ("activity", "com.example.app.Settings"),
+            ("service", "com.example.app.SyncService"),
+            ("receiver", "org.other.BootReceiver"),
+            ("provider", "com.example.app.data.Provider"),
+        )
+        # the Application subclass is an entry point too
+        assert manifest.component_classes() == [
+            "com.example.app.App",
+            "com.example.app.MainActivity",
+            "com.example.app.Settings",
+            "com.example.app.SyncService",
+            "org.other.BootReceiver",
+            "com.example.app.data.Provider",
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            apk = os.path.join(tmp, "app.apk")
+            with zipfile.ZipFile(apk, "w") as z:
+                z.writestr("AndroidManifest.xml", data)
+            assert read_manifest(apk) == manifest
+            with zipfile.ZipFile(apk, "w") as z:
+                z.writestr("classes.dex", _dex_file([]))
+            with self.assertRaises(ManifestFormatError):
+                read_manifest(apk)
+
+        with self.assertRaises(ManifestFormatError):
+            parse_manifest(data[: len(data) // 2])
+        with self.assertRaises(ManifestFormatError):
+            parse_manifest(b"<manifest/>")
+
     # TODO consider adding Android Sdk in the CI server
     @unittest.skipUnless(os.path.exists(android_sdk_path), "Android SDK not found")
     def test_android1(self):
@@ -110,6 +1083,38 @@ class TestPySoot(unittest.TestCase):
 
     test_android1.speed = "slow"
 
+    @unittest.skipUnless(os.path.exists(android_sdk_path), "Android SDK not found")
+    def test_android1_entry_points(self):
+        apk = os.path.join(self.test_samples_folder, "android1.apk")
+        lifter = Lifter(
+            apk,
+            input_format="apk",
+            android_sdk=self.android_sdk_path,
+            entry_points="android-components",
+        )
+        main_activity = lifter.classes["com.example.antoniob.android1.MainActivity"]
+        on_create = next(m for m in main_activity.methods if m.name == "onCreate")
+        assert on_create.blocks
+        full = Lifter(apk, input_format="apk", android_sdk=self.android_sdk_path)
+        assert set(lifter.classes) < set(full.classes)
+
+    test_android1_entry_points.speed = "slow"
+
+    @unittest.skipUnless(os.path.exists(android_sdk_path), "Android SDK not found")
+    def test_android1_processes(self):
+        apk = os.path.join(self.test_samples_folder, "android1.apk")
+        serial = Lifter(apk, input_format="apk", android_sdk=self.android_sdk_path)
+        parallel = Lifter(
+            apk, input_format="apk", android_sdk=self.android_sdk_path, processes=2
+        )
+        assert list(parallel.classes) == list(serial.classes)
+        assert parallel.classes == serial.classes
+        assert parallel.getSubclassesOf("java.lang.Object") == serial.getSubclassesOf(
+            "java.lang.Object"
+        )
+
+    test_android1_processes.speed = "slow"
+
     @unittest.skipUnless(
         os.path.exists(test_samples_folder_private), "binaries-private not found"
     )